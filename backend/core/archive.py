@@ -0,0 +1,249 @@
+import json
+import uuid
+from datetime import datetime, timedelta
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+from django.db.models import Q
+
+from core.associations import index_events, index_notes
+from core.models import (
+    Tour,
+    Venue,
+    Group,
+    Person,
+    Hotel,
+    Day,
+    ScheduleEvent,
+    Contact,
+    Note,
+    DayLodging,
+    DayLodgingGuest,
+    ScheduleTemplate,
+    ScheduleTemplateEvent,
+)
+
+FORMAT = "daysheets-tour"
+VERSION = 1
+
+# Dependency order: every row only references rows written before it.
+MODELS = [
+    ("tour", Tour, lambda tour_id: Q(id=tour_id)),
+    ("venue", Venue, lambda tour_id: Q(id__in=Day.objects.filter(tour_id=tour_id).values("venue_id"))),
+    ("group", Group, lambda tour_id: Q(tour_id=tour_id)),
+    ("person", Person, lambda tour_id: Q(tour_id=tour_id)),
+    (
+        "hotel",
+        Hotel,
+        lambda tour_id: Q(tour_id=tour_id) | Q(id__in=DayLodging.objects.filter(day__tour_id=tour_id).values("hotel_id")),
+    ),
+    ("day", Day, lambda tour_id: Q(tour_id=tour_id)),
+    ("scheduleEvent", ScheduleEvent, lambda tour_id: Q(day__tour_id=tour_id)),
+    ("contact", Contact, lambda tour_id: Q(day__tour_id=tour_id)),
+    ("note", Note, lambda tour_id: Q(day__tour_id=tour_id)),
+    ("dayLodging", DayLodging, lambda tour_id: Q(day__tour_id=tour_id)),
+    ("dayLodgingGuest", DayLodgingGuest, lambda tour_id: Q(lodging__day__tour_id=tour_id)),
+    ("scheduleTemplate", ScheduleTemplate, lambda tour_id: Q(tour_id=tour_id)),
+    ("scheduleTemplateEvent", ScheduleTemplateEvent, lambda tour_id: Q(template__tour_id=tour_id)),
+]
+MODEL_BY_KEY = {key: model for key, model, _ in MODELS}
+# Foreign key columns per model; other *_id columns (e.g. Hotel.place_id) are not ours to remap.
+# Timestamps that bulk_create() would overwrite with the time of the import.
+STAMP_FIELDS = {
+    model: [f.attname for f in model._meta.concrete_fields if getattr(f, "auto_now", False) or getattr(f, "auto_now_add", False)]
+    for _, model, _ in MODELS
+}
+FOREIGN_KEYS = {key: {f.attname for f in model._meta.concrete_fields if f.is_relation} for key, model, _ in MODELS}
+
+
+class ArchiveError(ValueError):
+    pass
+
+
+def _fields(model):
+    return [f.attname for f in model._meta.concrete_fields if not f.generated]
+
+
+class _Encoder(DjangoJSONEncoder):
+    # DjangoJSONEncoder cuts datetimes to milliseconds; archived timestamps stay exact.
+    def default(self, o):
+        if isinstance(o, datetime):
+            return o.isoformat()
+        return super().default(o)
+
+
+def export_tour(tour_id):
+    """Yield the tour as NDJSON lines, one row per line, in dependency order."""
+    chunk_size = getattr(settings, "TOUR_ARCHIVE_CHUNK_SIZE", 2000)
+    yield json.dumps({"format": FORMAT, "version": VERSION, "tour": str(tour_id)}) + "\n"
+    for key, model, scope in MODELS:
+        rows = model.objects.filter(scope(tour_id)).order_by("pk").values(*_fields(model))
+        for row in rows.iterator(chunk_size=chunk_size):
+            yield json.dumps({"model": key, "fields": row}, cls=_Encoder, separators=(",", ":")) + "\n"
+
+
+class _Remapper:
+    """
+    Maps archived ids to fresh ones without keeping a table: each new id is
+    a uuid5 of the old one under a per-import namespace. Venues and hotels
+    that do not belong to the tour are shared, so they keep their ids.
+    """
+
+    def __init__(self, source_tour_id, tour_id):
+        self.source_tour_id = str(source_tour_id)
+        self.tour_id = tour_id
+        self.namespace = uuid.uuid4()
+        self.shared_hotels = set()
+
+    def __call__(self, value):
+        if value in (None, ""):
+            return value
+        return str(uuid.uuid5(self.namespace, str(value)))
+
+    def refs(self, items):
+        if not isinstance(items, list):
+            return items
+        return [{**item, "id": self(item.get("id"))} if isinstance(item, dict) else item for item in items]
+
+    def row(self, key, fields):
+        fields = dict(fields)
+        if key == "tour":
+            fields.update(id=self.tour_id, revision=0)
+            return fields
+        if key == "venue":
+            return fields
+        if key == "hotel" and str(fields.get("tour_id")) != self.source_tour_id:
+            self.shared_hotels.add(str(fields["id"]))
+            fields["tour_id"] = None
+            return fields
+
+        fields["id"] = self(fields["id"])
+        for name in FOREIGN_KEYS[key].intersection(fields):
+            if name == "tour_id":
+                fields[name] = self.tour_id
+            elif name == "hotel_id":
+                if str(fields[name]) not in self.shared_hotels:
+                    fields[name] = self(fields[name])
+            elif name != "venue_id":
+                fields[name] = self(fields[name])
+        for name in ("associations", "visibility"):
+            if name in fields:
+                fields[name] = self.refs(fields[name])
+        return fields
+
+
+def _insert(model, objs):
+    """
+    bulk_create() the rows, then write back the archived auto_now and
+    auto_now_add values that pre_save replaced with the current time.
+    """
+    stamps = STAMP_FIELDS[model]
+    archived = [[getattr(obj, name) for name in stamps] for obj in objs]
+    model.objects.bulk_create(objs)
+    if stamps and objs:
+        for obj, values in zip(objs, archived):
+            for name, value in zip(stamps, values):
+                setattr(obj, name, value)
+        model.objects.bulk_update(objs, stamps)
+
+
+def _flush(key, batch):
+    model = MODEL_BY_KEY[key]
+    objs = [model(**fields) for fields in batch]
+    if key == "venue":
+        # Shared rows may already exist in this database.
+        model.objects.bulk_create(objs, ignore_conflicts=True)
+    elif key == "hotel":
+        model.objects.bulk_create([o for o in objs if o.tour_id is None], ignore_conflicts=True)
+        _insert(model, [o for o in objs if o.tour_id is not None])
+    else:
+        _insert(model, objs)
+    if key == "scheduleEvent":
+        index_events(objs, replace=False)
+    elif key == "note":
+        index_notes(objs, replace=False)
+    return len(objs)
+
+
+def _load(remap, records, name=""):
+    batch_size = getattr(settings, "TOUR_ARCHIVE_BATCH_SIZE", 1000)
+    counts = {}
+    key, batch = None, []
+    for record_key, fields in records:
+        if record_key != key or len(batch) >= batch_size:
+            if batch:
+                counts[key] = counts.get(key, 0) + _flush(key, batch)
+            key, batch = record_key, []
+        if key == "tour" and name:
+            fields = {**fields, "name": name}
+        batch.append(remap.row(key, fields))
+    if batch:
+        counts[key] = counts.get(key, 0) + _flush(key, batch)
+
+    if counts.get("tour") != 1:
+        raise ArchiveError("archive must contain exactly one tour")
+    return Tour.objects.get(id=remap.tour_id), counts
+
+
+def _parse(lines):
+    for line in lines:
+        if isinstance(line, bytes):
+            line = line.decode("utf-8")
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+            key = record["model"]
+            fields = record["fields"]
+        except (ValueError, KeyError, TypeError):
+            raise ArchiveError("malformed archive line")
+        if key not in MODEL_BY_KEY:
+            raise ArchiveError(f"unknown model {key!r}")
+        yield key, fields
+
+
+@transaction.atomic
+def import_tour(lines, name=""):
+    """
+    Load an archive produced by export_tour() as a new tour and return
+    (tour, counts). Rows are inserted in batches as they are read.
+    """
+    lines = iter(lines)
+    try:
+        header = json.loads(next(lines))
+    except (StopIteration, ValueError):
+        raise ArchiveError("archive is empty or not JSON")
+    if not isinstance(header, dict) or header.get("format") != FORMAT or header.get("version") != VERSION:
+        raise ArchiveError("not a tour archive")
+
+    remap = _Remapper(header.get("tour"), str(uuid.uuid4()))
+    return _load(remap, _parse(lines), name=name)
+
+
+CLONE_MODELS = {"tour", "group", "person", "scheduleTemplate", "scheduleTemplateEvent"}
+CLONE_DAY_MODELS = {"day", "scheduleEvent", "contact", "note"}
+
+
+@transaction.atomic
+def clone_tour(tour_id, name, include_days=False, day_offset=0):
+    """
+    Copy a tour's groups, people and schedule templates (and optionally its
+    days with their events, contacts and notes, shifted by `day_offset` days)
+    into a new tour. Rows go straight from .values() into batched bulk_create.
+    """
+    keys = CLONE_MODELS | (CLONE_DAY_MODELS if include_days else set())
+    chunk_size = getattr(settings, "TOUR_ARCHIVE_CHUNK_SIZE", 2000)
+    shift = timedelta(days=day_offset)
+
+    def records():
+        for key, model, scope in MODELS:
+            if key not in keys:
+                continue
+            rows = model.objects.filter(scope(tour_id)).order_by("pk").values(*_fields(model))
+            for row in rows.iterator(chunk_size=chunk_size):
+                if key == "day":
+                    row["date"] += shift
+                yield key, row
+
+    return _load(_Remapper(tour_id, str(uuid.uuid4())), records(), name=name)
@@ -0,0 +1,74 @@
+import uuid
+
+from django.db.models import Q
+
+from core.models import AssociationKind, NoteVisibility, Person, ScheduleEventAssociation
+
+KINDS = set(AssociationKind.values)
+
+
+def parse_refs(items, kind_key):
+    """(kind, uuid) pairs from an associations/visibility list, skipping malformed entries."""
+    out = []
+    for item in items if isinstance(items, list) else []:
+        if not isinstance(item, dict) or item.get(kind_key) not in KINDS:
+            continue
+        try:
+            target = uuid.UUID(str(item.get("id")))
+        except (TypeError, ValueError, AttributeError):
+            continue
+        if (item[kind_key], target) not in out:
+            out.append((item[kind_key], target))
+    return out
+
+
+def index_events(events, replace=True):
+    """Rewrite the association index rows of the given events; returns how many were written."""
+    events = list(events)
+    if replace and events:
+        ScheduleEventAssociation.objects.filter(event_id__in=[e.id for e in events]).delete()
+    rows = ScheduleEventAssociation.objects.bulk_create(
+        [
+            ScheduleEventAssociation(event_id=e.id, kind=kind, target_id=target)
+            for e in events
+            for kind, target in parse_refs(e.associations, "type")
+        ],
+        batch_size=1000,
+    )
+    return len(rows)
+
+
+def index_notes(notes, replace=True):
+    """Rewrite the visibility index rows of the given notes; returns how many were written."""
+    notes = list(notes)
+    if replace and notes:
+        NoteVisibility.objects.filter(note_id__in=[n.id for n in notes]).delete()
+    rows = NoteVisibility.objects.bulk_create(
+        [
+            NoteVisibility(note_id=n.id, kind=kind, target_id=target)
+            for n in notes
+            for kind, target in parse_refs(n.visibility, "kind")
+        ],
+        batch_size=1000,
+    )
+    return len(rows)
+
+
+def _audience(index, person=None, group=None):
+    q = Q()
+    if person:
+        # A person sees what is addressed to them or to their group.
+        q |= Q(kind=AssociationKind.PERSON, target_id=person)
+        q |= Q(kind=AssociationKind.GROUP, target_id__in=Person.objects.filter(id=person).values("group_id"))
+    if group:
+        q |= Q(kind=AssociationKind.GROUP, target_id=group)
+    return index.objects.filter(q)
+
+
+def events_for(person=None, group=None):
+    """Q on ScheduleEvent for events associated with a person (directly or via their group) or a group."""
+    return Q(id__in=_audience(ScheduleEventAssociation, person, group).values("event_id"))
+
+
+def notes_for(person=None, group=None):
+    return Q(id__in=_audience(NoteVisibility, person, group).values("note_id"))
@@ -0,0 +1,232 @@
+import json
+import statistics
+import time
+from collections import namedtuple
+from pathlib import Path
+
+from django.db import connection, transaction
+from django.test import Client
+from django.test.utils import CaptureQueriesContext, override_settings
+from django.urls import resolve
+
+from core import urls
+from core.archive import export_tour
+
+PREFIX = "/api/"
+BASELINE_PATH = Path(__file__).with_name("bench_baseline.json")
+
+DEFAULT_SIZE = {"days": 30, "events_per_day": 10, "notes_per_day": 3, "people": 40, "groups": 5, "hotels": 50}
+
+# Routes that cannot be measured as a single request/response.
+SKIPPED = {
+    "tours/<uuid:tour_id>/stream/": "long-lived SSE connection",
+}
+
+Endpoint = namedtuple("Endpoint", "method path body content_type", defaults=(None, "application/json"))
+
+
+def _batch(ids):
+    return {
+        "create": [{"name": f"Bench {i}", "startLocal": f"{10 + i:02d}:00"} for i in range(3)],
+        "update": [{"id": ids["event"], "status": "done"}],
+        "delete": [ids["other_event"]],
+    }
+
+
+def _guests(ids):
+    return [{"personId": p} for p in ids["guests"]]
+
+
+ENDPOINTS = [
+    Endpoint("GET", "tours/"),
+    Endpoint("GET", "tours/{tour}/days/"),
+    Endpoint("GET", "tours/{tour}/days/?limit=20"),
+    Endpoint("GET", "tours/{tour}/changes/?since=0"),
+    Endpoint("GET", "tours/{tour}/schedule/"),
+    Endpoint("GET", "tours/{tour}/schedule/?person={person}"),
+    Endpoint("GET", "tours/{tour}/rooming-list/?format=csv"),
+    Endpoint("GET", "tours/{tour}/rooming-list/?format=ndjson"),
+    Endpoint("GET", "tours/{tour}/export/"),
+    Endpoint(
+        "POST",
+        "tours/import/?name=Bench+Import",
+        lambda ids: "".join(export_tour(ids["tour"])).encode("utf-8"),
+        "application/x-ndjson",
+    ),
+    Endpoint("POST", "tours/{tour}/clone/", lambda ids: {"includeDays": True}),
+    Endpoint("GET", "tours/{tour}/personnel/"),
+    Endpoint("POST", "tours/{tour}/personnel/", lambda ids: {"name": "Bench Person", "roleTitle": "Runner"}),
+    Endpoint("PUT", "tours/{tour}/personnel/{person}/", lambda ids: {"roleTitle": "Runner"}),
+    Endpoint("DELETE", "tours/{tour}/personnel/{person}/"),
+    Endpoint("GET", "tours/{tour}/people/{person}/itinerary/"),
+    Endpoint("GET", "tours/{tour}/groups/"),
+    Endpoint("POST", "tours/{tour}/groups/", lambda ids: {"name": "Bench Group"}),
+    Endpoint("PUT", "tours/{tour}/groups/{group}/", lambda ids: {"color": "blue"}),
+    Endpoint("DELETE", "tours/{tour}/groups/{group}/"),
+    Endpoint("GET", "days/{day}/schedule/"),
+    Endpoint("GET", "days/{day}/schedule/?group={group}"),
+    Endpoint("GET", "days/{day}/context/"),
+    Endpoint("GET", "days/{day}/sheet/"),
+    Endpoint("POST", "days/{day}/schedule/batch/", _batch),
+    Endpoint("GET", "tours/{tour}/schedule-templates/"),
+    Endpoint("GET", "tours/{tour}/schedule-templates/?summary=1"),
+    Endpoint(
+        "POST",
+        "days/{day}/schedule-templates/",
+        lambda ids: {"name": "Bench Template", "events": [{"name": "Doors", "startLocal": "19:00"}]},
+    ),
+    Endpoint("GET", "tours/{tour}/schedule-templates/{template}/"),
+    Endpoint("DELETE", "tours/{tour}/schedule-templates/{template}/"),
+    Endpoint(
+        "POST",
+        "tours/{tour}/schedule-templates/{template}/apply/",
+        lambda ids: {"from": ids["first"], "to": ids["last"]},
+    ),
+    Endpoint("GET", "hotels/search/?q=hilton&tourId={tour}"),
+    Endpoint("GET", "hotels/search/async/?q=hilton&tourId={tour}"),
+    Endpoint("GET", "hotels/search/stats/"),
+    Endpoint("GET", "stats/requests/"),
+    Endpoint(
+        "POST",
+        "days/{day}/lodging/",
+        lambda ids: {"hotel": {"id": ids["hotel"]}, "rooms": 4, "guests": _guests(ids)},
+    ),
+    Endpoint("DELETE", "days/{day}/lodging/"),
+    Endpoint(
+        "POST",
+        "tours/{tour}/lodging/block/",
+        lambda ids: {"from": ids["first"], "to": ids["last"], "hotel": {"id": ids["hotel"]}, "guests": _guests(ids)},
+    ),
+    Endpoint(
+        "POST",
+        "days/{day}/notes/",
+        lambda ids: {"title": "Bench Note", "visibility": [{"kind": "group", "id": ids["group"]}]},
+    ),
+    Endpoint("DELETE", "days/{day}/notes/{note}/"),
+    Endpoint("POST", "days/{day}/aftershow/", lambda ids: {"aftershow": "Hotel bar after the show"}),
+]
+
+
+def endpoint_name(ep):
+    return f"{ep.method} {ep.path}"
+
+
+def fixture_ids(fixture):
+    """Path and body parameters for a tour built by core.synthetic.build_tour()."""
+    day_events = [str(e) for e in fixture.events[: max(len(fixture.events) // max(len(fixture.days), 1), 1)]]
+    return {
+        "tour": str(fixture.tour),
+        "day": str(fixture.days[0]),
+        "first": "2000-01-01",
+        "last": "2100-01-01",
+        "person": str(fixture.people[0]),
+        "guests": [str(p) for p in fixture.people[:4]],
+        "group": str(fixture.groups[0]),
+        "template": str(fixture.templates[0]),
+        "note": str(fixture.notes[0]),
+        "hotel": str(fixture.hotels[0]),
+        "event": day_events[0],
+        "other_event": day_events[-1],
+    }
+
+
+def missing_routes():
+    """Routes in core.urls with no benchmarked endpoint and no reason to skip them."""
+    placeholder = "00000000-0000-4000-8000-000000000000"
+    ids = {
+        key: placeholder for key in ("tour", "day", "person", "group", "template", "note", "hotel", "event")
+    }
+    covered = {resolve(PREFIX + ep.path.format(**ids).split("?")[0]).route for ep in ENDPOINTS}
+    return [
+        str(p.pattern)
+        for p in urls.urlpatterns
+        if PREFIX.lstrip("/") + str(p.pattern) not in covered and str(p.pattern) not in SKIPPED
+    ]
+
+
+def measure(client, ep, ids, runs=3):
+    """
+    Issue one endpoint `runs` times, each inside a rolled-back transaction so
+    writes do not accumulate, and return its status, queries, median wall
+    time and response size.
+    """
+    path = PREFIX + ep.path.format(**ids)
+    data = ep.body(ids) if ep.body else None
+    if data is not None and not isinstance(data, bytes):
+        data = json.dumps(data)
+
+    timings, queries, status, size = [], 0, None, 0
+    for _ in range(runs):
+        with transaction.atomic():
+            with CaptureQueriesContext(connection) as ctx:
+                started = time.perf_counter()
+                res = client.generic(ep.method, path, data or "", content_type=ep.content_type)
+                content = b"".join(res.streaming_content) if res.streaming else res.content
+                timings.append((time.perf_counter() - started) * 1000)
+            transaction.set_rollback(True)
+        queries = max(queries, len(ctx))
+        status, size = res.status_code, len(content)
+
+    return {"status": status, "queries": queries, "ms": round(statistics.median(timings), 2), "bytes": size}
+
+
+def run(fixture, runs=3, only=None):
+    """Measure every endpoint against a synthetic tour; `only` filters by substring of the name."""
+    client = Client(SERVER_NAME="localhost")
+    ids = fixture_ids(fixture)
+    results = {}
+    # The external geocoder is never part of the measurement.
+    with override_settings(MAPBOX_ACCESS_TOKEN=""):
+        for ep in ENDPOINTS:
+            name = endpoint_name(ep)
+            if only and only not in name:
+                continue
+            results[name] = measure(client, ep, ids, runs=runs)
+    return results
+
+
+def load_baseline(path=BASELINE_PATH):
+    with open(path) as f:
+        return json.load(f)
+
+
+def save_baseline(results, size, path=BASELINE_PATH):
+    data = {
+        "vendor": connection.vendor,
+        "size": size,
+        "endpoints": {name: {k: r[k] for k in ("queries", "ms", "bytes")} for name, r in sorted(results.items())},
+    }
+    with open(path, "w") as f:
+        json.dump(data, f, indent=2)
+        f.write("\n")
+
+
+def check(results, baseline, time_factor=None, bytes_factor=None):
+    """
+    Budget violations as messages. Query counts may never exceed the baseline.
+    Wall time and response size depend on the machine and on what else is in
+    the database, so they are only checked when a factor is given. Budgets
+    only hold on the database vendor they were recorded on.
+    """
+    vendor = baseline.get("vendor")
+    if vendor != connection.vendor:
+        return [
+            f"baseline was recorded on {vendor}, not {connection.vendor}; "
+            "record one with `manage.py bench_endpoints --update-baseline`"
+        ]
+
+    failures = []
+    for name, r in results.items():
+        base = baseline["endpoints"].get(name)
+        if r["status"] >= 400:
+            failures.append(f"{name}: status {r['status']}")
+        if base is None:
+            failures.append(f"{name}: no baseline")
+            continue
+        if r["queries"] > base["queries"]:
+            failures.append(f"{name}: {r['queries']} queries, budget {base['queries']}")
+        if bytes_factor and r["bytes"] > base["bytes"] * bytes_factor:
+            failures.append(f"{name}: {r['bytes']} bytes, budget {base['bytes'] * bytes_factor:.0f}")
+        if time_factor and r["ms"] > base["ms"] * time_factor:
+            failures.append(f"{name}: {r['ms']:.1f}ms, budget {base['ms'] * time_factor:.1f}ms")
+    return failures
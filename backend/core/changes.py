@@ -0,0 +1,185 @@
+from django.db import transaction
+from django.db.models import Prefetch
+
+from core.models import (
+    Tour,
+    TourChange,
+    ScheduleEvent,
+    Note,
+    Day,
+    DayLodging,
+    Person,
+    Group,
+    ScheduleTemplate,
+    ScheduleTemplateEvent,
+)
+from core.pubsub import get_broker
+from core.serializers import (
+    ScheduleEventSerializer,
+    NoteSerializer,
+    DaySerializer,
+    DayLodgingSerializer,
+    PersonSerializer,
+    GroupSerializer,
+    ScheduleTemplateSerializer,
+)
+
+CREATE = TourChange.Op.CREATE
+UPDATE = TourChange.Op.UPDATE
+DELETE = TourChange.Op.DELETE
+
+SCHEDULE_EVENT = "scheduleEvent"
+NOTE = "note"
+DAY = "day"
+DAY_LODGING = "dayLodging"
+PERSON = "person"
+GROUP = "group"
+SCHEDULE_TEMPLATE = "scheduleTemplate"
+
+# Larger revisions are announced without their entries; clients pull them from the changes feed.
+MAX_MESSAGE_CHANGES = 50
+
+
+def record_changes(changes, tour_id=None, day_id=None):
+    """
+    Bump the tour revision and log `changes` ((entity, id, op) tuples) under it.
+
+    Must run inside the caller's transaction: the tour row is locked until
+    commit, so concurrent writers get strictly increasing revisions.
+    """
+    if not changes:
+        return None
+
+    lookup = {"id": tour_id} if tour_id else {"days__id": day_id}
+    tour_id, revision = (
+        Tour.objects.select_for_update(of=("self",))
+        .filter(**lookup)
+        .values_list("id", "revision")
+        .get()
+    )
+    revision += 1
+    Tour.objects.filter(id=tour_id).update(revision=revision)
+
+    TourChange.objects.bulk_create(
+        [
+            TourChange(tour_id=tour_id, revision=revision, entity=entity, entity_id=entity_id, op=op)
+            for entity, entity_id, op in changes
+        ]
+    )
+
+    message = compact_message(revision, changes)
+    transaction.on_commit(lambda: get_broker().publish(tour_id, message), robust=True)
+    return revision
+
+
+def compact_message(revision, changes):
+    if len(changes) > MAX_MESSAGE_CHANGES:
+        return {"revision": revision, "truncated": True}
+    return {
+        "revision": revision,
+        "changes": [{"entity": entity, "id": str(entity_id), "op": str(op)} for entity, entity_id, op in changes],
+    }
+
+
+def replay_messages(tour_id, since, limit=1000):
+    """
+    Rebuild the stream messages after `since` from the log, or a single
+    resync message when the gap is too large to replay.
+    """
+    rows = list(
+        TourChange.objects.filter(tour_id=tour_id, revision__gt=since)
+        .order_by("revision")
+        .values_list("revision", "entity", "entity_id", "op")[: limit + 1]
+    )
+    if len(rows) > limit:
+        return [{"resync": True}]
+
+    by_revision = {}
+    for revision, entity, entity_id, op in rows:
+        by_revision.setdefault(revision, []).append((entity, entity_id, op))
+    return [compact_message(revision, changes) for revision, changes in by_revision.items()]
+
+
+def _many(serializer_class):
+    return lambda rows: serializer_class(rows, many=True).data
+
+
+# entity -> (current rows, field the logged entity id refers to, serialize rows)
+ENTITIES = {
+    SCHEDULE_EVENT: (lambda: ScheduleEvent.objects.all(), "id", _many(ScheduleEventSerializer)),
+    NOTE: (lambda: Note.objects.all(), "id", _many(NoteSerializer)),
+    DAY: (
+        lambda: Day.objects.all(),
+        "id",
+        lambda rows: [{**DaySerializer(d).data, "aftershow": d.aftershow} for d in rows],
+    ),
+    DAY_LODGING: (
+        lambda: DayLodging.objects.select_related("hotel").prefetch_related("guests"),
+        "day_id",
+        _many(DayLodgingSerializer),
+    ),
+    PERSON: (lambda: Person.objects.all(), "id", _many(PersonSerializer)),
+    GROUP: (lambda: Group.objects.all(), "id", _many(GroupSerializer)),
+    SCHEDULE_TEMPLATE: (
+        lambda: ScheduleTemplate.objects.prefetch_related(
+            Prefetch("events", queryset=ScheduleTemplateEvent.objects.order_by("order"))
+        ),
+        "id",
+        _many(ScheduleTemplateSerializer),
+    ),
+}
+
+
+def changes_since(tour_id, since, limit=1000):
+    """
+    Collapse the log after `since` to the latest op per entity and attach the
+    current state of every entity that still exists, one query per kind.
+    Clients should treat "create" and "update" alike as upserts.
+
+    Reads at most `limit` log rows, ending on a whole revision; "next" is the
+    revision to ask from for the rest, or None once caught up. A client behind
+    a single revision larger than that gets {"resync": True} instead.
+    """
+    log = list(TourChange.objects.filter(tour_id=tour_id, revision__gt=since).order_by("revision")[: limit + 1])
+    next_revision = None
+    if len(log) > limit:
+        # Leave out the revision the page would split.
+        cut = log[limit].revision
+        log = [change for change in log if change.revision < cut]
+        if not log:
+            return {"resync": True}
+        next_revision = log[-1].revision
+
+    latest = {}
+    for change in log:
+        latest.pop((change.entity, change.entity_id), None)
+        latest[(change.entity, change.entity_id)] = change
+
+    wanted = {}
+    for (entity, entity_id), change in latest.items():
+        if change.op != DELETE and entity in ENTITIES:
+            wanted.setdefault(entity, []).append(entity_id)
+
+    current = {}
+    for entity, ids in wanted.items():
+        queryset, field, serialize = ENTITIES[entity]
+        rows = list(queryset().filter(**{f"{field}__in": ids}))
+        for obj, item in zip(rows, serialize(rows)):
+            current[(entity, getattr(obj, field))] = item
+
+    out = []
+    for key, change in latest.items():
+        data = current.get(key)
+        op = change.op
+        if op != DELETE and data is None:
+            op = DELETE
+        out.append(
+            {
+                "revision": change.revision,
+                "entity": change.entity,
+                "id": str(change.entity_id),
+                "op": op,
+                "data": data if op != DELETE else None,
+            }
+        )
+    return {"changes": out, "next": next_revision}
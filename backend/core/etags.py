@@ -0,0 +1,78 @@
+import hashlib
+import uuid
+
+from django.db.models import Count, Max, OuterRef, Subquery
+
+from core.models import Tour, Day, ScheduleEvent, ScheduleEventAssociation, Contact, Note, DayLodging, Group, Person
+
+
+def _aggregate(model, fk, outer, agg):
+    qs = model.objects.filter(**{fk: OuterRef(outer)}).order_by().values(fk).annotate(v=agg).values("v")
+    return Subquery(qs)
+
+
+def _stamps(**sources):
+    """
+    Count and latest timestamp per related table, as annotations. Together
+    they change on every insert, update and delete.
+    """
+    out = {}
+    for name, (model, fk, outer, field) in sources.items():
+        out[f"{name}_n"] = _aggregate(model, fk, outer, Count("pk"))
+        out[f"{name}_ts"] = _aggregate(model, fk, outer, Max(field))
+    return out
+
+
+def _etag(request, row):
+    if row is None:
+        return None
+    parts = [request.path, request.GET.urlencode()]
+    parts += [f"{k}={v.isoformat() if hasattr(v, 'isoformat') else v}" for k, v in sorted(row.items())]
+    return '"' + hashlib.sha1("|".join(parts).encode("utf-8")).hexdigest() + '"'
+
+
+def tour_days_etag(request, tour_id):
+    row = (
+        Tour.objects.filter(id=tour_id)
+        .annotate(**_stamps(days=(Day, "tour_id", "pk", "updated_at")))
+        .values("days_n", "days_ts")
+        .first()
+    )
+    return _etag(request, row)
+
+
+def day_schedule_etag(request, day_id):
+    stamps = _stamps(events=(ScheduleEvent, "day_id", "pk", "updated_at"))
+    stamps["index_n"] = _aggregate(ScheduleEventAssociation, "event__day_id", "pk", Count("pk"))
+    try:
+        person_id = uuid.UUID(request.GET.get("person") or "")
+    except ValueError:
+        person_id = None
+    if person_id:
+        # ?person= also matches events for the person's group, so a move between groups changes the result.
+        person = Person.objects.filter(id=person_id)
+        stamps["person_ts"] = Subquery(person.values("updated_at")[:1])
+        stamps["person_group"] = Subquery(person.values("group_id")[:1])
+    row = Day.objects.filter(id=day_id).annotate(**stamps).values(*stamps).first()
+    return _etag(request, row)
+
+
+def tour_personnel_etag(request, tour_id):
+    stamps = _stamps(
+        groups=(Group, "tour_id", "pk", "updated_at"),
+        people=(Person, "tour_id", "pk", "updated_at"),
+    )
+    row = Tour.objects.filter(id=tour_id).annotate(**stamps).values(*stamps).first()
+    return _etag(request, row)
+
+
+def day_context_etag(request, day_id):
+    stamps = _stamps(
+        contacts=(Contact, "day_id", "pk", "updated_at"),
+        notes=(Note, "day_id", "pk", "last_edited_at"),
+        lodging=(DayLodging, "day_id", "pk", "updated_at"),
+        groups=(Group, "tour_id", "tour_id", "updated_at"),
+        people=(Person, "tour_id", "tour_id", "updated_at"),
+    )
+    row = Day.objects.filter(id=day_id).annotate(**stamps).values("venue_id", "updated_at", *stamps).first()
+    return _etag(request, row)
@@ -0,0 +1,186 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import caches
+
+MIN_PREFIX = 2
+
+
+def normalize_query(q: str) -> str:
+    return " ".join((q or "").lower().split())
+
+
+def _matches(item, q: str) -> bool:
+    haystack = normalize_query(f"{item.get('name', '')} {item.get('addressLine', '')}")
+    return q in haystack
+
+
+class LocalBackend:
+    """Bounded in-process LRU with per-entry expiry."""
+
+    def __init__(self, max_entries):
+        self.max_entries = max_entries
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self.evictions = 0
+
+    def get_many(self, keys):
+        now = time.monotonic()
+        out = {}
+        with self._lock:
+            for key in keys:
+                entry = self._data.get(key)
+                if entry is None:
+                    continue
+                expires_at, value = entry
+                if expires_at <= now:
+                    del self._data[key]
+                    continue
+                self._data.move_to_end(key)
+                out[key] = value
+        return out
+
+    def set(self, key, value, ttl):
+        with self._lock:
+            self._data[key] = (time.monotonic() + ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    async def aget_many(self, keys):
+        return self.get_many(keys)
+
+    async def aset(self, key, value, ttl):
+        self.set(key, value, ttl)
+
+
+class DjangoCacheBackend:
+    """Shares entries across workers; expiry and eviction are left to the cache."""
+
+    evictions = 0
+
+    def __init__(self, alias):
+        self.alias = alias
+
+    @property
+    def cache(self):
+        return caches[self.alias]
+
+    def get_many(self, keys):
+        return self.cache.get_many(keys)
+
+    def set(self, key, value, ttl):
+        self.cache.set(key, value, ttl)
+
+    def clear(self):
+        self.cache.clear()
+
+    async def aget_many(self, keys):
+        return await self.cache.aget_many(keys)
+
+    async def aset(self, key, value, ttl):
+        await self.cache.aset(key, value, ttl)
+
+
+class GeocodeCache:
+    """
+    Caches external hotel lookups by normalized query and limit.
+
+    Empty results are cached for a shorter time and only answer their own
+    query. A non-empty result for a shorter prefix that came back with fewer
+    than `limit` features is exhaustive. Longer queries are answered by
+    filtering it, so "Hil", "Hilt", "Hilto" cost one external request.
+    """
+
+    def __init__(self, backend, ttl, negative_ttl):
+        self.backend = backend
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self._lock = threading.Lock()
+        self.counters = {"hits": 0, "prefix_hits": 0, "negative_hits": 0, "misses": 0}
+
+    def _key(self, q, limit):
+        digest = hashlib.sha1(q.encode("utf-8")).hexdigest()
+        return f"hotels:geocode:{limit}:{digest}"
+
+    def _candidates(self, q, limit):
+        prefixes = [q[:n] for n in range(len(q), MIN_PREFIX - 1, -1)]
+        return [(p, self._key(p, limit)) for p in prefixes]
+
+    def _count(self, name):
+        with self._lock:
+            self.counters[name] += 1
+
+    def _resolve(self, q, limit, found):
+        for prefix, key in self._candidates(q, limit):
+            if key not in found:
+                continue
+            results = found[key]
+            if prefix == q:
+                self._count("hits" if results else "negative_hits")
+                return results
+            # An empty answer for a prefix may be a transient upstream miss, so it says nothing about q.
+            if results and len(results) < limit:
+                self._count("prefix_hits")
+                return [x for x in results if _matches(x, q)]
+        self._count("misses")
+        return None
+
+    def get(self, q, limit):
+        q = normalize_query(q)
+        keys = [key for _, key in self._candidates(q, limit)]
+        return self._resolve(q, limit, self.backend.get_many(keys))
+
+    async def aget(self, q, limit):
+        q = normalize_query(q)
+        keys = [key for _, key in self._candidates(q, limit)]
+        return self._resolve(q, limit, await self.backend.aget_many(keys))
+
+    def set(self, q, limit, results):
+        self.backend.set(self._key(normalize_query(q), limit), results, self.ttl if results else self.negative_ttl)
+
+    async def aset(self, q, limit, results):
+        await self.backend.aset(self._key(normalize_query(q), limit), results, self.ttl if results else self.negative_ttl)
+
+    def stats(self):
+        with self._lock:
+            out = dict(self.counters)
+        lookups = sum(out.values())
+        out["evictions"] = self.backend.evictions
+        out["hitRate"] = round((lookups - out["misses"]) / lookups, 4) if lookups else 0.0
+        return out
+
+    def clear(self):
+        self.backend.clear()
+        with self._lock:
+            for name in self.counters:
+                self.counters[name] = 0
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_geocode_cache():
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            alias = getattr(settings, "HOTEL_GEOCODE_CACHE", "") or "local"
+            if alias == "local":
+                backend = LocalBackend(getattr(settings, "HOTEL_GEOCODE_CACHE_MAX_ENTRIES", 4096))
+            else:
+                backend = DjangoCacheBackend(alias)
+            _cache = GeocodeCache(
+                backend,
+                ttl=getattr(settings, "HOTEL_GEOCODE_CACHE_TTL", 24 * 60 * 60),
+                negative_ttl=getattr(settings, "HOTEL_GEOCODE_CACHE_NEGATIVE_TTL", 60 * 60),
+            )
+        return _cache
@@ -0,0 +1,241 @@
+import heapq
+import sys
+import threading
+import time
+from array import array
+from bisect import bisect_left, bisect_right
+from collections import namedtuple
+
+from django.conf import settings
+from django.db import connection, transaction
+
+from core.models import Hotel
+from core.serializers import _address_line
+
+IndexedHotel = namedtuple("IndexedHotel", "id name address1 city state postal place_id source tour_id")
+
+GLOBAL = ""
+_FIELDS = ["id", "name", "address1", "city", "state", "postal", "place_id", "source", "tour_id"]
+
+
+def _compact(row, shared):
+    # City, state, source and tour repeat across most rows; keep one copy of each.
+    id, name, address1, city, state, postal, place_id, source, tour_id = row
+    city, state, place_id, source, tour_id = (shared.setdefault(v, v) for v in (city, state, place_id, source, tour_id))
+    return IndexedHotel(id, name, address1, city, state, postal, place_id, source, tour_id)
+
+
+def _tokens(h):
+    return {sys.intern(t) for t in f"{h.name} {h.city} {h.postal}".lower().split()}
+
+
+def _leading(h):
+    words = h.name.lower().split()
+    return sys.intern(words[0]) if words else ""
+
+
+class _Partition:
+    """Sorted token arrays with parallel arrays of hotel numbers."""
+
+    def __init__(self):
+        self.tokens = []
+        self.hotels = array("I")
+        # First word of each name, used to rank name-prefix matches first.
+        self.leading = []
+        self.leading_hotels = array("I")
+
+    @classmethod
+    def from_pairs(cls, pairs, leading):
+        part = cls()
+        pairs.sort()
+        leading.sort()
+        part.tokens = [token for token, _ in pairs]
+        part.hotels = array("I", (hotel_no for _, hotel_no in pairs))
+        part.leading = [token for token, _ in leading]
+        part.leading_hotels = array("I", (hotel_no for _, hotel_no in leading))
+        return part
+
+    def add(self, h, hotel_no):
+        for token in _tokens(h):
+            i = bisect_right(self.tokens, token)
+            self.tokens.insert(i, token)
+            self.hotels.insert(i, hotel_no)
+        token = _leading(h)
+        i = bisect_right(self.leading, token)
+        self.leading.insert(i, token)
+        self.leading_hotels.insert(i, hotel_no)
+
+    def match(self, q_tokens):
+        found = None
+        for token in q_tokens:
+            hits = set(_prefix(self.tokens, self.hotels, token))
+            found = hits if found is None else found & hits
+            if not found:
+                return set(), set()
+        return found, found.intersection(_prefix(self.leading, self.leading_hotels, q_tokens[0]))
+
+
+def _prefix(tokens, hotels, token):
+    lo = bisect_left(tokens, token)
+    hi = bisect_left(tokens, token + "\uffff", lo)
+    return hotels[lo:hi]
+
+
+class HotelAutocompleteIndex:
+    """
+    In-process autocomplete over hotel name, city and postal tokens.
+
+    Hotels are partitioned by tour, plus a global partition for tourless
+    hotels. Every query token must prefix-match a token of the hotel. Hotel
+    numbers are assigned in name order at build time, so the smallest numbers
+    are the first results; hotels added since the last build sort last within
+    their rank until the next rebuild.
+    """
+
+    def __init__(self):
+        self.hotels = []
+        self.partitions = {}
+        self.built_at = None
+        self._lock = threading.Lock()
+        self._rebuilding = False
+
+    @classmethod
+    def from_rows(cls, rows):
+        index = cls()
+        shared = {}
+        index.hotels = sorted((_compact(row, shared) for row in rows), key=lambda h: (h.name.lower(), h.name))
+        pending = {}
+        for hotel_no, h in enumerate(index.hotels):
+            pairs, leading = pending.setdefault(_partition_key(h), ([], []))
+            pairs.extend((token, hotel_no) for token in _tokens(h))
+            leading.append((_leading(h), hotel_no))
+
+        index.partitions = {key: _Partition.from_pairs(*lists) for key, lists in pending.items()}
+        index.built_at = time.monotonic()
+        return index
+
+    @classmethod
+    def build(cls):
+        return cls.from_rows(Hotel.objects.values_list(*_FIELDS).order_by().iterator(chunk_size=5000))
+
+    def add(self, hotel):
+        h = IndexedHotel(*[getattr(hotel, f) for f in _FIELDS])
+        with self._lock:
+            hotel_no = len(self.hotels)
+            self.hotels.append(h)
+            self.partitions.setdefault(_partition_key(h), _Partition()).add(h, hotel_no)
+
+    def search(self, q, tour_id="", limit=20):
+        q_tokens = q.lower().split()
+        if not q_tokens:
+            return []
+
+        with self._lock:
+            if tour_id:
+                tiers = [[str(tour_id)], [GLOBAL]]
+            else:
+                tiers = [list(self.partitions)]
+
+            out = []
+            for keys in tiers:
+                found, leading = set(), set()
+                for key in keys:
+                    part = self.partitions.get(key)
+                    if part is not None:
+                        f, lead = part.match(q_tokens)
+                        found |= f
+                        leading |= lead
+                out.extend(heapq.nsmallest(limit - len(out), leading))
+                if len(out) < limit:
+                    out.extend(heapq.nsmallest(limit - len(out), found - leading))
+                if len(out) >= limit:
+                    break
+            return [self.hotels[hotel_no] for hotel_no in out]
+
+    def is_stale(self, ttl):
+        return self.built_at is None or time.monotonic() - self.built_at > ttl
+
+
+def _partition_key(h):
+    return str(h.tour_id) if h.tour_id else GLOBAL
+
+
+def as_search_result(h):
+    return {
+        "key": f"db:{h.id}",
+        "id": str(h.id),
+        "name": h.name,
+        "address1": h.address1,
+        "city": h.city,
+        "state": h.state,
+        "postal": h.postal,
+        "placeId": h.place_id or "",
+        "source": h.source,
+        "addressLine": _address_line(h),
+    }
+
+
+_index = None
+_index_lock = threading.Lock()
+
+
+def _rebuild():
+    global _index
+    try:
+        fresh = HotelAutocompleteIndex.build()
+        with _index_lock:
+            _index = fresh
+    finally:
+        with _index_lock:
+            if _index is not None:
+                _index._rebuilding = False
+        # No request_finished signal closes connections opened by this thread.
+        connection.close()
+
+
+def get_hotel_index():
+    """
+    The process-wide index, or None when disabled. The first call builds it
+    inline; afterwards a stale index keeps serving while a background thread
+    rebuilds it, so writes from other workers show up within the TTL.
+    """
+    global _index
+    if not getattr(settings, "HOTEL_AUTOCOMPLETE_INDEX", False):
+        return None
+
+    with _index_lock:
+        index = _index
+    if index is None:
+        index = HotelAutocompleteIndex.build()
+        with _index_lock:
+            if _index is None:
+                _index = index
+            return _index
+
+    ttl = getattr(settings, "HOTEL_AUTOCOMPLETE_INDEX_TTL", 300)
+    with _index_lock:
+        start = index.is_stale(ttl) and not index._rebuilding
+        if start:
+            index._rebuilding = True
+    if start:
+        threading.Thread(target=_rebuild, daemon=True).start()
+    return index
+
+
+def index_hotel(hotel):
+    """Add a newly created hotel once its transaction commits."""
+    if getattr(settings, "HOTEL_AUTOCOMPLETE_INDEX", False):
+        transaction.on_commit(lambda: _add(hotel))
+
+
+def _add(hotel):
+    with _index_lock:
+        index = _index
+    if index is not None:
+        index.add(hotel)
+
+
+def reset_hotel_index():
+    global _index
+    with _index_lock:
+        _index = None
@@ -0,0 +1,232 @@
+import asyncio
+import atexit
+import json
+import threading
+from urllib.parse import quote, urlencode
+from urllib.request import Request, urlopen
+
+import httpx
+from django.conf import settings
+from django.db import connection
+from django.db.models import Q, F, Value, Func, Case, When, IntegerField, FloatField
+
+from core.hotel_cache import get_geocode_cache
+from core.hotel_index import as_search_result, get_hotel_index
+from core.models import Hotel
+from core.serializers import HotelSearchResultSerializer
+
+MAPBOX_GEOCODING_URL = "https://api.mapbox.com/geocoding/v5/mapbox.places"
+LOCAL_LIMIT = 20
+EXTERNAL_LIMIT = 8
+
+
+def _mapbox_request(q: str, limit: int):
+    token = getattr(settings, "MAPBOX_ACCESS_TOKEN", "") or ""
+    if not token:
+        return None
+
+    params = {
+        "access_token": token,
+        "limit": str(limit),
+        "types": "poi",
+        "autocomplete": "true",
+        "language": "en",
+    }
+    base = getattr(settings, "MAPBOX_GEOCODING_URL", "") or MAPBOX_GEOCODING_URL
+    return f"{base}/{quote(q, safe='')}.json?{urlencode(params)}"
+
+
+def _parse_mapbox_features(data, limit: int):
+    out = []
+    for f in data.get("features", [])[:limit]:
+        place_id = f.get("id", "") or ""
+        text = f.get("text", "") or ""
+        place_name = f.get("place_name", "") or ""
+        ctx = f.get("context", []) or []
+
+        city = ""
+        state = ""
+        postal = ""
+
+        for c in ctx:
+            cid = c.get("id", "") or ""
+            if cid.startswith("place."):
+                city = c.get("text", "") or ""
+            if cid.startswith("region."):
+                state = c.get("text", "") or ""
+            if cid.startswith("postcode."):
+                postal = c.get("text", "") or ""
+
+        out.append(
+            {
+                "key": f"ext:{place_id or text}",
+                "id": None,
+                "name": text or place_name,
+                "address1": place_name,
+                "city": city,
+                "state": state,
+                "postal": postal,
+                "placeId": place_id,
+                "source": "external",
+                "addressLine": place_name,
+            }
+        )
+    return out
+
+
+def fetch_mapbox_hotels(q: str, limit: int = EXTERNAL_LIMIT):
+    url = _mapbox_request(q, limit)
+    if not url:
+        return []
+
+    cache = get_geocode_cache()
+    cached = cache.get(q, limit)
+    if cached is not None:
+        return cached
+
+    req = Request(url, headers={"User-Agent": "daysheets-demo"})
+    with urlopen(req, timeout=4) as resp:
+        raw = resp.read().decode("utf-8")
+    results = _parse_mapbox_features(json.loads(raw), limit)
+    cache.set(q, limit, results)
+    return results
+
+
+class _PooledClient:
+    """
+    One keep-alive httpx.AsyncClient for the process. It lives on its own
+    event loop in a background thread, because under WSGI each async view
+    runs on a throwaway loop that a pooled connection must not be tied to.
+    Callers on any loop await get(), which runs the request on the client's loop.
+    """
+
+    def __init__(self):
+        self.loop = asyncio.new_event_loop()
+        self.client = httpx.AsyncClient(
+            timeout=4,
+            headers={"User-Agent": "daysheets-demo"},
+            limits=httpx.Limits(max_connections=20, max_keepalive_connections=10, keepalive_expiry=30),
+        )
+        threading.Thread(target=self.loop.run_forever, name="mapbox-client", daemon=True).start()
+
+    async def get(self, url):
+        future = asyncio.run_coroutine_threadsafe(self.client.get(url), self.loop)
+        return await asyncio.wrap_future(future)
+
+    def close(self):
+        asyncio.run_coroutine_threadsafe(self.client.aclose(), self.loop).result(timeout=5)
+        self.loop.call_soon_threadsafe(self.loop.stop)
+
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def _mapbox_client():
+    global _client
+    with _client_lock:
+        if _client is None:
+            _client = _PooledClient()
+            atexit.register(_client.close)
+        return _client
+
+
+async def afetch_mapbox_hotels(q: str, limit: int = EXTERNAL_LIMIT):
+    url = _mapbox_request(q, limit)
+    if not url:
+        return []
+
+    cache = get_geocode_cache()
+    cached = await cache.aget(q, limit)
+    if cached is not None:
+        return cached
+
+    resp = await _mapbox_client().get(url)
+    resp.raise_for_status()
+    results = _parse_mapbox_features(resp.json(), limit)
+    await cache.aset(q, limit, results)
+    return results
+
+
+def _legacy_match(qs, q):
+    return qs.filter(
+        Q(name__icontains=q)
+        | Q(address1__icontains=q)
+        | Q(city__icontains=q)
+        | Q(state__icontains=q)
+        | Q(postal__icontains=q)
+    ), ["name"]
+
+
+def _indexed_match(qs, q):
+    """
+    Match against the generated search_text column. On Postgres the LIKE is
+    served by the pg_trgm GIN index and results are ranked by trigram
+    similarity; elsewhere a name-prefix/name-contains rank stands in.
+    """
+    needle = " ".join(q.lower().split())
+    qs = qs.filter(search_text__contains=needle)
+
+    if connection.vendor == "postgresql":
+        qs = qs.annotate(_rank=Func(F("search_text"), Value(needle), function="similarity", output_field=FloatField()))
+        return qs, ["-_rank", "name"]
+
+    qs = qs.annotate(
+        _rank=Case(
+            When(name__istartswith=needle, then=0),
+            When(name__icontains=needle, then=1),
+            default=2,
+            output_field=IntegerField(),
+        )
+    )
+    return qs, ["_rank", "name"]
+
+
+def search_local_hotels(q: str, tour_id: str = "", mode: str = ""):
+    if not mode:
+        index = get_hotel_index()
+        if index is not None:
+            hits = index.search(q, tour_id, limit=LOCAL_LIMIT)
+            # Token-prefix misses (e.g. a street fragment) still get the substring query.
+            if hits:
+                return [as_search_result(h) for h in hits]
+
+    mode = mode or getattr(settings, "HOTEL_SEARCH_MODE", "") or "indexed"
+    match = _legacy_match if mode == "legacy" else _indexed_match
+    qs, ordering = match(Hotel.objects.all(), q)
+
+    if tour_id:
+        qs = qs.filter(Q(tour_id=tour_id) | Q(tour__isnull=True))
+        qs = qs.annotate(
+            _prio=Case(
+                When(tour_id=tour_id, then=0),
+                default=1,
+                output_field=IntegerField(),
+            )
+        )
+        ordering = ["_prio", *ordering]
+
+    qs = qs.order_by(*ordering)[:LOCAL_LIMIT]
+
+    return HotelSearchResultSerializer(qs, many=True).data
+
+
+def merge_hotel_results(local, ext):
+    seen = set()
+    merged = []
+
+    for x in local:
+        k = x.get("key") or ""
+        seen.add(k)
+        pid = x.get("placeId") or ""
+        if pid:
+            seen.add(f"ext:{pid}")
+        merged.append(x)
+
+    for x in ext:
+        k = x.get("key") or ""
+        if k in seen:
+            continue
+        merged.append(x)
+
+    return merged[:LOCAL_LIMIT]
@@ -0,0 +1,231 @@
+import json
+import logging
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connection
+
+from core.observers import QueryObserverMiddleware
+
+logger = logging.getLogger("core.requests")
+
+# Upper bounds of the latency histogram buckets in ms; one more bucket holds the rest.
+BUCKETS_MS = [5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000]
+
+class _Timing:
+    """Per-request counters, fed by the connection execute wrapper while the request is handled."""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.queries = 0
+        self.db_ms = 0.0
+        self.render_ms = 0.0
+        self.serialize_ms = 0.0
+        self._render_started = None
+        self._serializing = False
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.db_ms += (time.perf_counter() - started) * 1000
+            self.queries += 1
+
+    @contextmanager
+    def serializing(self):
+        # Nested serializers count once, and queries they trigger stay under db.
+        if self._serializing:
+            yield
+            return
+        self._serializing = True
+        started, db_ms = time.perf_counter(), self.db_ms
+        try:
+            yield
+        finally:
+            self._serializing = False
+            self.serialize_ms += (time.perf_counter() - started) * 1000 - (self.db_ms - db_ms)
+
+    def start_render(self):
+        self._render_started = time.perf_counter()
+
+    def rendered(self, response):
+        if self._render_started is not None:
+            self.render_ms += (time.perf_counter() - self._render_started) * 1000
+
+
+class _EndpointStats:
+    def __init__(self, view):
+        self.view = view
+        self.count = 0
+        self.errors = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self.db_ms = 0.0
+        self.render_ms = 0.0
+        self.serialize_ms = 0.0
+        self.queries = 0
+        self.max_queries = 0
+        self.bytes = 0
+        self.sized = 0
+        self.buckets = [0] * (len(BUCKETS_MS) + 1)
+
+    def add(self, status, total_ms, timing, size):
+        self.count += 1
+        self.errors += status >= 500
+        self.total_ms += total_ms
+        self.max_ms = max(self.max_ms, total_ms)
+        self.db_ms += timing.db_ms
+        self.render_ms += timing.render_ms
+        self.serialize_ms += timing.serialize_ms
+        self.queries += timing.queries
+        self.max_queries = max(self.max_queries, timing.queries)
+        if size is not None:
+            self.bytes += size
+            self.sized += 1
+        self.buckets[bisect_left(BUCKETS_MS, total_ms)] += 1
+
+    def percentile(self, q):
+        # Upper bound of the bucket holding the q-th request; None past the last bound.
+        seen = 0
+        for bound, n in zip(BUCKETS_MS + [None], self.buckets):
+            seen += n
+            if seen >= q * self.count:
+                return bound
+        return None
+
+    def as_dict(self):
+        n = self.count or 1
+        return {
+            "view": self.view,
+            "count": self.count,
+            "errors": self.errors,
+            "avgMs": round(self.total_ms / n, 2),
+            "maxMs": round(self.max_ms, 2),
+            "p50Ms": self.percentile(0.5),
+            "p95Ms": self.percentile(0.95),
+            "avgDbMs": round(self.db_ms / n, 2),
+            "avgRenderMs": round(self.render_ms / n, 2),
+            "avgSerializeMs": round(self.serialize_ms / n, 2),
+            "avgQueries": round(self.queries / n, 2),
+            "maxQueries": self.max_queries,
+            "avgBytes": round(self.bytes / self.sized) if self.sized else None,
+            "histogram": [{"le": bound, "count": c} for bound, c in zip(BUCKETS_MS + [None], self.buckets)],
+        }
+
+
+class RequestStats:
+    """Per-endpoint aggregates for this process."""
+
+    def __init__(self):
+        self.endpoints = {}
+        self._lock = threading.Lock()
+
+    def record(self, endpoint, view, status, total_ms, timing, size):
+        with self._lock:
+            stats = self.endpoints.get(endpoint)
+            if stats is None:
+                stats = self.endpoints[endpoint] = _EndpointStats(view)
+            stats.add(status, total_ms, timing, size)
+
+    def stats(self):
+        with self._lock:
+            return {endpoint: s.as_dict() for endpoint, s in sorted(self.endpoints.items())}
+
+    def clear(self):
+        with self._lock:
+            self.endpoints = {}
+
+
+_stats = RequestStats()
+
+
+def get_request_stats():
+    return _stats
+
+
+def timing_enabled():
+    return getattr(settings, "REQUEST_TIMING", False)
+
+
+@contextmanager
+def serializing():
+    """Count the block as serialization time of the current request, if it is being timed."""
+    # The middleware keeps the request's timing on the connection its queries run on.
+    timing = next((w for w in connection.execute_wrappers if isinstance(w, _Timing)), None)
+    if timing is None:
+        yield
+        return
+    with timing.serializing():
+        yield
+
+
+class RequestTimingMiddleware(QueryObserverMiddleware):
+    """
+    Records query count, DB time, serialization time, render time and
+    response size per request, adds them as a Server-Timing header, logs one
+    JSON line to the "core.requests" logger and aggregates them by endpoint.
+
+    Opt-in with REQUEST_TIMING = True; otherwise Django drops the middleware
+    from the chain at startup.
+    """
+
+    def __init__(self, get_response):
+        if not timing_enabled():
+            raise MiddlewareNotUsed
+        super().__init__(get_response)
+        self.allow_origin = getattr(settings, "REQUEST_TIMING_ALLOW_ORIGIN", "")
+
+    def start(self, request):
+        request._timing = _Timing()
+        return request._timing
+
+    def finish(self, request, response, timing):
+        total_ms = (time.perf_counter() - timing.started) * 1000
+
+        # Streamed bodies are produced after this returns, so their size is unknown.
+        size = None if response.streaming else len(response.content)
+        match = request.resolver_match
+        endpoint = f"{request.method} {match.route if match else '<unresolved>'}"
+        view = match.view_name if match else ""
+
+        app_ms = max(total_ms - timing.db_ms - timing.serialize_ms - timing.render_ms, 0.0)
+        response["Server-Timing"] = (
+            f'db;dur={timing.db_ms:.1f};desc="{timing.queries} queries", '
+            f"serialize;dur={timing.serialize_ms:.1f}, render;dur={timing.render_ms:.1f}, "
+            f"app;dur={app_ms:.1f}, total;dur={total_ms:.1f}"
+        )
+        if self.allow_origin:
+            response["Timing-Allow-Origin"] = self.allow_origin
+
+        _stats.record(endpoint, view, response.status_code, total_ms, timing, size)
+        if logger.isEnabledFor(logging.INFO):
+            logger.info(
+                json.dumps(
+                    {
+                        "endpoint": endpoint,
+                        "view": view,
+                        "path": request.path,
+                        "status": response.status_code,
+                        "queries": timing.queries,
+                        "dbMs": round(timing.db_ms, 2),
+                        "serializeMs": round(timing.serialize_ms, 2),
+                        "renderMs": round(timing.render_ms, 2),
+                        "totalMs": round(total_ms, 2),
+                        "bytes": size,
+                    },
+                    separators=(",", ":"),
+                )
+            )
+        return response
+
+    def process_template_response(self, request, response):
+        # DRF responses are rendered (serialized to bytes) after the view returns.
+        timing = request._timing
+        timing.start_render()
+        response.add_post_render_callback(timing.rendered)
+        return response
@@ -0,0 +1,87 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+
+from core import benchmarks
+from core.synthetic import build_tour
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure query count, wall time and response size of every API endpoint against a synthetic tour "
+        "and compare them with the stored baseline"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--days", type=int, default=None, help="Days in the tour (defaults to the baseline's size)")
+        parser.add_argument("--events", type=int, default=None, help="Schedule events per day")
+        parser.add_argument("--notes", type=int, default=None, help="Notes per day")
+        parser.add_argument("--people", type=int, default=None)
+        parser.add_argument("--groups", type=int, default=None)
+        parser.add_argument("--hotels", type=int, default=None)
+        parser.add_argument("--seed", type=int, default=0)
+        parser.add_argument("--runs", type=int, default=5)
+        parser.add_argument("--only", default="", help="Only endpoints whose name contains this")
+        parser.add_argument("--baseline", default=str(benchmarks.BASELINE_PATH))
+        parser.add_argument("--update-baseline", action="store_true", help="Write the results as the new baseline")
+        parser.add_argument(
+            "--time-factor",
+            type=float,
+            default=None,
+            help="Also fail when an endpoint is this many times slower than its baseline",
+        )
+        parser.add_argument(
+            "--bytes-factor",
+            type=float,
+            default=None,
+            help="Also fail when a response is this many times larger than its baseline (meaningful on an empty database)",
+        )
+
+    def handle(self, *args, **options):
+        try:
+            baseline = benchmarks.load_baseline(options["baseline"])
+        except FileNotFoundError:
+            baseline = None
+        size = dict((baseline or {}).get("size") or benchmarks.DEFAULT_SIZE)
+        for key, option in [
+            ("days", "days"),
+            ("events_per_day", "events"),
+            ("notes_per_day", "notes"),
+            ("people", "people"),
+            ("groups", "groups"),
+            ("hotels", "hotels"),
+        ]:
+            if options[option] is not None:
+                size[key] = options[option]
+
+        missing = benchmarks.missing_routes()
+        if missing:
+            raise CommandError(f"Routes without a benchmark: {', '.join(missing)}")
+
+        # Nothing the benchmark creates outlives it.
+        with transaction.atomic():
+            fixture = build_tour(seed=options["seed"], name="Endpoint Benchmark", **size)
+            results = benchmarks.run(fixture, runs=options["runs"], only=options["only"])
+            transaction.set_rollback(True)
+
+        base = (baseline or {}).get("endpoints", {})
+        self.stdout.write(f"vendor={connection.vendor} " + " ".join(f"{k}={v}" for k, v in size.items()))
+        for name, r in results.items():
+            b = base.get(name)
+            was = f"  (baseline {b['queries']}q {b['ms']:.1f}ms {b['bytes']}B)" if b else "  (new)"
+            self.stdout.write(f"{r['status']} {r['queries']:3}q {r['ms']:8.1f}ms {r['bytes']:9}B  {name}{was}")
+
+        if options["update_baseline"]:
+            if options["only"]:
+                raise CommandError("--update-baseline needs a full run; drop --only")
+            benchmarks.save_baseline(results, size, options["baseline"])
+            self.stdout.write(self.style.SUCCESS(f"Wrote baseline for {len(results)} endpoints to {options['baseline']}"))
+            return
+
+        if baseline is None:
+            raise CommandError(f"No baseline at {options['baseline']}; run with --update-baseline")
+        failures = benchmarks.check(
+            results, baseline, time_factor=options["time_factor"], bytes_factor=options["bytes_factor"]
+        )
+        if failures:
+            raise CommandError("Budget exceeded:\n  " + "\n  ".join(failures))
+        self.stdout.write(self.style.SUCCESS(f"{len(results)} endpoints within budget"))
@@ -0,0 +1,58 @@
+import time
+import tracemalloc
+
+from django.db import connection
+
+from core.hotel_index import HotelAutocompleteIndex
+from core.hotels import search_local_hotels
+from core.management.commands.bench_hotel_search import Command as BenchHotelSearchCommand, QUERIES
+from core.models import Hotel
+
+
+class Command(BenchHotelSearchCommand):
+    help = "Measure memory footprint and autocomplete latency of the in-process hotel index against SQL"
+
+    def add_arguments(self, parser):
+        super().add_arguments(parser)
+        parser.set_defaults(hotels=200_000, runs=50)
+
+    def handle(self, *args, **options):
+        target = options["hotels"]
+        existing = Hotel.objects.count()
+        if existing < target:
+            self.seed(target - existing)
+
+        try:
+            tracemalloc.start()
+            started = time.perf_counter()
+            index = HotelAutocompleteIndex.build()
+            build_ms = (time.perf_counter() - started) * 1000
+            size, _ = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            self.stdout.write(
+                f"index    hotels={len(index.hotels)} partitions={len(index.partitions)} "
+                f"memory={size / 1024 / 1024:.1f}MiB build={build_ms:.0f}ms"
+            )
+
+            searches = [
+                ("index", lambda q: index.search(q)),
+                ("sql", lambda q: search_local_hotels(q, mode="indexed")),
+            ]
+            for label, search in searches:
+                timings = []
+                for _ in range(options["runs"]):
+                    for q in QUERIES:
+                        started = time.perf_counter()
+                        search(q)
+                        timings.append((time.perf_counter() - started) * 1000)
+                timings.sort()
+                self.stdout.write(
+                    f"{label:8} vendor={connection.vendor} "
+                    f"p50={timings[len(timings) // 2]:.2f}ms "
+                    f"p99={timings[int(len(timings) * 0.99) - 1]:.2f}ms "
+                    f"max={timings[-1]:.2f}ms"
+                )
+        finally:
+            if not options["keep"]:
+                deleted, _ = Hotel.objects.filter(source="bench").delete()
+                self.stdout.write(f"Removed {deleted} benchmark hotels")
@@ -0,0 +1,68 @@
+import random
+import statistics
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+
+from core.hotels import search_local_hotels
+from core.management.commands.seed_hotels import HOTEL_CHAINS, CITIES
+from core.models import Hotel
+
+QUERIES = ["hil", "hilton", "marriott seattle", "inn", "port", "97204", "regency", "nashville tn", "zzzz"]
+
+
+class Command(BaseCommand):
+    help = "Compare local hotel search latency between the legacy icontains query and the indexed search"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--hotels", type=int, default=100_000)
+        parser.add_argument("--runs", type=int, default=20)
+        parser.add_argument("--keep", action="store_true", help="Keep the generated hotels")
+
+    def handle(self, *args, **options):
+        target = options["hotels"]
+        existing = Hotel.objects.count()
+        if existing < target:
+            self.seed(target - existing)
+
+        try:
+            for mode in ["legacy", "indexed"]:
+                timings = []
+                for _ in range(options["runs"]):
+                    for q in QUERIES:
+                        started = time.perf_counter()
+                        search_local_hotels(q, mode=mode)
+                        timings.append((time.perf_counter() - started) * 1000)
+                timings.sort()
+                self.stdout.write(
+                    f"{mode:8} hotels={max(existing, target)} vendor={connection.vendor} "
+                    f"p50={statistics.median(timings):.2f}ms "
+                    f"p95={timings[int(len(timings) * 0.95) - 1]:.2f}ms "
+                    f"max={timings[-1]:.2f}ms"
+                )
+        finally:
+            if not options["keep"]:
+                deleted, _ = Hotel.objects.filter(source="bench").delete()
+                self.stdout.write(f"Removed {deleted} benchmark hotels")
+
+    def seed(self, count):
+        rng = random.Random(42)
+        rows = []
+        for i in range(count):
+            city, state = rng.choice(CITIES)
+            rows.append(
+                Hotel(
+                    name=f"{rng.choice(HOTEL_CHAINS)} {city} {i}",
+                    address1=f"{rng.randint(1, 9999)} {city} Ave",
+                    city=city,
+                    state=state,
+                    postal=f"{rng.randint(10000, 99999)}",
+                    source="bench",
+                )
+            )
+        Hotel.objects.bulk_create(rows, batch_size=5000)
+        if connection.vendor == "postgresql":
+            with connection.cursor() as cursor:
+                cursor.execute("ANALYZE core_hotel")
+        self.stdout.write(f"Seeded {count} benchmark hotels")
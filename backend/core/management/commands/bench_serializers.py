@@ -0,0 +1,51 @@
+import statistics
+import time
+from unittest import mock
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test import Client
+
+from core import views
+from core.synthetic import build_tour
+
+
+class Command(BaseCommand):
+    help = "Compare DRF serializers with the .values() fast path on the read-heavy list endpoints"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rows", type=int, default=10_000, help="Days, people and events per day to generate")
+        parser.add_argument("--runs", type=int, default=10)
+
+    def handle(self, *args, **options):
+        rows = options["rows"]
+        client = Client(SERVER_NAME="localhost")
+
+        # Nothing the benchmark creates outlives it.
+        with transaction.atomic():
+            tour = build_tour(days=rows, events_per_day=0, notes_per_day=0, people=rows, hotels=0, seed=1)
+            day = build_tour(days=1, events_per_day=rows, notes_per_day=0, people=10, hotels=0, seed=2)
+            endpoints = [
+                (views.TourDaysList, f"/api/tours/{tour.tour}/days/"),
+                (views.DayScheduleList, f"/api/days/{day.days[0]}/schedule/"),
+                (views.TourPersonnel, f"/api/tours/{tour.tour}/personnel/"),
+            ]
+            for view, url in endpoints:
+                timings, bodies = {}, {}
+                for fast in (False, True):
+                    with mock.patch.object(view, "fast_serialization", fast):
+                        timings[fast] = []
+                        for _ in range(options["runs"]):
+                            started = time.perf_counter()
+                            res = client.get(url)
+                            timings[fast].append((time.perf_counter() - started) * 1000)
+                        bodies[fast] = res.content
+                if bodies[True] != bodies[False]:
+                    raise CommandError(f"{view.__name__}: fast path output differs from the DRF serializer")
+
+                drf, fast = statistics.median(timings[False]), statistics.median(timings[True])
+                self.stdout.write(
+                    f"{view.__name__:16} rows={rows} vendor={connection.vendor} bytes={len(bodies[True])} "
+                    f"drf={drf:.1f}ms values={fast:.1f}ms speedup={drf / fast:.1f}x"
+                )
+            transaction.set_rollback(True)
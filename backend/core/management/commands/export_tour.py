@@ -0,0 +1,42 @@
+import gzip
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core.archive import export_tour
+from core.models import Tour
+
+
+class Command(BaseCommand):
+    help = "Export a tour as an NDJSON archive (gzipped when the output ends in .gz)"
+
+    def add_arguments(self, parser):
+        parser.add_argument("tour_id")
+        parser.add_argument("-o", "--output", default="-", help="File to write, or - for stdout")
+
+    def handle(self, *args, **options):
+        tour_id = options["tour_id"]
+        if not Tour.objects.filter(id=tour_id).exists():
+            raise CommandError(f"Tour {tour_id} does not exist")
+
+        path = options["output"]
+        if path == "-":
+            out = None
+        elif path.endswith(".gz"):
+            out = gzip.open(path, "wt", encoding="utf-8")
+        else:
+            out = open(path, "w", encoding="utf-8")
+
+        lines = 0
+        try:
+            for line in export_tour(tour_id):
+                if out is None:
+                    self.stdout.write(line, ending="")
+                else:
+                    out.write(line)
+                lines += 1
+        finally:
+            if out is not None:
+                out.close()
+
+        if path != "-":
+            self.stdout.write(self.style.SUCCESS(f"Exported {lines - 1} rows to {path}"))
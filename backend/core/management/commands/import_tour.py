@@ -0,0 +1,34 @@
+import gzip
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core.archive import ArchiveError, import_tour
+
+
+class Command(BaseCommand):
+    help = "Import an NDJSON tour archive as a new tour with fresh ids"
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="Archive file (.ndjson or .ndjson.gz), or - for stdin")
+        parser.add_argument("--name", default="", help="Name for the imported tour")
+
+    def handle(self, *args, **options):
+        path = options["path"]
+        if path == "-":
+            source = sys.stdin
+        elif path.endswith(".gz"):
+            source = gzip.open(path, "rt", encoding="utf-8")
+        else:
+            source = open(path, encoding="utf-8")
+
+        try:
+            tour, counts = import_tour(source, name=options["name"])
+        except ArchiveError as e:
+            raise CommandError(str(e))
+        finally:
+            if source is not sys.stdin:
+                source.close()
+
+        summary = ", ".join(f"{n} {key}" for key, n in counts.items())
+        self.stdout.write(self.style.SUCCESS(f"Imported tour {tour.id} ({summary})"))
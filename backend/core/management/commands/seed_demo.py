@@ -1,4 +1,5 @@
 from django.core.management.base import BaseCommand
+from core.associations import index_events, index_notes
 from core.models import Tour, Venue, Day, Group, Person, ScheduleEvent, Contact, Note
 from datetime import date, time
 
@@ -41,4 +42,7 @@ class Command(BaseCommand):
 
         Note.objects.create(day=d2, title="Crew Notes", body="First show today. Buses depart at 6:00 AM. Breakfast will be up.", last_edited_by="Frankie Davis")
 
+        index_events(ScheduleEvent.objects.filter(day__tour=tour))
+        index_notes(Note.objects.filter(day__tour=tour))
+
         self.stdout.write(self.style.SUCCESS("Seeded demo data."))
@@ -1,4 +1,5 @@
 from django.core.management.base import BaseCommand
+from core.associations import index_events, index_notes
 from core.models import Tour, Venue, Day, Group, Person, ScheduleEvent, Contact, Note
 from datetime import date, time
 
@@ -129,4 +130,7 @@ class Command(BaseCommand):
             last_edited_by="Tour Manager",
         )
 
+        index_events(ScheduleEvent.objects.filter(day__tour=tour))
+        index_notes(Note.objects.filter(day__tour=tour))
+
         self.stdout.write(self.style.SUCCESS("Appended demo tour stops and people."))
@@ -0,0 +1,93 @@
+import random
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.utils.dateparse import parse_date
+
+from core.models import Day, Hotel, Tour, Venue
+from core.synthetic import build_hotels, build_tour
+
+
+class Command(BaseCommand):
+    help = (
+        "Generate production-scale synthetic data: tours with days, events, people, groups, notes and lodging, "
+        "plus shared hotels. The same --seed always produces the same rows."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--tours", type=int, default=10)
+        parser.add_argument("--days", type=int, default=120, help="Days per tour")
+        parser.add_argument("--events", type=int, default=12, help="Schedule events per day")
+        parser.add_argument("--notes", type=int, default=3, help="Notes per day")
+        parser.add_argument("--people", type=int, default=60, help="People per tour")
+        parser.add_argument("--groups", type=int, default=6, help="Groups per tour")
+        parser.add_argument("--tour-hotels", type=int, default=50, help="Hotels generated with each tour")
+        parser.add_argument("--hotels", type=int, default=100_000, help="Shared hotels")
+        parser.add_argument("--start", default="2026-03-01", help="First day of every tour (YYYY-MM-DD)")
+        parser.add_argument("--seed", type=int, default=0)
+        parser.add_argument("--chunk-size", type=int, default=2000, help="Rows per bulk_create batch")
+        parser.add_argument("--clear", action="store_true", help="Delete previously generated synthetic data first")
+
+    def handle(self, *args, **options):
+        start = parse_date(options["start"] or "")
+        if start is None:
+            raise CommandError("--start must be YYYY-MM-DD")
+        if options["chunk_size"] < 1:
+            raise CommandError("--chunk-size must be positive")
+
+        if options["clear"]:
+            self.clear()
+
+        rng = random.Random(options["seed"])
+        total_rows, started = 0, time.perf_counter()
+
+        for i in range(options["tours"]):
+            tour_started = time.perf_counter()
+            with transaction.atomic():
+                fixture = build_tour(
+                    days=options["days"],
+                    events_per_day=options["events"],
+                    notes_per_day=options["notes"],
+                    people=options["people"],
+                    groups=options["groups"],
+                    hotels=options["tour_hotels"],
+                    seed=rng.getrandbits(32),
+                    name=f"Synthetic Tour {i + 1}",
+                    start=start,
+                    batch_size=options["chunk_size"],
+                )
+            rows = sum(fixture.counts.values())
+            total_rows += rows
+            self.report(f"Tour {i + 1}/{options['tours']} {fixture.tour}", rows, tour_started)
+
+        if options["hotels"]:
+            hotels_started = time.perf_counter()
+            written = 0
+            with transaction.atomic():
+                for rows in build_hotels(options["hotels"], seed=options["seed"], batch_size=options["chunk_size"]):
+                    written += rows
+            total_rows += written
+            self.report("Shared hotels", written, hotels_started)
+
+        if connection.vendor == "postgresql":
+            with connection.cursor() as cursor:
+                cursor.execute("ANALYZE")
+
+        self.stdout.write(self.style.SUCCESS(self.rate(f"Seeded {total_rows:,} rows", total_rows, started)))
+
+    def rate(self, label, rows, started):
+        elapsed = time.perf_counter() - started
+        return f"{label} in {elapsed:.1f}s ({rows / elapsed if elapsed else 0:,.0f} rows/s)"
+
+    def report(self, label, rows, started):
+        self.stdout.write(self.rate(f"{label}: {rows:,} rows", rows, started))
+
+    @transaction.atomic
+    def clear(self):
+        tours = Tour.objects.filter(subtitle="synthetic")
+        venue_ids = list(Day.objects.filter(tour__in=tours).values_list("venue_id", flat=True).distinct())
+        deleted = tours.delete()[0]
+        deleted += Hotel.objects.filter(source="synthetic").delete()[0]
+        deleted += Venue.objects.filter(id__in=venue_ids, days__isnull=True).delete()[0]
+        self.stdout.write(f"Removed {deleted:,} synthetic rows")
@@ -0,0 +1,36 @@
+# Generated by Django 5.2.18 on 2026-10-18 13:08
+
+import django.db.models.deletion
+import uuid
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0007_updated_at_tracking'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='tour',
+            name='revision',
+            field=models.PositiveBigIntegerField(default=0),
+        ),
+        migrations.CreateModel(
+            name='TourChange',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('revision', models.PositiveBigIntegerField()),
+                ('entity', models.CharField(max_length=32)),
+                ('entity_id', models.UUIDField()),
+                ('op', models.CharField(choices=[('create', 'create'), ('update', 'update'), ('delete', 'delete')], max_length=16)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('tour', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='changes', to='core.tour')),
+            ],
+            options={
+                'ordering': ['revision'],
+                'indexes': [models.Index(fields=['tour', 'revision'], name='core_tourch_tour_id_83943c_idx')],
+            },
+        ),
+    ]
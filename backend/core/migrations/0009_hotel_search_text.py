@@ -0,0 +1,35 @@
+# Generated by Django 5.2.18 on 2026-10-18 13:14
+
+import django.db.models.functions.text
+from django.db import migrations, models
+
+
+def create_trigram_index(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    schema_editor.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    schema_editor.execute(
+        "CREATE INDEX IF NOT EXISTS core_hotel_search_trgm ON core_hotel USING gin (search_text gin_trgm_ops)"
+    )
+
+
+def drop_trigram_index(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    schema_editor.execute("DROP INDEX IF EXISTS core_hotel_search_trgm")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0008_tour_revision_tourchange'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='hotel',
+            name='search_text',
+            field=models.GeneratedField(db_persist=True, expression=django.db.models.functions.text.Lower(django.db.models.functions.text.Concat('name', models.Value(' '), 'address1', models.Value(' '), 'city', models.Value(' '), 'state', models.Value(' '), 'postal', output_field=models.TextField())), output_field=models.TextField()),
+        ),
+        migrations.RunPython(create_trigram_index, drop_trigram_index),
+    ]
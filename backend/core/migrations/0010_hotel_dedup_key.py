@@ -0,0 +1,66 @@
+# Generated by Django 5.2.18 on 2026-10-18 13:23
+
+import hashlib
+import re
+import unicodedata
+
+from django.db import migrations, models
+
+
+def hotel_dedup_key(name, address1="", city="", state="", postal=""):
+    # Frozen copy of core.models.hotel_dedup_key as of this migration.
+    parts = []
+    for value in [name, address1, city, state, postal]:
+        value = unicodedata.normalize("NFKD", value or "").encode("ascii", "ignore").decode("ascii")
+        parts.append(" ".join(re.sub(r"[^a-z0-9]+", " ", value.lower()).split()))
+    return hashlib.sha1("|".join(parts).encode("utf-8")).hexdigest()
+
+
+def backfill_dedup_keys(apps, schema_editor):
+    """Key every hotel and fold duplicates within a tour into the oldest one."""
+    Hotel = apps.get_model("core", "Hotel")
+    DayLodging = apps.get_model("core", "DayLodging")
+
+    rows = Hotel.objects.order_by("created_at", "id").values_list(
+        "id", "tour_id", "place_id", "name", "address1", "city", "state", "postal"
+    )
+    keepers = {}
+    keyed = []
+    for hotel_id, tour_id, place_id, *identity in rows:
+        key = hotel_dedup_key(*identity)
+        keeper = keepers.setdefault((tour_id, key), (hotel_id, place_id)) if tour_id else (hotel_id, place_id)
+        if keeper[0] == hotel_id:
+            keyed.append(Hotel(id=hotel_id, dedup_key=key))
+            continue
+
+        DayLodging.objects.filter(hotel_id=hotel_id).update(hotel_id=keeper[0])
+        if place_id and not keeper[1]:
+            Hotel.objects.filter(id=keeper[0]).update(place_id=place_id)
+            keepers[(tour_id, key)] = (keeper[0], place_id)
+        Hotel.objects.filter(id=hotel_id).delete()
+
+    Hotel.objects.bulk_update(keyed, ["dedup_key"], batch_size=2000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0009_hotel_search_text'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='hotel',
+            name='dedup_key',
+            field=models.CharField(blank=True, default='', max_length=40),
+        ),
+        migrations.RunPython(backfill_dedup_keys, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='hotel',
+            index=models.Index(fields=['dedup_key'], name='core_hotel_dedup_k_cd56ea_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='hotel',
+            constraint=models.UniqueConstraint(condition=models.Q(('dedup_key', ''), _negated=True), fields=('tour', 'dedup_key'), name='core_hotel_unique_dedup_key'),
+        ),
+    ]
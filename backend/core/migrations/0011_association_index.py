@@ -0,0 +1,81 @@
+# Generated by Django 5.2.18 on 2026-10-18 13:30
+
+import uuid
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+KINDS = {"group", "person"}
+
+
+def parse_refs(items, kind_key):
+    # Frozen copy of core.associations.parse_refs as of this migration.
+    out = []
+    for item in items if isinstance(items, list) else []:
+        if not isinstance(item, dict) or item.get(kind_key) not in KINDS:
+            continue
+        try:
+            target = uuid.UUID(str(item.get("id")))
+        except (TypeError, ValueError, AttributeError):
+            continue
+        if (item[kind_key], target) not in out:
+            out.append((item[kind_key], target))
+    return out
+
+
+def backfill_association_index(apps, schema_editor):
+    ScheduleEvent = apps.get_model("core", "ScheduleEvent")
+    Note = apps.get_model("core", "Note")
+    ScheduleEventAssociation = apps.get_model("core", "ScheduleEventAssociation")
+    NoteVisibility = apps.get_model("core", "NoteVisibility")
+
+    rows = [
+        ScheduleEventAssociation(event_id=event_id, kind=kind, target_id=target)
+        for event_id, associations in ScheduleEvent.objects.values_list("id", "associations").iterator(chunk_size=2000)
+        for kind, target in parse_refs(associations, "type")
+    ]
+    ScheduleEventAssociation.objects.bulk_create(rows, batch_size=1000)
+
+    rows = [
+        NoteVisibility(note_id=note_id, kind=kind, target_id=target)
+        for note_id, visibility in Note.objects.values_list("id", "visibility").iterator(chunk_size=2000)
+        for kind, target in parse_refs(visibility, "kind")
+    ]
+    NoteVisibility.objects.bulk_create(rows, batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0010_hotel_dedup_key'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='NoteVisibility',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('group', 'group'), ('person', 'person')], max_length=16)),
+                ('target_id', models.UUIDField()),
+                ('note', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='visibility_index', to='core.note')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['kind', 'target_id'], name='core_notevi_kind_3a0469_idx')],
+                'constraints': [models.UniqueConstraint(fields=('note', 'kind', 'target_id'), name='core_note_visibility_unique')],
+            },
+        ),
+        migrations.CreateModel(
+            name='ScheduleEventAssociation',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('group', 'group'), ('person', 'person')], max_length=16)),
+                ('target_id', models.UUIDField()),
+                ('event', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='association_index', to='core.scheduleevent')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['kind', 'target_id'], name='core_schedu_kind_af6948_idx')],
+                'constraints': [models.UniqueConstraint(fields=('event', 'kind', 'target_id'), name='core_event_association_unique')],
+            },
+        ),
+        migrations.RunPython(backfill_association_index, migrations.RunPython.noop),
+    ]
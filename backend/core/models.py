@@ -1,14 +1,20 @@
 from django.db import models
 
 # Create your models here.
+import hashlib
+import re
+import unicodedata
 import uuid
 from django.db import models
+from django.db.models import Q, Value
+from django.db.models.functions import Concat, Lower
 
 
 class Tour(models.Model):
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
     name = models.CharField(max_length=255)
     subtitle = models.CharField(max_length=255, blank=True, default="")
+    revision = models.PositiveBigIntegerField(default=0)
 
     def __str__(self) -> str:
         return self.name
@@ -42,6 +48,7 @@ class Day(models.Model):
     tz = models.CharField(max_length=64, default="America/Los_Angeles")
     venue = models.ForeignKey(Venue, on_delete=models.PROTECT, related_name="days")
     aftershow = models.TextField(blank=True, default="")
+    updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
         indexes = [
@@ -58,6 +65,7 @@ class Group(models.Model):
     tour = models.ForeignKey(Tour, on_delete=models.CASCADE)
     name = models.CharField(max_length=255)
     color = models.CharField(max_length=32, default="red")
+    updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
         unique_together = [("tour", "name")]
@@ -82,6 +90,7 @@ class Person(models.Model):
     group = models.ForeignKey(Group, null=True, blank=True, on_delete=models.SET_NULL, related_name="people")
     permission = models.CharField(max_length=16, choices=Permission.choices, default=Permission.READ)
     connected = models.BooleanField(default=False)
+    updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
         ordering = ["name"]
@@ -103,6 +112,7 @@ class ScheduleEvent(models.Model):
     status = models.CharField(max_length=16, choices=Status.choices, default=Status.TODO)
     associations = models.JSONField(default=list, blank=True)  # [{type:"group"|"person", id:"..."}]
     notes = models.TextField(blank=True, default="")
+    updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
         indexes = [
@@ -121,6 +131,7 @@ class Contact(models.Model):
     role = models.CharField(max_length=128)
     phone = models.CharField(max_length=64, blank=True, default="")
     email = models.EmailField(blank=True, default="")
+    updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
         ordering = ["role", "name"]
@@ -165,6 +176,15 @@ class ScheduleTemplateEvent(models.Model):
     start_tz = models.CharField(max_length=64, blank=True, default="")
     end_tz = models.CharField(max_length=64, blank=True, default="")
 
+def hotel_dedup_key(name, address1="", city="", state="", postal="") -> str:
+    """Hash of the case-, accent-, punctuation- and whitespace-insensitive hotel identity."""
+    parts = []
+    for value in [name, address1, city, state, postal]:
+        value = unicodedata.normalize("NFKD", value or "").encode("ascii", "ignore").decode("ascii")
+        parts.append(" ".join(re.sub(r"[^a-z0-9]+", " ", value.lower()).split()))
+    return hashlib.sha1("|".join(parts).encode("utf-8")).hexdigest()
+
+
 class Hotel(models.Model):
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
     tour = models.ForeignKey("core.Tour", null=True, blank=True, on_delete=models.SET_NULL, related_name="hotels")
@@ -180,12 +200,37 @@ class Hotel(models.Model):
 
     created_at = models.DateTimeField(auto_now_add=True)
 
+    # Lowercased name/address/city/state/postal; trigram-indexed on Postgres (see migration 0009).
+    search_text = models.GeneratedField(
+        expression=Lower(
+            Concat(
+                "name", Value(" "), "address1", Value(" "), "city", Value(" "), "state", Value(" "), "postal",
+                output_field=models.TextField(),
+            )
+        ),
+        output_field=models.TextField(),
+        db_persist=True,
+    )
+
+    dedup_key = models.CharField(max_length=40, blank=True, default="")
+
     class Meta:
         indexes = [
             models.Index(fields=["tour", "name"]),
             models.Index(fields=["place_id"]),
+            models.Index(fields=["dedup_key"]),
+        ]
+        constraints = [
+            models.UniqueConstraint(fields=["tour", "dedup_key"], condition=~Q(dedup_key=""), name="core_hotel_unique_dedup_key"),
         ]
 
+    def save(self, *args, **kwargs):
+        self.dedup_key = hotel_dedup_key(self.name, self.address1, self.city, self.state, self.postal)
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None and "dedup_key" not in update_fields:
+            kwargs["update_fields"] = [*update_fields, "dedup_key"]
+        super().save(*args, **kwargs)
+
 class DayLodging(models.Model):
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
     day = models.OneToOneField("core.Day", on_delete=models.CASCADE, related_name="lodging")
@@ -207,3 +252,61 @@ class DayLodgingGuest(models.Model):
     class Meta:
         unique_together = [("lodging", "person")]
         indexes = [models.Index(fields=["lodging", "person"])]
+
+
+class TourChange(models.Model):
+    class Op(models.TextChoices):
+        CREATE = "create", "create"
+        UPDATE = "update", "update"
+        DELETE = "delete", "delete"
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    tour = models.ForeignKey(Tour, on_delete=models.CASCADE, related_name="changes")
+    revision = models.PositiveBigIntegerField()
+    entity = models.CharField(max_length=32)
+    entity_id = models.UUIDField()
+    op = models.CharField(max_length=16, choices=Op.choices)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["tour", "revision"]),
+        ]
+        ordering = ["revision"]
+
+
+class AssociationKind(models.TextChoices):
+    GROUP = "group", "group"
+    PERSON = "person", "person"
+
+
+class ScheduleEventAssociation(models.Model):
+    """Row-per-entry index of ScheduleEvent.associations, maintained by core.associations."""
+
+    event = models.ForeignKey(ScheduleEvent, on_delete=models.CASCADE, related_name="association_index")
+    kind = models.CharField(max_length=16, choices=AssociationKind.choices)
+    target_id = models.UUIDField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["event", "kind", "target_id"], name="core_event_association_unique"),
+        ]
+        indexes = [
+            models.Index(fields=["kind", "target_id"]),
+        ]
+
+
+class NoteVisibility(models.Model):
+    """Row-per-entry index of Note.visibility, maintained by core.associations."""
+
+    note = models.ForeignKey(Note, on_delete=models.CASCADE, related_name="visibility_index")
+    kind = models.CharField(max_length=16, choices=AssociationKind.choices)
+    target_id = models.UUIDField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["note", "kind", "target_id"], name="core_note_visibility_unique"),
+        ]
+        indexes = [
+            models.Index(fields=["kind", "target_id"]),
+        ]
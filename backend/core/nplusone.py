@@ -0,0 +1,129 @@
+import logging
+import os
+import re
+import sys
+from collections import Counter
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connection
+
+from core.observers import QueryObserverMiddleware
+
+logger = logging.getLogger("core.nplusone")
+
+_LITERALS = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b|%s|\?")
+_LISTS = re.compile(r"\(\s*\?(?:\s*,\s*\?)*\s*\)")
+
+class NPlusOneError(Exception):
+    pass
+
+
+def detector_mode():
+    """"raise", "warn" or "" (off, the default): the NPLUSONE_DETECTOR setting."""
+    return getattr(settings, "NPLUSONE_DETECTOR", "") or ""
+
+
+def fingerprint(sql):
+    """The shape of a statement: literals and placeholders (including IN lists) collapsed to ?."""
+    return " ".join(_LISTS.sub("(?)", _LITERALS.sub("?", sql)).split())
+
+
+def _origin():
+    """The serializer field and innermost project line the current query came from."""
+    field = line = None
+    base = str(getattr(settings, "BASE_DIR", ""))
+    frame = sys._getframe(2)
+    while frame is not None and not (field and line):
+        code = frame.f_code
+        if field is None and code.co_name == "to_representation" and "field" in frame.f_locals:
+            serializer = frame.f_locals.get("self")
+            name = getattr(frame.f_locals["field"], "field_name", None)
+            if serializer is not None and name:
+                field = f"{type(serializer).__name__}.{name}"
+        if (
+            line is None
+            and base
+            and code.co_filename.startswith(base)
+            and code.co_filename != __file__
+            and "site-packages" not in code.co_filename
+        ):
+            line = f"{os.path.relpath(code.co_filename, base)}:{frame.f_lineno} in {code.co_name}"
+        frame = frame.f_back
+    return ", ".join(f"{label} {value}" for label, value in [("from", field), ("at", line)] if value)
+
+
+class QueryShapeCollector:
+    """
+    Execute wrapper counting SELECTs by fingerprint. The origin of a shape is
+    only looked up once it crosses the threshold, so the common case costs a
+    regex and a dict update per query.
+    """
+
+    def __init__(self, threshold):
+        self.threshold = threshold
+        self.counts = Counter()
+        self.origins = {}
+
+    def __call__(self, execute, sql, params, many, context):
+        if not many and sql.lstrip()[:6].upper() == "SELECT":
+            shape = fingerprint(sql)
+            self.counts[shape] += 1
+            if self.counts[shape] == self.threshold + 1:
+                self.origins[shape] = _origin()
+        return execute(sql, params, many, context)
+
+    def repeated(self):
+        return [(shape, n, self.origins.get(shape, "")) for shape, n in self.counts.items() if n > self.threshold]
+
+
+def _report(label, repeated, mode):
+    lines = [f"{n}x {shape[:300]}" + (f"\n    {origin}" if origin else "") for shape, n, origin in repeated]
+    message = f"Possible N+1 queries in {label}:\n  " + "\n  ".join(lines)
+    if mode == "raise":
+        raise NPlusOneError(message)
+    logger.warning(message)
+
+
+@contextmanager
+def detect_n_plus_one(label="block", mode=None, threshold=None):
+    """
+    Flag SELECTs of the same shape issued more than `threshold` times inside
+    the block: raise NPlusOneError in "raise" mode, log a warning in "warn".
+    """
+    mode = detector_mode() if mode is None else mode
+    if not mode:
+        yield None
+        return
+    if threshold is None:
+        threshold = getattr(settings, "NPLUSONE_THRESHOLD", 5)
+    collector = QueryShapeCollector(threshold)
+    with connection.execute_wrapper(collector):
+        yield collector
+    repeated = collector.repeated()
+    if repeated:
+        _report(label, repeated, mode)
+
+
+class NPlusOneMiddleware(QueryObserverMiddleware):
+    """
+    Runs each request under the N+1 check of detect_n_plus_one(). Django
+    drops it from the chain at startup unless NPLUSONE_DETECTOR is set.
+    """
+
+    def __init__(self, get_response):
+        self.mode = detector_mode()
+        if not self.mode:
+            raise MiddlewareNotUsed
+        super().__init__(get_response)
+        self.threshold = getattr(settings, "NPLUSONE_THRESHOLD", 5)
+
+    def start(self, request):
+        return QueryShapeCollector(self.threshold)
+
+    def finish(self, request, response, collector):
+        repeated = collector.repeated()
+        if repeated:
+            _report(f"{request.method} {request.path}", repeated, self.mode)
+        return response
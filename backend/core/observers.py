@@ -0,0 +1,49 @@
+from contextlib import ExitStack
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.db import connection
+
+
+class QueryObserverMiddleware:
+    """
+    Base for middleware that watches the queries of each request.
+
+    Subclasses implement start(request), returning an execute wrapper (see
+    connection.execute_wrapper()), and finish(request, response, wrapper),
+    returning the response. The wrapper is installed on the connection that
+    runs the request's queries for as long as the request is handled.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def start(self, request):
+        raise NotImplementedError
+
+    def finish(self, request, response, wrapper):
+        raise NotImplementedError
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        wrapper = self.start(request)
+        with connection.execute_wrapper(wrapper):
+            response = self.get_response(request)
+        return self.finish(request, response, wrapper)
+
+    async def __acall__(self, request):
+        wrapper = self.start(request)
+        # Under ASGI, sync views and the async ORM query from the request's
+        # thread-sensitive worker thread, so the wrapper goes on that thread's connection.
+        scope = ExitStack()
+        await sync_to_async(lambda: scope.enter_context(connection.execute_wrapper(wrapper)))()
+        try:
+            response = await self.get_response(request)
+        finally:
+            await sync_to_async(scope.close)()
+        return self.finish(request, response, wrapper)
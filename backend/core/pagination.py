@@ -0,0 +1,55 @@
+import base64
+import json
+
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 500
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def encode_cursor(values) -> str:
+    raw = json.dumps(values, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(token: str):
+    try:
+        raw = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4))
+        values = json.loads(raw.decode("utf-8"))
+    except (ValueError, TypeError):
+        raise InvalidCursor("invalid cursor")
+    if not isinstance(values, list):
+        raise InvalidCursor("invalid cursor")
+    return values
+
+
+def is_paginated(request) -> bool:
+    return "after" in request.query_params or "limit" in request.query_params
+
+
+def page_size(request) -> int:
+    try:
+        limit = int(request.query_params.get("limit") or DEFAULT_PAGE_SIZE)
+    except ValueError:
+        limit = DEFAULT_PAGE_SIZE
+    return max(1, min(limit, MAX_PAGE_SIZE))
+
+
+def keyset_page(qs, request, key, after_filter):
+    """
+    Slice an ordered queryset after the row identified by ?after=.
+
+    `key` maps a row to the JSON-able values of its ordering columns and
+    `after_filter` turns those values back into a Q selecting the rows that
+    sort after it, so each page is a single indexed range scan.
+    """
+    after = request.query_params.get("after")
+    if after:
+        qs = qs.filter(after_filter(decode_cursor(after)))
+
+    limit = page_size(request)
+    rows = list(qs[: limit + 1])
+    next_cursor = encode_cursor(key(rows[limit - 1])) if len(rows) > limit else None
+    return rows[:limit], next_cursor
@@ -0,0 +1,148 @@
+import asyncio
+import json
+import threading
+
+from django.conf import settings
+from django.db import connection
+from django.utils.module_loading import import_string
+
+_broker = None
+_broker_lock = threading.Lock()
+
+
+def get_broker():
+    global _broker
+    with _broker_lock:
+        if _broker is None:
+            path = getattr(settings, "DAYSHEETS_BROKER", "") or "core.pubsub.InProcessBroker"
+            _broker = import_string(path)()
+        return _broker
+
+
+class Subscription:
+    def __init__(self, tour_id, maxsize=256):
+        self.tour_id = str(tour_id)
+        self.loop = asyncio.get_running_loop()
+        self.queue = asyncio.Queue(maxsize)
+
+    def push(self, message):
+        try:
+            self.queue.put_nowait(message)
+        except asyncio.QueueFull:
+            # A stalled client only needs to know it fell behind; it resyncs from the changes feed.
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.queue.put_nowait({"resync": True})
+
+    async def get(self, timeout=None):
+        return await asyncio.wait_for(self.queue.get(), timeout)
+
+
+class InProcessBroker:
+    """
+    Fans tour messages out to the subscriptions of this process.
+
+    publish() is safe to call from sync views running in worker threads; each
+    message is handed to the subscriber's event loop.
+    """
+
+    def __init__(self):
+        self._subs = {}
+        self._lock = threading.Lock()
+
+    def subscribe(self, tour_id):
+        sub = Subscription(tour_id)
+        with self._lock:
+            self._subs.setdefault(sub.tour_id, set()).add(sub)
+        return sub
+
+    def unsubscribe(self, sub):
+        with self._lock:
+            subs = self._subs.get(sub.tour_id)
+            if subs is not None:
+                subs.discard(sub)
+                if not subs:
+                    del self._subs[sub.tour_id]
+
+    def subscriber_count(self, tour_id=None):
+        with self._lock:
+            if tour_id is not None:
+                return len(self._subs.get(str(tour_id), ()))
+            return sum(len(s) for s in self._subs.values())
+
+    def publish(self, tour_id, message):
+        self.deliver(tour_id, message)
+
+    def deliver(self, tour_id, message):
+        with self._lock:
+            subs = list(self._subs.get(str(tour_id), ()))
+        for sub in subs:
+            # A stream served on a temporary loop (e.g. sync_to_async under WSGI) leaves its loop closed.
+            if sub.loop.is_closed():
+                self.unsubscribe(sub)
+                continue
+            try:
+                sub.loop.call_soon_threadsafe(sub.push, message)
+            except RuntimeError:
+                self.unsubscribe(sub)
+
+
+class PostgresNotifyBroker(InProcessBroker):
+    """
+    Publishes through Postgres NOTIFY so every worker process sees every write.
+
+    Each process keeps one LISTEN connection on the event loop of its first
+    subscriber and delivers notifications to its local subscriptions.
+    """
+
+    channel = "daysheets_tour_changes"
+
+    def __init__(self):
+        super().__init__()
+        self._listener = None
+
+    def publish(self, tour_id, message):
+        payload = json.dumps({"tour": str(tour_id), "message": message}, separators=(",", ":"))
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT pg_notify(%s, %s)", [self.channel, payload])
+
+    def subscribe(self, tour_id):
+        sub = super().subscribe(tour_id)
+        with self._lock:
+            if self._listener is None or self._listener.done():
+                self._listener = sub.loop.create_task(self._listen())
+        return sub
+
+    def _conninfo(self):
+        from psycopg.conninfo import make_conninfo
+
+        db = settings.DATABASES["default"]
+        return make_conninfo(
+            dbname=db.get("NAME") or "",
+            user=db.get("USER") or "",
+            password=db.get("PASSWORD") or "",
+            host=db.get("HOST") or "",
+            port=str(db.get("PORT") or ""),
+        )
+
+    async def _listen(self):
+        import psycopg
+
+        reconnecting = False
+        while True:
+            try:
+                async with await psycopg.AsyncConnection.connect(self._conninfo(), autocommit=True) as conn:
+                    await conn.execute(f"LISTEN {self.channel}")
+                    if reconnecting:
+                        # Notifications sent while we were disconnected are gone.
+                        with self._lock:
+                            tour_ids = list(self._subs)
+                        for tour_id in tour_ids:
+                            self.deliver(tour_id, {"resync": True})
+                    async for notify in conn.notifies():
+                        data = json.loads(notify.payload)
+                        self.deliver(data["tour"], data["message"])
+            except (psycopg.Error, OSError):
+                pass
+            reconnecting = True
+            await asyncio.sleep(1)
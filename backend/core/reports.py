@@ -0,0 +1,96 @@
+import csv
+import json
+from types import SimpleNamespace
+
+from django.conf import settings
+
+from core.models import DayLodging
+from core.serializers import _address_line
+
+ROOMING_LIST_COLUMNS = [
+    "date",
+    "city",
+    "state",
+    "hotel",
+    "hotelAddress",
+    "checkIn",
+    "checkOut",
+    "rooms",
+    "personId",
+    "guest",
+    "role",
+    "group",
+    "notes",
+]
+
+
+def _iso(value):
+    return value.isoformat().replace("+00:00", "Z") if value else ""
+
+
+def rooming_list_rows(tour_id):
+    """
+    One row per lodging guest (or one guest-less row per lodging), ordered by
+    date and guest name. A single joined query, read in chunks.
+    """
+    qs = (
+        DayLodging.objects.filter(day__tour_id=tour_id)
+        .order_by("day__date", "day_id", "guests__person__name", "guests__person_id")
+        .values(
+            "day__date",
+            "day__city",
+            "day__state",
+            "hotel__name",
+            "hotel__address1",
+            "hotel__city",
+            "hotel__state",
+            "hotel__postal",
+            "check_in_iso",
+            "check_out_iso",
+            "rooms",
+            "notes",
+            "guests__person_id",
+            "guests__person__name",
+            "guests__person__role_title",
+            "guests__person__group__name",
+        )
+    )
+    chunk_size = getattr(settings, "ROOMING_LIST_CHUNK_SIZE", 2000)
+
+    for r in qs.iterator(chunk_size=chunk_size):
+        hotel = SimpleNamespace(
+            address1=r["hotel__address1"], city=r["hotel__city"], state=r["hotel__state"], postal=r["hotel__postal"]
+        )
+        person_id = r["guests__person_id"]
+        yield {
+            "date": r["day__date"].isoformat(),
+            "city": r["day__city"],
+            "state": r["day__state"],
+            "hotel": r["hotel__name"],
+            "hotelAddress": _address_line(hotel),
+            "checkIn": _iso(r["check_in_iso"]),
+            "checkOut": _iso(r["check_out_iso"]),
+            "rooms": r["rooms"],
+            "personId": str(person_id) if person_id else None,
+            "guest": r["guests__person__name"] or "",
+            "role": r["guests__person__role_title"] or "",
+            "group": r["guests__person__group__name"] or "",
+            "notes": r["notes"],
+        }
+
+
+class _Echo:
+    def write(self, value):
+        return value
+
+
+def rooming_list_csv(rows):
+    writer = csv.writer(_Echo())
+    yield writer.writerow(ROOMING_LIST_COLUMNS)
+    for row in rows:
+        yield writer.writerow(["" if row[c] is None else row[c] for c in ROOMING_LIST_COLUMNS])
+
+
+def rooming_list_ndjson(rows):
+    for row in rows:
+        yield json.dumps(row, separators=(",", ":")) + "\n"
@@ -1,4 +1,6 @@
+from django.db import models
 from rest_framework import serializers
+from core.values import ValuesSerializer
 from core.models import Tour, Day, Venue, ScheduleEvent, Contact, Note, Group, Person, ScheduleTemplate, ScheduleTemplateEvent, Hotel, DayLodging, DayLodgingGuest
 
 class TourSerializer(serializers.ModelSerializer):
@@ -27,6 +29,9 @@ class DaySerializer(serializers.ModelSerializer):
         return obj.date.isoformat()
 
 
+DayValues = ValuesSerializer(DaySerializer, dateISO=("date", lambda d: d.isoformat()))
+
+
 class ScheduleEventSerializer(serializers.ModelSerializer):
     dayId = serializers.UUIDField(source="day_id", read_only=True)
     startLocal = serializers.TimeField(source="start_local", allow_null=True, required=False)
@@ -37,6 +42,9 @@ class ScheduleEventSerializer(serializers.ModelSerializer):
         fields = ["id", "dayId", "name", "startLocal", "endLocal", "status", "associations", "notes"]
 
 
+ScheduleEventValues = ValuesSerializer(ScheduleEventSerializer)
+
+
 class ContactSerializer(serializers.ModelSerializer):
     dayId = serializers.UUIDField(source="day_id", read_only=True)
 
@@ -48,6 +56,36 @@ class ContactSerializer(serializers.ModelSerializer):
 from rest_framework import serializers
 from core.models import Note, Group, Person
 
+def _visibility_names(notes):
+    group_ids = set()
+    person_ids = set()
+    for note in notes:
+        for x in note.visibility or []:
+            _id = str(x.get("id") or "").strip()
+            if not _id:
+                continue
+            if x.get("kind") == "group":
+                group_ids.add(_id)
+            elif x.get("kind") == "person":
+                person_ids.add(_id)
+
+    group_map = {}
+    person_map = {}
+    if group_ids:
+        group_map = {str(gid): name for gid, name in Group.objects.filter(id__in=group_ids).values_list("id", "name")}
+    if person_ids:
+        person_map = {str(pid): name for pid, name in Person.objects.filter(id__in=person_ids).values_list("id", "name")}
+    return group_map, person_map
+
+
+class NoteListSerializer(serializers.ListSerializer):
+    def to_representation(self, data):
+        notes = list(data.all() if isinstance(data, models.manager.BaseManager) else data)
+        names = self.context.get("visibility_names")
+        self._visibility_names = names if names is not None else _visibility_names(notes)
+        return super().to_representation(notes)
+
+
 class NoteSerializer(serializers.ModelSerializer):
     dayId = serializers.UUIDField(source="day_id", read_only=True)
     lastEditedBy = serializers.CharField(source="last_edited_by", read_only=True)
@@ -56,6 +94,7 @@ class NoteSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = Note
+        list_serializer_class = NoteListSerializer
         fields = [
             "id",
             "dayId",
@@ -69,11 +108,10 @@ class NoteSerializer(serializers.ModelSerializer):
     def get_visibility(self, obj):
         raw = obj.visibility or []
 
-        group_ids = [str(x.get("id")) for x in raw if x.get("kind") == "group" and x.get("id")]
-        person_ids = [str(x.get("id")) for x in raw if x.get("kind") == "person" and x.get("id")]
-
-        group_map = {str(g.id): g.name for g in Group.objects.filter(id__in=group_ids)}
-        person_map = {str(p.id): p.name for p in Person.objects.filter(id__in=person_ids)}
+        names = getattr(self.parent, "_visibility_names", None)
+        if names is None:
+            names = _visibility_names([obj])
+        group_map, person_map = names
 
         out = []
         for x in raw:
@@ -103,6 +141,10 @@ class GroupSerializer(serializers.ModelSerializer):
         model = Group
         fields = ["id", "tourId", "name", "color"]
 
+
+GroupValues = ValuesSerializer(GroupSerializer)
+
+
 class PersonSerializer(serializers.ModelSerializer):
     tourId = serializers.UUIDField(source="tour_id", read_only=True)
     roleTitle = serializers.CharField(source="role_title")
@@ -113,6 +155,9 @@ class PersonSerializer(serializers.ModelSerializer):
         fields = ["id", "tourId", "name", "roleTitle", "email", "phone", "groupId", "permission", "connected"]
 
 
+PersonValues = ValuesSerializer(PersonSerializer)
+
+
 class PersonWriteSerializer(serializers.ModelSerializer):
     roleTitle = serializers.CharField(source="role_title", required=False, allow_blank=True)
     groupId = serializers.UUIDField(source="group_id", allow_null=True, required=False)
@@ -132,18 +177,27 @@ class ScheduleTemplateEventSerializer(serializers.ModelSerializer):
         model = ScheduleTemplateEvent
         fields = ["order", "name", "startLocal", "endLocal", "notes", "associations", "startTz", "endTz"]
 
-class ScheduleTemplateSerializer(serializers.ModelSerializer):
+class ScheduleTemplateSummarySerializer(serializers.ModelSerializer):
     createdAt = serializers.DateTimeField(source="created_at", read_only=True)
     eventCount = serializers.SerializerMethodField()
-    events = ScheduleTemplateEventSerializer(many=True, read_only=True)
 
     class Meta:
         model = ScheduleTemplate
-        fields = ["id", "name", "createdAt", "eventCount", "events"]
+        fields = ["id", "name", "createdAt", "eventCount"]
 
     def get_eventCount(self, obj):
+        count = getattr(obj, "event_count", None)
+        if count is not None:
+            return count
         return obj.events.count()
 
+class ScheduleTemplateSerializer(ScheduleTemplateSummarySerializer):
+    events = ScheduleTemplateEventSerializer(many=True, read_only=True)
+
+    class Meta:
+        model = ScheduleTemplate
+        fields = ["id", "name", "createdAt", "eventCount", "events"]
+
 class ScheduleTemplateCreateSerializer(serializers.Serializer):
     name = serializers.CharField()
     events = ScheduleTemplateEventSerializer(many=True)
@@ -218,7 +272,7 @@ class DayLodgingSerializer(serializers.ModelSerializer):
     hotel = serializers.SerializerMethodField()
     checkInISO = serializers.SerializerMethodField()
     checkOutISO = serializers.SerializerMethodField()
-    guests = DayLodgingGuestSerializer(many=True, read_only=True)
+    guests = serializers.SerializerMethodField()
 
     class Meta:
         model = DayLodging
@@ -238,6 +292,13 @@ class DayLodgingSerializer(serializers.ModelSerializer):
             "addressLine": _address_line(h),
         }
 
+    def get_guests(self, obj: DayLodging):
+        # Writers that already know the guest list pass it instead of re-reading it.
+        person_ids = self.context.get("guest_person_ids")
+        if person_ids is None:
+            return DayLodgingGuestSerializer(obj.guests.all(), many=True).data
+        return [{"personId": str(pid)} for pid in person_ids]
+
     def get_checkInISO(self, obj: DayLodging):
         return obj.check_in_iso.isoformat().replace("+00:00", "Z") if obj.check_in_iso else ""
 
@@ -0,0 +1,244 @@
+import random
+import uuid
+from datetime import date, time, timedelta
+from types import SimpleNamespace
+
+from core.associations import index_events, index_notes
+from core.models import (
+    Tour,
+    Venue,
+    Day,
+    Group,
+    Person,
+    Hotel,
+    ScheduleEvent,
+    Contact,
+    Note,
+    DayLodging,
+    DayLodgingGuest,
+    ScheduleTemplate,
+    ScheduleTemplateEvent,
+    hotel_dedup_key,
+)
+
+CITIES = [
+    ("Seattle", "WA"),
+    ("Portland", "OR"),
+    ("San Francisco", "CA"),
+    ("Los Angeles", "CA"),
+    ("Phoenix", "AZ"),
+    ("Denver", "CO"),
+    ("Austin", "TX"),
+    ("Chicago", "IL"),
+    ("Nashville", "TN"),
+    ("Atlanta", "GA"),
+    ("New York", "NY"),
+    ("Boston", "MA"),
+]
+GROUPS = ["Band Party", "Crew", "Production", "Management", "Catering", "Security"]
+ROLES = ["Tour Manager", "Production Manager", "FOH Engineer", "Monitor Engineer", "Backline Tech", "Driver", "Musician"]
+HOTEL_BRANDS = ["Hilton", "Hyatt", "Marriott", "Ace Hotel", "Kimpton", "Sheraton", "Westin", "Holiday Inn"]
+EVENTS = ["Load In", "Lunch", "Soundcheck", "Doors", "Dinner", "Set", "Curfew", "Load Out", "Bus Call", "Lobby Call"]
+DAY_TYPES = ["show", "show", "show", "travel", "off", "rehearsal"]
+
+
+def _uuid(rng):
+    return uuid.UUID(int=rng.getrandbits(128), version=4)
+
+
+def _keyed(hotel):
+    # bulk_create skips Hotel.save(), which normally fills this in.
+    hotel.dedup_key = hotel_dedup_key(hotel.name, hotel.address1, hotel.city, hotel.state, hotel.postal)
+    return hotel
+
+
+def build_tour(
+    days=30,
+    events_per_day=10,
+    notes_per_day=3,
+    people=40,
+    groups=5,
+    hotels=50,
+    seed=0,
+    name="",
+    start=date(2026, 3, 1),
+    batch_size=1000,
+):
+    """
+    Create one synthetic tour with bulk inserts and return the ids it was
+    built from. The same arguments always produce the same rows and ids.
+    """
+    rng = random.Random(seed)
+    counts = {}
+
+    def bulk(model, objs):
+        model.objects.bulk_create(objs, batch_size=batch_size)
+        counts[model.__name__] = counts.get(model.__name__, 0) + len(objs)
+        return objs
+
+    tour = bulk(Tour, [Tour(id=_uuid(rng), name=name or f"Synthetic Tour {seed}", subtitle="synthetic")])[0]
+
+    venues = bulk(
+        Venue,
+        [
+            Venue(id=_uuid(rng), name=f"Venue {i}", address1=f"{100 + i} Main St", city=city, state=state)
+            for i, (city, state) in enumerate(CITIES[: max(1, min(days, len(CITIES)))])
+        ],
+    )
+
+    group_rows = bulk(
+        Group,
+        [
+            Group(id=_uuid(rng), tour=tour, name=GROUPS[i] if i < len(GROUPS) else f"Group {i}")
+            for i in range(groups)
+        ],
+    )
+    person_rows = bulk(
+        Person,
+        [
+            Person(
+                id=_uuid(rng),
+                tour=tour,
+                name=f"Person {i:04d}",
+                role_title=ROLES[i % len(ROLES)],
+                email=f"person{i}@example.com",
+                group=group_rows[i % len(group_rows)] if group_rows else None,
+            )
+            for i in range(people)
+        ],
+    )
+
+    hotel_rows = []
+    for i in range(hotels):
+        city, state = CITIES[i % len(CITIES)]
+        hotel_rows.append(
+            _keyed(
+                Hotel(
+                    id=_uuid(rng),
+                    # Every other hotel is shared between tours.
+                    tour=tour if i % 2 else None,
+                    name=f"{HOTEL_BRANDS[i % len(HOTEL_BRANDS)]} {city} {seed}-{i}",
+                    address1=f"{i + 1} Hotel Row",
+                    city=city,
+                    state=state,
+                    postal=f"{10000 + i}",
+                    source="synthetic",
+                )
+            )
+        )
+    bulk(Hotel, hotel_rows)
+
+    day_rows = []
+    for i in range(days):
+        venue = venues[i % len(venues)]
+        day_rows.append(
+            Day(
+                id=_uuid(rng),
+                tour=tour,
+                date=start + timedelta(days=i),
+                day_type=DAY_TYPES[i % len(DAY_TYPES)],
+                city=venue.city,
+                state=venue.state,
+                venue=venue,
+            )
+        )
+    bulk(Day, day_rows)
+
+    def audience(key):
+        if group_rows and (not person_rows or rng.random() < 0.5):
+            return {key: "group", "id": str(rng.choice(group_rows).id)}
+        if person_rows:
+            return {key: "person", "id": str(rng.choice(person_rows).id)}
+        return None
+
+    events, notes, contacts, lodgings, guests = [], [], [], [], []
+    for day in day_rows:
+        for i in range(events_per_day):
+            minutes = 9 * 60 + i * (14 * 60 // max(events_per_day, 1))
+            refs = [audience("type") for _ in range(rng.randint(0, 2))]
+            events.append(
+                ScheduleEvent(
+                    id=_uuid(rng),
+                    day=day,
+                    name=EVENTS[i % len(EVENTS)],
+                    start_local=time(minutes // 60 % 24, minutes % 60),
+                    associations=[r for r in refs if r],
+                )
+            )
+        for i in range(notes_per_day):
+            refs = [audience("kind") for _ in range(rng.randint(1, 2))]
+            notes.append(
+                Note(
+                    id=_uuid(rng),
+                    day=day,
+                    title=f"Note {i}",
+                    body=f"Synthetic note {i} for {day.date.isoformat()}",
+                    visibility=[r for r in refs if r],
+                )
+            )
+        contacts.append(Contact(id=_uuid(rng), day=day, name=f"Promoter {day.city}", role="Promoter"))
+        if hotel_rows:
+            lodging = DayLodging(id=_uuid(rng), day=day, hotel=rng.choice(hotel_rows), rooms=rng.randint(1, 10))
+            lodgings.append(lodging)
+            for person in rng.sample(person_rows, min(len(person_rows), 8)):
+                guests.append(DayLodgingGuest(id=_uuid(rng), lodging=lodging, person=person))
+
+    bulk(ScheduleEvent, events)
+    bulk(Contact, contacts)
+    bulk(Note, notes)
+    bulk(DayLodging, lodgings)
+    bulk(DayLodgingGuest, guests)
+    counts["ScheduleEventAssociation"] = index_events(events, replace=False)
+    counts["NoteVisibility"] = index_notes(notes, replace=False)
+
+    template = bulk(ScheduleTemplate, [ScheduleTemplate(id=_uuid(rng), tour=tour, name="Show Day")])[0]
+    bulk(
+        ScheduleTemplateEvent,
+        [
+            ScheduleTemplateEvent(
+                id=_uuid(rng), template=template, order=i, name=event, start_local=f"{12 + i:02d}:00"
+            )
+            for i, event in enumerate(EVENTS[:5])
+        ],
+    )
+
+    return SimpleNamespace(
+        tour=tour.id,
+        days=[d.id for d in day_rows],
+        groups=[g.id for g in group_rows],
+        people=[p.id for p in person_rows],
+        hotels=[h.id for h in hotel_rows],
+        notes=[n.id for n in notes],
+        events=[e.id for e in events],
+        templates=[template.id],
+        counts=counts,
+    )
+
+
+def build_hotels(count, seed=0, batch_size=1000):
+    """
+    Bulk-create `count` shared (tourless) hotels, generating and inserting
+    one batch at a time. Yields the number of rows written per batch.
+    """
+    rng = random.Random(f"hotels:{seed}")
+    written = 0
+    while written < count:
+        rows = []
+        for i in range(written, min(written + batch_size, count)):
+            city, state = rng.choice(CITIES)
+            rows.append(
+                _keyed(
+                    Hotel(
+                        id=_uuid(rng),
+                        name=f"{rng.choice(HOTEL_BRANDS)} {city} {seed}-{i}",
+                        address1=f"{rng.randint(1, 9999)} {rng.choice(['Main', 'Oak', 'Pine', 'Market'])} St",
+                        city=city,
+                        state=state,
+                        postal=f"{rng.randint(10000, 99999)}",
+                        source="synthetic",
+                    )
+                )
+            )
+        Hotel.objects.bulk_create(rows, batch_size=batch_size)
+        written += len(rows)
+        yield len(rows)
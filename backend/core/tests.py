@@ -1,3 +1,1528 @@
-from django.test import TestCase
+import asyncio
+import io
+import json
+import os
+import tempfile
+import threading
+import time as clock
+from datetime import date, time, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest import mock
 
-# Create your tests here.
+from asgiref.sync import sync_to_async
+from django.core.exceptions import ImproperlyConfigured
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from core import benchmarks
+from core.archive import export_tour
+from core.associations import index_events, index_notes, notes_for
+from core.changes import changes_since
+from core.hotels import afetch_mapbox_hotels, search_local_hotels
+from core.hotel_index import get_hotel_index, reset_hotel_index
+from core.instrumentation import _Timing, get_request_stats
+from core.nplusone import NPlusOneError, detect_n_plus_one, fingerprint
+from core import views
+from core.serializers import DaySerializer, ScheduleTemplateSummarySerializer
+from core.values import ValuesSerializer
+from core.hotel_cache import GeocodeCache, LocalBackend, DjangoCacheBackend, get_geocode_cache
+from core.pubsub import get_broker
+from core.synthetic import build_tour
+from core.models import (
+    Tour,
+    Venue,
+    Day,
+    Group,
+    Person,
+    Note,
+    ScheduleEvent,
+    Contact,
+    Hotel,
+    DayLodging,
+    DayLodgingGuest,
+    ScheduleTemplate,
+    ScheduleTemplateEvent,
+    ScheduleEventAssociation,
+)
+
+
+# Repeated query shapes inside a request fail the test.
+@override_settings(NPLUSONE_DETECTOR="raise")
+class DaysheetsTestCase(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.tour = Tour.objects.create(name="Test Tour")
+        self.venue = Venue.objects.create(name="The Forum", city="Inglewood", state="CA")
+        self.day = Day.objects.create(
+            tour=self.tour,
+            date=date(2026, 1, 9),
+            day_type="show",
+            city="Inglewood",
+            state="CA",
+            venue=self.venue,
+        )
+        self.band = Group.objects.create(tour=self.tour, name="Band Party")
+        self.crew = Group.objects.create(tour=self.tour, name="Crew")
+        self.person = Person.objects.create(tour=self.tour, name="Frankie Davis", group=self.band)
+
+    def add_notes(self, count):
+        Note.objects.bulk_create(
+            [
+                Note(
+                    day=self.day,
+                    title=f"Note {i}",
+                    visibility=[
+                        {"kind": "group", "id": str(self.band.id if i % 2 else self.crew.id)},
+                        {"kind": "person", "id": str(self.person.id)},
+                    ],
+                )
+                for i in range(count)
+            ]
+        )
+
+    def add_events(self, count, day=None):
+        ScheduleEvent.objects.bulk_create(
+            [
+                ScheduleEvent(
+                    day=day or self.day,
+                    name=f"Event {i}",
+                    start_local=time(i % 24, 0),
+                    associations=[{"type": "group", "id": str(self.band.id)}],
+                )
+                for i in range(count)
+            ]
+        )
+
+    def add_lodging(self, day=None):
+        hotel, _ = Hotel.objects.get_or_create(tour=self.tour, name="Hilton Inglewood", city="Inglewood", state="CA")
+        lodging = DayLodging.objects.create(day=day or self.day, hotel=hotel, rooms=2)
+        DayLodgingGuest.objects.create(lodging=lodging, person=self.person)
+        return lodging
+
+    def add_hotels(self):
+        self.other_tour = Tour.objects.create(name="Other Tour")
+        Hotel.objects.bulk_create(
+            [
+                Hotel(name="Ace Hotel", address1="1 Hilton Way", city="Portland", state="OR", postal="97204"),
+                Hotel(tour=self.tour, name="The Hilton Portland", city="Portland", state="OR"),
+                Hotel(name="Hilton Garden Inn", city="Seattle", state="WA"),
+                Hotel(tour=self.other_tour, name="Hilton Private", city="Austin", state="TX"),
+                Hotel(name="Hyatt Regency", city="Portland", state="OR", postal="97232"),
+            ]
+        )
+
+
+class NoteVisibilityTests(DaysheetsTestCase):
+    def test_day_context_query_count_is_independent_of_note_count(self):
+        self.add_notes(3)
+        with self.assertNumQueries(7):
+            res = self.client.get(f"/api/days/{self.day.id}/context/")
+        self.assertEqual(len(res.json()["notes"]), 3)
+
+        self.add_notes(40)
+        with self.assertNumQueries(7):
+            res = self.client.get(f"/api/days/{self.day.id}/context/")
+        self.assertEqual(len(res.json()["notes"]), 43)
+
+    def test_visibility_names_are_resolved(self):
+        self.add_notes(2)
+        res = self.client.get(f"/api/days/{self.day.id}/context/")
+        names = {(v["kind"], v["name"]) for n in res.json()["notes"] for v in n["visibility"]}
+        self.assertEqual(names, {("group", "Band Party"), ("group", "Crew"), ("person", "Frankie Davis")})
+
+    def test_create_note_returns_visibility_names(self):
+        res = self.client.post(
+            f"/api/days/{self.day.id}/notes/",
+            {"title": "Bus call", "visibility": [{"kind": "group", "id": str(self.band.id)}, {"kind": "bogus", "id": "x"}]},
+            format="json",
+        )
+        self.assertEqual(res.status_code, 201)
+        self.assertEqual(res.json()["visibility"], [{"kind": "group", "id": str(self.band.id), "name": "Band Party"}])
+
+
+class DaySheetTests(DaysheetsTestCase):
+    def test_sheet_returns_full_day(self):
+        self.add_events(3)
+        self.add_notes(2)
+        self.add_lodging()
+        Contact.objects.create(day=self.day, name="Nancy Wright", role="Local PM")
+
+        res = self.client.get(f"/api/days/{self.day.id}/sheet/")
+        self.assertEqual(res.status_code, 200)
+        data = res.json()
+        self.assertEqual(data["day"]["id"], str(self.day.id))
+        self.assertEqual([e["name"] for e in data["schedule"]], ["Event 0", "Event 1", "Event 2"])
+        self.assertEqual(data["venue"]["name"], "The Forum")
+        self.assertEqual(len(data["contacts"]), 1)
+        self.assertIn(data["notes"][0]["visibility"][0]["name"], ["Band Party", "Crew"])
+        self.assertEqual(data["lodging"]["hotel"]["name"], "Hilton Inglewood")
+        self.assertEqual(data["lodging"]["guests"], [{"personId": str(self.person.id)}])
+        self.assertEqual([g["name"] for g in data["groups"]], ["Band Party", "Crew"])
+        self.assertEqual([p["name"] for p in data["people"]], ["Frankie Davis"])
+
+    def test_sheet_query_budget(self):
+        self.add_lodging()
+        self.add_events(5)
+        self.add_notes(5)
+        with self.assertNumQueries(7):
+            self.client.get(f"/api/days/{self.day.id}/sheet/")
+
+        self.add_events(50)
+        self.add_notes(50)
+        for i in range(10):
+            Person.objects.create(tour=self.tour, name=f"Crew {i}", group=self.crew)
+        with self.assertNumQueries(7):
+            self.client.get(f"/api/days/{self.day.id}/sheet/")
+
+    def test_sheet_without_lodging(self):
+        with self.assertNumQueries(6):
+            res = self.client.get(f"/api/days/{self.day.id}/sheet/")
+        self.assertIsNone(res.json()["lodging"])
+
+
+class DayScheduleBatchTests(DaysheetsTestCase):
+    def batch(self, payload):
+        return self.client.post(f"/api/days/{self.day.id}/schedule/batch/", payload, format="json")
+
+    def test_batch_applies_all_ops_and_returns_events(self):
+        self.add_events(3)
+        first, second, third = ScheduleEvent.objects.filter(day=self.day).order_by("start_local")
+
+        res = self.batch(
+            {
+                "delete": [str(third.id)],
+                "update": [
+                    {"id": str(first.id), "name": "Bus Call", "status": "done"},
+                    {"id": str(second.id), "startLocal": "16:30:00"},
+                ],
+                "create": [{"name": "Doors", "startLocal": "19:00:00"}],
+            }
+        )
+        self.assertEqual(res.status_code, 200)
+        events = res.json()["events"]
+        self.assertEqual(
+            [(e["name"], e["startLocal"], e["status"]) for e in events],
+            [("Bus Call", "00:00:00", "done"), ("Event 1", "16:30:00", "todo"), ("Doors", "19:00:00", "todo")],
+        )
+        self.assertFalse(ScheduleEvent.objects.filter(id=third.id).exists())
+
+    def test_batch_query_count_is_independent_of_batch_size(self):
+        def run(count):
+            self.add_events(count)
+            ids = list(ScheduleEvent.objects.filter(day=self.day).values_list("id", flat=True))
+            payload = {
+                "update": [{"id": str(ev_id), "status": "done"} for ev_id in ids],
+                "create": [{"name": f"New {i}"} for i in range(count)],
+            }
+            with self.assertNumQueries(9):
+                res = self.batch(payload)
+            self.assertEqual(res.status_code, 200)
+            ScheduleEvent.objects.all().delete()
+
+        run(2)
+        run(60)
+
+    def test_batch_reports_item_indices_and_writes_nothing(self):
+        self.add_events(1)
+        ev = ScheduleEvent.objects.get(day=self.day)
+
+        res = self.batch(
+            {
+                "update": [{"id": str(ev.id), "name": "Renamed"}, {"name": "no id"}],
+                "create": [{"name": "Ok"}, {"startLocal": "nope"}],
+            }
+        )
+        self.assertEqual(res.status_code, 400)
+        errors = [(e["op"], e["index"]) for e in res.json()["errors"]]
+        self.assertEqual(errors, [("update", 1), ("create", 1)])
+        ev.refresh_from_db()
+        self.assertEqual(ev.name, "Event 0")
+        self.assertEqual(ScheduleEvent.objects.filter(day=self.day).count(), 1)
+
+    def test_batch_rolls_back_when_update_target_is_missing(self):
+        self.add_events(2)
+        first, second = ScheduleEvent.objects.filter(day=self.day).order_by("start_local")
+
+        res = self.batch({"delete": [str(first.id)], "update": [{"id": str(first.id), "name": "Gone"}]})
+        self.assertEqual(res.status_code, 400)
+        self.assertEqual(res.json()["errors"][0]["index"], 0)
+        self.assertTrue(ScheduleEvent.objects.filter(id=first.id).exists())
+
+
+class ScheduleTemplateApplyTests(DaysheetsTestCase):
+    def setUp(self):
+        super().setUp()
+        self.template = ScheduleTemplate.objects.create(tour=self.tour, name="Show Day")
+        ScheduleTemplateEvent.objects.bulk_create(
+            [
+                ScheduleTemplateEvent(template=self.template, order=0, name="Load In", start_local="07:00"),
+                ScheduleTemplateEvent(
+                    template=self.template,
+                    order=1,
+                    name="Press Call",
+                    start_local="12:00",
+                    end_local="13:00",
+                    start_tz="America/New_York",
+                ),
+            ]
+        )
+        self.days = [self.day]
+        for i in range(1, 40):
+            self.days.append(
+                Day.objects.create(
+                    tour=self.tour,
+                    date=self.day.date + timedelta(days=i),
+                    day_type="show" if i % 2 else "off",
+                    city="Inglewood",
+                    venue=self.venue,
+                )
+            )
+
+    def apply(self, payload):
+        return self.client.post(
+            f"/api/tours/{self.tour.id}/schedule-templates/{self.template.id}/apply/", payload, format="json"
+        )
+
+    def test_apply_to_date_range_with_day_type_filter(self):
+        with self.assertNumQueries(9):
+            res = self.apply({"from": "2026-01-09", "to": "2026-02-28", "dayTypes": ["show"]})
+        self.assertEqual(res.status_code, 201)
+        self.assertEqual(res.json()["created"], 42)
+        self.assertEqual(ScheduleEvent.objects.filter(day__day_type="off").count(), 0)
+
+    def test_apply_converts_template_timezone_to_day_tz(self):
+        res = self.apply({"dayIds": [str(self.day.id)]})
+        self.assertEqual(res.status_code, 201)
+        events = {e.name: e for e in ScheduleEvent.objects.filter(day=self.day)}
+        self.assertEqual(events["Load In"].start_local, time(7, 0))
+        self.assertEqual(events["Press Call"].start_local, time(9, 0))
+        self.assertEqual(events["Press Call"].end_local, time(10, 0))
+
+    def test_apply_replace_clears_existing_events(self):
+        self.add_events(3)
+        self.apply({"dayIds": [str(self.day.id)], "replace": True})
+        self.assertEqual(ScheduleEvent.objects.filter(day=self.day).count(), 2)
+
+    def test_apply_requires_targets(self):
+        res = self.apply({})
+        self.assertEqual(res.status_code, 400)
+        res = self.apply({"from": "2026-02-30", "to": "2026-03-01"})
+        self.assertEqual(res.status_code, 400)
+
+
+class ScheduleTemplateListTests(DaysheetsTestCase):
+    def add_templates(self, count):
+        for i in range(count):
+            template = ScheduleTemplate.objects.create(tour=self.tour, name=f"Template {i}")
+            ScheduleTemplateEvent.objects.bulk_create(
+                [ScheduleTemplateEvent(template=template, order=j, name=f"Event {j}") for j in (2, 0, 1)]
+            )
+
+    def test_list_query_count_is_independent_of_template_count(self):
+        self.add_templates(2)
+        with self.assertNumQueries(2):
+            self.client.get(f"/api/tours/{self.tour.id}/schedule-templates/")
+
+        self.add_templates(50)
+        with self.assertNumQueries(2):
+            res = self.client.get(f"/api/tours/{self.tour.id}/schedule-templates/")
+        data = res.json()
+        self.assertEqual(len(data), 52)
+        self.assertEqual(data[0]["eventCount"], 3)
+        self.assertEqual([e["name"] for e in data[0]["events"]], ["Event 0", "Event 1", "Event 2"])
+
+    def test_summary_mode_omits_events(self):
+        self.add_templates(5)
+        with self.assertNumQueries(1):
+            res = self.client.get(f"/api/tours/{self.tour.id}/schedule-templates/?summary=1")
+        self.assertEqual(set(res.json()[0].keys()), {"id", "name", "createdAt", "eventCount"})
+        self.assertEqual(res.json()[0]["eventCount"], 3)
+
+
+class PaginationTests(DaysheetsTestCase):
+    def add_days(self, count):
+        Day.objects.bulk_create(
+            [
+                Day(
+                    tour=self.tour,
+                    date=self.day.date + timedelta(days=i // 2 + 1),
+                    day_type="show",
+                    city="Inglewood",
+                    venue=self.venue,
+                )
+                for i in range(count)
+            ]
+        )
+
+    def walk(self, url):
+        seen = []
+        cursor = None
+        while True:
+            params = {"limit": 7}
+            if cursor:
+                params["after"] = cursor
+            with self.assertNumQueries(2):
+                data = self.client.get(url, params).json()
+            seen.extend(data["results"])
+            cursor = data["next"]
+            if not cursor:
+                return seen
+
+    def test_days_without_params_returns_plain_list(self):
+        self.add_days(3)
+        res = self.client.get(f"/api/tours/{self.tour.id}/days/")
+        self.assertEqual(len(res.json()), 4)
+
+    def test_days_keyset_walk_matches_full_listing(self):
+        self.add_days(30)
+        full = self.client.get(f"/api/tours/{self.tour.id}/days/").json()
+        paged = self.walk(f"/api/tours/{self.tour.id}/days/")
+        self.assertEqual(len(paged), 31)
+        self.assertEqual({d["id"] for d in paged}, {d["id"] for d in full})
+        self.assertEqual([d["dateISO"] for d in paged], [d["dateISO"] for d in full])
+
+    def test_days_date_range_filter(self):
+        self.add_days(10)
+        res = self.client.get(f"/api/tours/{self.tour.id}/days/", {"from": "2026-01-10", "to": "2026-01-11"})
+        self.assertEqual({d["dateISO"] for d in res.json()}, {"2026-01-10", "2026-01-11"})
+        self.assertEqual(len(res.json()), 4)
+
+    def test_schedule_keyset_walk_covers_every_event(self):
+        self.add_events(20)
+        self.add_events(5)
+        ScheduleEvent.objects.create(day=self.day, name="TBD")
+        paged = self.walk(f"/api/days/{self.day.id}/schedule/")
+        self.assertEqual(len(paged), 26)
+        self.assertEqual(len({e["id"] for e in paged}), 26)
+        self.assertIsNone(paged[-1]["startLocal"])
+
+    def test_invalid_cursor_is_rejected(self):
+        res = self.client.get(f"/api/tours/{self.tour.id}/days/", {"after": "garbage"})
+        self.assertEqual(res.status_code, 400)
+
+
+class ConditionalGetTests(DaysheetsTestCase):
+    def assert_revalidates(self, url, change):
+        res = self.client.get(url)
+        etag = res["ETag"]
+        self.assertTrue(etag.startswith('"'))
+
+        res = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(res.status_code, 304)
+
+        change()
+        res = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(res.status_code, 200)
+        self.assertNotEqual(res["ETag"], etag)
+
+    def test_day_schedule_etag(self):
+        self.add_events(2)
+        ev = ScheduleEvent.objects.filter(day=self.day).first()
+        url = f"/api/days/{self.day.id}/schedule/"
+        self.assert_revalidates(
+            url,
+            lambda: self.client.post(
+                f"/api/days/{self.day.id}/schedule/batch/", {"update": [{"id": str(ev.id), "status": "done"}]}, format="json"
+            ),
+        )
+        self.assert_revalidates(url, lambda: ScheduleEvent.objects.filter(id=ev.id).delete())
+
+    def test_person_schedule_etag_tracks_group_moves(self):
+        self.add_events(2)
+        index_events(ScheduleEvent.objects.all())
+        url = f"/api/days/{self.day.id}/schedule/?person={self.person.id}"
+        self.assertEqual(len(self.client.get(url).json()), 2)
+        # A queryset update skips auto_now, as does the SET_NULL when a group is deleted.
+        self.assert_revalidates(url, lambda: Person.objects.filter(id=self.person.id).update(group=self.crew))
+        self.assertEqual(self.client.get(url).json(), [])
+
+    def test_day_context_etag_tracks_notes_aftershow_and_names(self):
+        self.add_notes(2)
+        url = f"/api/days/{self.day.id}/context/"
+        self.assert_revalidates(url, lambda: self.client.post(f"/api/days/{self.day.id}/aftershow/", {"aftershow": "Bar"}))
+        self.assert_revalidates(url, lambda: self.client.post(f"/api/days/{self.day.id}/notes/", {"title": "New"}))
+        self.assert_revalidates(
+            url, lambda: self.client.put(f"/api/tours/{self.tour.id}/groups/{self.band.id}/", {"name": "Band"})
+        )
+
+    def test_tour_personnel_and_days_etag(self):
+        self.assert_revalidates(
+            f"/api/tours/{self.tour.id}/personnel/",
+            lambda: self.client.put(f"/api/tours/{self.tour.id}/personnel/{self.person.id}/", {"phone": "555"}),
+        )
+        self.assert_revalidates(f"/api/tours/{self.tour.id}/days/", lambda: self.day.save())
+
+    def test_not_modified_skips_serialization(self):
+        self.add_events(30)
+        url = f"/api/days/{self.day.id}/schedule/"
+        etag = self.client.get(url)["ETag"]
+        with self.assertNumQueries(1):
+            res = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(res.status_code, 304)
+
+    def test_etag_varies_with_query_string(self):
+        url = f"/api/tours/{self.tour.id}/days/"
+        self.assertNotEqual(self.client.get(url)["ETag"], self.client.get(url, {"limit": 1})["ETag"])
+
+
+class TourChangesTests(DaysheetsTestCase):
+    def changes(self, since):
+        return self.client.get(f"/api/tours/{self.tour.id}/changes/", {"since": since}).json()
+
+    def test_writes_bump_revision_and_log_changes(self):
+        res = self.client.post(
+            f"/api/days/{self.day.id}/schedule/batch/", {"create": [{"name": "Doors"}, {"name": "Load In"}]}, format="json"
+        )
+        event_ids = {e["id"] for e in res.json()["events"]}
+        self.client.post(f"/api/days/{self.day.id}/notes/", {"title": "Crew Notes"})
+        self.client.put(f"/api/tours/{self.tour.id}/personnel/{self.person.id}/", {"phone": "555"})
+
+        data = self.changes(0)
+        self.assertEqual(data["revision"], 3)
+        self.assertEqual(
+            sorted((c["entity"], c["op"], c["revision"]) for c in data["changes"]),
+            [
+                ("note", "create", 2),
+                ("person", "update", 3),
+                ("scheduleEvent", "create", 1),
+                ("scheduleEvent", "create", 1),
+            ],
+        )
+        events = [c for c in data["changes"] if c["entity"] == "scheduleEvent"]
+        self.assertEqual({c["id"] for c in events}, event_ids)
+        self.assertEqual({c["data"]["name"] for c in events}, {"Doors", "Load In"})
+
+    def test_since_returns_only_deltas_collapsed_per_entity(self):
+        self.add_events(2)
+        first, second = ScheduleEvent.objects.filter(day=self.day).order_by("start_local")
+        url = f"/api/days/{self.day.id}/schedule/batch/"
+        self.client.post(url, {"update": [{"id": str(first.id), "status": "done"}]}, format="json")
+        self.client.post(url, {"update": [{"id": str(first.id), "name": "Bus Call"}]}, format="json")
+        self.client.post(url, {"delete": [str(second.id)]}, format="json")
+
+        data = self.changes(1)
+        self.assertEqual(data["revision"], 3)
+        self.assertEqual(
+            sorted((c["id"], c["op"], c["revision"]) for c in data["changes"]),
+            sorted([(str(first.id), "update", 2), (str(second.id), "delete", 3)]),
+        )
+        updated = next(c for c in data["changes"] if c["op"] == "update")
+        self.assertEqual((updated["data"]["name"], updated["data"]["status"]), ("Bus Call", "done"))
+
+        self.assertEqual(self.changes(3)["changes"], [])
+
+    def test_group_delete_logs_member_updates(self):
+        self.client.delete(f"/api/tours/{self.tour.id}/groups/{self.band.id}/")
+        data = self.changes(0)
+        self.assertEqual(
+            sorted((c["entity"], c["op"]) for c in data["changes"]),
+            [("group", "delete"), ("person", "update")],
+        )
+        person = next(c for c in data["changes"] if c["entity"] == "person")
+        self.assertIsNone(person["data"]["groupId"])
+
+    def test_template_changes_list_events_in_order(self):
+        events = [{"name": name, "order": order} for name, order in [("Doors", 2), ("Load In", 0), ("Soundcheck", 1)]]
+        self.client.post(f"/api/days/{self.day.id}/schedule-templates/", {"name": "Show Day", "events": events}, format="json")
+        template = next(c for c in self.changes(0)["changes"] if c["entity"] == "scheduleTemplate")
+        self.assertEqual([e["name"] for e in template["data"]["events"]], ["Load In", "Soundcheck", "Doors"])
+
+    def test_changes_are_paged_on_whole_revisions(self):
+        self.client.post(
+            f"/api/days/{self.day.id}/schedule/batch/", {"create": [{"name": "Doors"}, {"name": "Load In"}]}, format="json"
+        )
+        self.client.post(f"/api/days/{self.day.id}/notes/", {"title": "Crew Notes"})
+        self.client.put(f"/api/tours/{self.tour.id}/personnel/{self.person.id}/", {"phone": "555"})
+        self.assertIsNone(self.changes(0)["next"])
+
+        page = changes_since(self.tour.id, 0, limit=2)
+        self.assertEqual(([c["revision"] for c in page["changes"]], page["next"]), ([1, 1], 1))
+        page = changes_since(self.tour.id, page["next"], limit=2)
+        self.assertEqual((sorted(c["revision"] for c in page["changes"]), page["next"]), ([2, 3], None))
+
+        self.assertEqual(changes_since(self.tour.id, 0, limit=1), {"resync": True})
+
+    def test_noop_writes_do_not_bump_revision(self):
+        self.client.delete(f"/api/days/{self.day.id}/notes/{self.person.id}/")
+        self.client.post(f"/api/days/{self.day.id}/schedule/batch/", {}, format="json")
+        self.assertEqual(self.changes(0)["revision"], 0)
+
+
+class TourStreamTests(DaysheetsTestCase):
+    def stream_url(self):
+        return f"/api/tours/{self.tour.id}/stream/"
+
+    async def next_event(self, content):
+        while True:
+            chunk = (await asyncio.wait_for(anext(content), 2)).decode()
+            if not chunk.startswith(":") and not chunk.startswith("retry"):
+                return chunk
+
+    def test_writes_publish_compact_messages_on_commit(self):
+        with mock.patch("core.changes.get_broker") as broker:
+            with self.captureOnCommitCallbacks(execute=True):
+                self.client.post(f"/api/days/{self.day.id}/notes/", {"title": "Crew Notes"})
+        tour_id, message = broker.return_value.publish.call_args.args
+        self.assertEqual(tour_id, self.tour.id)
+        self.assertEqual(message["revision"], 1)
+        self.assertEqual([(c["entity"], c["op"]) for c in message["changes"]], [("note", "create")])
+
+    async def test_stream_replays_from_last_event_id_then_pushes_live(self):
+        res = await self.async_client.get(self.stream_url(), headers={"Last-Event-ID": "0"})
+        self.assertEqual(res["Content-Type"], "text/event-stream")
+        content = res.streaming_content
+
+        get_broker().publish(self.tour.id, {"revision": 1, "changes": [{"entity": "note", "id": "x", "op": "create"}]})
+        event = await self.next_event(content)
+        self.assertTrue(event.startswith("id: 1\nevent: change\n"))
+        self.assertEqual(json.loads(event.split("data: ", 1)[1])["changes"][0]["entity"], "note")
+
+        get_broker().publish(self.tour.id, {"revision": 1, "changes": []})
+        get_broker().publish(self.tour.id, {"resync": True})
+        self.assertEqual(await self.next_event(content), "event: resync\ndata: {}\n\n")
+        res.close()
+
+    async def test_unknown_tour_is_404(self):
+        res = await self.async_client.get("/api/tours/00000000-0000-0000-0000-000000000000/stream/")
+        self.assertEqual(res.status_code, 404)
+
+    def test_stream_needs_asgi(self):
+        res = self.client.get(self.stream_url())
+        self.assertEqual(res.status_code, 501)
+        self.assertIn("detail", res.json())
+
+    def test_writes_survive_subscriber_on_closed_loop(self):
+        broker = get_broker()
+
+        async def subscribe():
+            return broker.subscribe(self.tour.id)
+
+        loop = asyncio.new_event_loop()
+        loop.run_until_complete(subscribe())
+        loop.close()
+        self.assertEqual(broker.subscriber_count(self.tour.id), 1)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            res = self.client.post(f"/api/days/{self.day.id}/notes/", {"title": "Crew Notes"})
+        self.assertEqual(res.status_code, 201)
+        self.assertEqual(broker.subscriber_count(self.tour.id), 0)
+
+    async def test_500_idle_subscribers_on_one_event_loop(self):
+        broker = get_broker()
+        started = clock.perf_counter()
+        responses = [await self.async_client.get(self.stream_url()) for _ in range(500)]
+        streams = [res.streaming_content for res in responses]
+        for content in streams:
+            await anext(content)
+        self.assertEqual(broker.subscriber_count(self.tour.id), 500)
+
+        broker.publish(self.tour.id, {"revision": 7, "changes": []})
+        events = await asyncio.gather(*[self.next_event(content) for content in streams])
+        elapsed = clock.perf_counter() - started
+
+        self.assertTrue(all(e.startswith("id: 7\n") for e in events))
+        self.assertLess(elapsed, 30)
+
+        for res in responses:
+            res.close()
+        self.assertEqual(broker.subscriber_count(self.tour.id), 0)
+
+
+class FakeMapboxHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    delay = 0
+    requests = []
+    peers = []
+
+    def do_GET(self):
+        type(self).requests.append(self.path)
+        type(self).peers.append(self.client_address)
+        clock.sleep(type(self).delay)
+        body = json.dumps(
+            {
+                "features": [
+                    {
+                        "id": "poi.1",
+                        "text": "Hilton Portland",
+                        "place_name": "Hilton Portland, 921 SW 6th Ave, Portland, Oregon 97204",
+                        "context": [
+                            {"id": "place.1", "text": "Portland"},
+                            {"id": "region.1", "text": "Oregon"},
+                            {"id": "postcode.1", "text": "97204"},
+                        ],
+                    }
+                ]
+            }
+        ).encode()
+        try:
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+
+    def log_message(self, *args):
+        pass
+
+
+class HotelSearchAsyncTests(DaysheetsTestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.server = ThreadingHTTPServer(("127.0.0.1", 0), FakeMapboxHandler)
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+        cls.mapbox = override_settings(
+            MAPBOX_ACCESS_TOKEN="test-token",
+            MAPBOX_GEOCODING_URL=f"http://127.0.0.1:{cls.server.server_port}/geocoding",
+            HOTEL_SEARCH_EXTERNAL_BUDGET=0.3,
+        )
+        cls.mapbox.enable()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.mapbox.disable()
+        cls.server.shutdown()
+        cls.server.server_close()
+        super().tearDownClass()
+
+    def setUp(self):
+        super().setUp()
+        FakeMapboxHandler.delay = 0
+        FakeMapboxHandler.requests = []
+        FakeMapboxHandler.peers = []
+        get_geocode_cache().clear()
+        Hotel.objects.create(tour=self.tour, name="Hilton Inglewood", city="Inglewood", state="CA")
+
+    async def test_merges_local_and_external_results(self):
+        res = await self.async_client.get("/api/hotels/search/async/", {"q": "Hilton", "tourId": str(self.tour.id)})
+        data = res.json()
+        self.assertEqual([h["source"] for h in data], ["db", "external"])
+        self.assertEqual(data[1]["city"], "Portland")
+        self.assertTrue(FakeMapboxHandler.requests[0].startswith("/geocoding/Hilton.json?"))
+
+    async def test_slow_external_lookup_does_not_hold_local_results(self):
+        FakeMapboxHandler.delay = 2
+        started = clock.perf_counter()
+        res = await self.async_client.get("/api/hotels/search/async/", {"q": "Hilton"})
+        self.assertLess(clock.perf_counter() - started, 1.5)
+        self.assertEqual([h["name"] for h in res.json()], ["Hilton Inglewood"])
+
+    def test_lookups_share_a_keep_alive_connection(self):
+        # Each sync request runs the async view on a fresh event loop, as under WSGI.
+        for q in ["Hilton", "Hyatt"]:
+            self.assertEqual(asyncio.run(afetch_mapbox_hotels(q))[0]["name"], "Hilton Portland")
+        self.assertEqual(len(FakeMapboxHandler.requests), 2)
+        self.assertEqual(len(set(FakeMapboxHandler.peers)), 1)
+
+    def test_sync_view_uses_same_external_source(self):
+        res = self.client.get("/api/hotels/search/", {"q": "Hilton"})
+        self.assertEqual([h["source"] for h in res.json()], ["db", "external"])
+
+    def test_repeated_and_longer_prefixes_are_served_from_cache(self):
+        for q in ["Hil", "Hilt", "Hilto", "Hil"]:
+            res = self.client.get("/api/hotels/search/", {"q": q})
+            self.assertEqual(res.json()[-1]["name"], "Hilton Portland")
+        self.assertEqual(len(FakeMapboxHandler.requests), 1)
+
+        stats = self.client.get("/api/hotels/search/stats/").json()["geocodeCache"]
+        self.assertEqual((stats["misses"], stats["prefix_hits"], stats["hits"]), (1, 2, 1))
+
+
+def hotel(name, city="Portland"):
+    return {"key": f"ext:{name}", "name": name, "addressLine": f"{name}, {city}"}
+
+
+class GeocodeCacheTests(TestCase):
+    def test_lru_eviction(self):
+        cache = GeocodeCache(LocalBackend(max_entries=2), ttl=60, negative_ttl=10)
+        cache.set("alpha", 8, [hotel("Alpha")])
+        cache.set("bravo", 8, [hotel("Bravo")])
+        cache.get("alpha", 8)
+        cache.set("charlie", 8, [hotel("Charlie")])
+
+        self.assertIsNotNone(cache.get("alpha", 8))
+        self.assertIsNone(cache.get("bravo", 8))
+        self.assertEqual(cache.stats()["evictions"], 1)
+
+    def test_ttl_and_negative_ttl(self):
+        cache = GeocodeCache(LocalBackend(max_entries=10), ttl=60, negative_ttl=10)
+        with mock.patch("core.hotel_cache.time.monotonic", return_value=1000):
+            cache.set("hilton", 8, [hotel("Hilton")])
+            cache.set("zzzz", 8, [])
+        with mock.patch("core.hotel_cache.time.monotonic", return_value=1030):
+            self.assertEqual(cache.get("zzzz", 8), None)
+            self.assertEqual(len(cache.get("hilton", 8)), 1)
+        with mock.patch("core.hotel_cache.time.monotonic", return_value=1061):
+            self.assertIsNone(cache.get("hilton", 8))
+
+    def test_negative_results_are_cached_and_counted(self):
+        cache = GeocodeCache(LocalBackend(max_entries=10), ttl=60, negative_ttl=10)
+        cache.set("  ZZZZ ", 8, [])
+        self.assertEqual(cache.get("zzzz", 8), [])
+        self.assertEqual(cache.stats()["negative_hits"], 1)
+
+    def test_negative_prefix_is_not_reused(self):
+        cache = GeocodeCache(LocalBackend(max_entries=10), ttl=60, negative_ttl=10)
+        cache.set("hi", 8, [])
+        self.assertIsNone(cache.get("hilton", 8))
+        self.assertEqual(cache.stats()["prefix_hits"], 0)
+        self.assertEqual(cache.stats()["misses"], 1)
+
+    def test_prefix_reuse_only_for_exhaustive_results(self):
+        cache = GeocodeCache(LocalBackend(max_entries=10), ttl=60, negative_ttl=10)
+        cache.set("hil", 3, [hotel("Hilton"), hotel("Hillside Inn")])
+        self.assertEqual([x["name"] for x in cache.get("hilt", 3)], ["Hilton"])
+
+        cache.set("hya", 2, [hotel("Hyatt"), hotel("Hyatt Place")])
+        self.assertIsNone(cache.get("hyat", 2))
+        self.assertIsNone(cache.get("hil", 8))
+
+    @override_settings(CACHES={"geocode": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}})
+    def test_django_cache_backend(self):
+        cache = GeocodeCache(DjangoCacheBackend("geocode"), ttl=60, negative_ttl=10)
+        cache.set("hil", 8, [hotel("Hilton")])
+        self.assertEqual(cache.get("hil", 8), [hotel("Hilton")])
+        self.assertEqual(cache.get("hilto", 8), [hotel("Hilton")])
+        self.assertEqual(asyncio.run(cache.aget("hilton", 8)), [hotel("Hilton")])
+
+
+class LocalHotelSearchTests(DaysheetsTestCase):
+    def setUp(self):
+        super().setUp()
+        self.add_hotels()
+
+    def names(self, q, **kwargs):
+        return [h["name"] for h in search_local_hotels(q, **kwargs)]
+
+    def test_indexed_search_ranks_name_matches_after_tour_priority(self):
+        self.assertEqual(
+            self.names("  HILTON ", tour_id=str(self.tour.id)),
+            ["The Hilton Portland", "Hilton Garden Inn", "Ace Hotel"],
+        )
+
+    def test_indexed_search_matches_every_field(self):
+        self.assertEqual(self.names("97232"), ["Hyatt Regency"])
+        self.assertEqual(self.names("seattle"), ["Hilton Garden Inn"])
+        # Ranking differs by vendor (trigram similarity on Postgres); only the matches matter here.
+        self.assertEqual(sorted(self.names("wa")), ["Ace Hotel", "Hilton Garden Inn"])
+
+    def test_indexed_and_legacy_modes_agree_on_matches(self):
+        for q in ["hilton", "portland", "or", "972", "zzz"]:
+            self.assertEqual(sorted(self.names(q)), sorted(self.names(q, mode="legacy")))
+
+    def test_generated_search_text(self):
+        hotel = Hotel.objects.get(name="Hyatt Regency")
+        self.assertEqual(hotel.search_text, "hyatt regency  portland or 97232")
+
+
+@override_settings(HOTEL_AUTOCOMPLETE_INDEX=True)
+class HotelIndexTests(DaysheetsTestCase):
+    def setUp(self):
+        super().setUp()
+        self.add_hotels()
+        reset_hotel_index()
+        self.addCleanup(reset_hotel_index)
+
+    def test_index_serves_search_without_queries(self):
+        get_hotel_index()
+        with self.assertNumQueries(0):
+            results = search_local_hotels("hil port", tour_id=str(self.tour.id))
+        self.assertEqual([h["name"] for h in results], ["The Hilton Portland"])
+        self.assertEqual(results, search_local_hotels("hilton portland", tour_id=str(self.tour.id), mode="indexed"))
+
+    def names(self, q, **kwargs):
+        return [h["name"] for h in search_local_hotels(q, **kwargs)]
+
+    def test_index_partitions_by_tour(self):
+        index = get_hotel_index()
+        names = [h.name for h in index.search("hilton", str(self.tour.id))]
+        self.assertEqual(names, ["The Hilton Portland", "Hilton Garden Inn"])
+        self.assertIn("Hilton Private", [h.name for h in index.search("hilton")])
+
+    def test_index_falls_back_to_sql_for_substring_matches(self):
+        get_hotel_index()
+        self.assertEqual(self.names("ilton way"), ["Ace Hotel"])
+
+    def test_saved_lodging_hotel_is_indexed_on_commit(self):
+        get_hotel_index()
+        with self.captureOnCommitCallbacks(execute=True):
+            res = self.client.post(
+                f"/api/days/{self.day.id}/lodging/",
+                {"hotel": {"name": "Kimpton Riverplace", "city": "Portland", "state": "OR"}},
+                format="json",
+            )
+        self.assertEqual(res.status_code, 200)
+        with self.assertNumQueries(0):
+            self.assertEqual(self.names("kimp", tour_id=str(self.tour.id)), ["Kimpton Riverplace"])
+
+
+class SaveDayLodgingTests(DaysheetsTestCase):
+    def save(self, hotel, guests=()):
+        return self.client.post(
+            f"/api/days/{self.day.id}/lodging/",
+            {"hotel": hotel, "rooms": 2, "guests": [{"personId": str(pid)} for pid in guests]},
+            format="json",
+        )
+
+    def test_hotels_are_deduplicated_by_normalized_identity(self):
+        first = self.save({"name": "Ace Hotel", "address1": "1022 SW Stark St", "city": "Portland"})
+        second = self.save({"name": "  ace hotel ", "address1": "1022 SW Stark St.", "city": "PORTLAND"})
+        self.assertEqual(first.json()["hotel"]["id"], second.json()["hotel"]["id"])
+        self.assertEqual(Hotel.objects.count(), 1)
+
+    def test_global_hotel_is_reused(self):
+        hotel = Hotel.objects.create(name="Hotel Café", city="Montréal")
+        res = self.save({"name": "Hotel Cafe", "city": "Montreal", "placeId": "poi.1"})
+        self.assertEqual(res.json()["hotel"]["id"], str(hotel.id))
+        hotel.refresh_from_db()
+        self.assertEqual(hotel.place_id, "poi.1")
+
+    def test_guest_list_is_diffed(self):
+        other = Person.objects.create(tour=self.tour, name="Sam Lee")
+        self.save({"name": "Ace Hotel"}, [self.person.id, other.id])
+        kept = DayLodgingGuest.objects.get(person=self.person)
+
+        third = Person.objects.create(tour=self.tour, name="Alex Kim")
+        res = self.save({"name": "Ace Hotel"}, [third.id, self.person.id, self.person.id])
+        self.assertEqual(
+            [g["personId"] for g in res.json()["guests"]],
+            [str(third.id), str(self.person.id)],
+        )
+        self.assertTrue(DayLodgingGuest.objects.filter(id=kept.id).exists())
+        self.assertEqual(
+            set(DayLodgingGuest.objects.values_list("person_id", flat=True)),
+            {self.person.id, third.id},
+        )
+
+    def test_check_in_out_are_returned_as_stored_utc(self):
+        res = self.client.post(
+            f"/api/days/{self.day.id}/lodging/",
+            {"hotel": {"name": "Ace Hotel"}, "checkInISO": "2026-01-09T15:00:00+02:00", "checkOutISO": "2026-01-10T11:00:00Z"},
+            format="json",
+        )
+        self.assertEqual(res.json()["checkInISO"], "2026-01-09T13:00:00Z")
+        self.assertEqual(res.json()["checkOutISO"], "2026-01-10T11:00:00Z")
+        lodging = self.client.get(f"/api/days/{self.day.id}/context/").json()["lodging"]
+        self.assertEqual(lodging["checkInISO"], "2026-01-09T13:00:00Z")
+
+    def test_unchanged_resave_only_reads_guests(self):
+        self.save({"name": "Ace Hotel"}, [self.person.id])
+        # Savepoints, day, hotel, lodging upsert (2), guest ids, and the change log (3).
+        with self.assertNumQueries(12):
+            res = self.save({"name": "Ace Hotel"}, [self.person.id])
+        self.assertEqual(res.json()["guests"], [{"personId": str(self.person.id)}])
+
+
+class LodgingBlockTests(DaysheetsTestCase):
+    def setUp(self):
+        super().setUp()
+        self.days = [self.day] + [
+            Day.objects.create(
+                tour=self.tour,
+                date=self.day.date + timedelta(days=i),
+                day_type="off",
+                city="Inglewood",
+                venue=self.venue,
+            )
+            for i in range(1, 5)
+        ]
+
+    def book(self, **body):
+        body.setdefault("hotel", {"name": "Ace Hotel", "city": "Los Angeles"})
+        return self.client.post(f"/api/tours/{self.tour.id}/lodging/block/", body, format="json")
+
+    def test_block_books_every_day_in_range(self):
+        existing = self.add_lodging(day=self.days[1])
+        other = Person.objects.create(tour=self.tour, name="Sam Lee")
+
+        with self.assertNumQueries(17):
+            res = self.book(
+                **{"from": "2026-01-10", "to": "2026-01-12"},
+                rooms=3,
+                checkInTime="15:00",
+                checkOutTime="11:00",
+                guests=[{"personId": str(self.person.id)}, {"personId": str(other.id)}],
+            )
+        self.assertEqual(res.status_code, 200)
+
+        days = res.json()["days"]
+        self.assertEqual([d["date"] for d in days], ["2026-01-10", "2026-01-11", "2026-01-12"])
+        self.assertEqual(days[0]["lodging"]["id"], str(existing.id))
+        self.assertEqual(days[0]["lodging"]["checkInISO"], "2026-01-10T23:00:00Z")
+        self.assertEqual(days[0]["lodging"]["checkOutISO"], "2026-01-11T19:00:00Z")
+        self.assertEqual({d["lodging"]["hotel"]["name"] for d in days}, {"Ace Hotel"})
+
+        self.assertEqual(DayLodging.objects.filter(hotel__name="Ace Hotel", rooms=3).count(), 3)
+        self.assertEqual(DayLodgingGuest.objects.filter(lodging__day__in=self.days[1:4]).count(), 6)
+        self.assertEqual(DayLodgingGuest.objects.filter(lodging=existing).count(), 2)
+
+    def test_rebooking_keeps_unchanged_guests(self):
+        self.book(dayIds=[str(d.id) for d in self.days[:2]], guests=[{"personId": str(self.person.id)}])
+        kept = set(DayLodgingGuest.objects.values_list("id", flat=True))
+
+        res = self.book(dayIds=[str(d.id) for d in self.days[:2]], guests=[{"personId": str(self.person.id)}])
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(set(DayLodgingGuest.objects.values_list("id", flat=True)), kept)
+        self.assertEqual(Hotel.objects.count(), 1)
+
+    def test_block_requires_matching_days(self):
+        self.assertEqual(self.book(**{"from": "2027-01-01", "to": "2027-01-02"}).status_code, 400)
+        self.assertEqual(self.book().status_code, 400)
+        self.assertEqual(self.book(**{"from": "2026-02-30", "to": "2026-03-01"}).status_code, 400)
+
+
+class RoomingListTests(DaysheetsTestCase):
+    def setUp(self):
+        super().setUp()
+        self.days = [self.day]
+        for i in range(1, 4):
+            self.days.append(
+                Day.objects.create(
+                    tour=self.tour,
+                    date=self.day.date + timedelta(days=i),
+                    day_type="off",
+                    city="Las Vegas",
+                    state="NV",
+                    venue=self.venue,
+                )
+            )
+        for day in self.days[:3]:
+            self.add_lodging(day=day)
+        other = Person.objects.create(tour=self.tour, name="Alex Kim", role_title="FOH", group=self.crew)
+        DayLodgingGuest.objects.create(lodging=self.days[0].lodging, person=other)
+        DayLodgingGuest.objects.filter(lodging=self.days[2].lodging).delete()
+
+    def read(self, res):
+        return b"".join(res.streaming_content).decode("utf-8")
+
+    def test_csv_rooming_list(self):
+        res = self.client.get(f"/api/tours/{self.tour.id}/rooming-list/")
+        self.assertEqual(res["Content-Type"], "text/csv; charset=utf-8")
+        with self.assertNumQueries(1):
+            lines = self.read(res).splitlines()
+
+        self.assertEqual(lines[0].split(",")[:4], ["date", "city", "state", "hotel"])
+        self.assertEqual(len(lines), 5)
+        self.assertTrue(lines[1].startswith("2026-01-09,Inglewood,CA,Hilton Inglewood,Inglewood CA,,,2,"))
+        self.assertIn("Alex Kim,FOH,Crew", lines[1])
+        self.assertIn("Frankie Davis,,Band Party", lines[2])
+        self.assertTrue(lines[4].startswith("2026-01-11,Las Vegas,NV,Hilton Inglewood"))
+
+    def test_ndjson_rooming_list_streams_in_chunks(self):
+        with self.settings(ROOMING_LIST_CHUNK_SIZE=1), self.assertNumQueries(2):
+            res = self.client.get(f"/api/tours/{self.tour.id}/rooming-list/?format=ndjson")
+            rows = [json.loads(line) for line in self.read(res).splitlines()]
+
+        self.assertEqual(res["Content-Type"], "application/x-ndjson")
+        self.assertEqual([r["guest"] for r in rows], ["Alex Kim", "Frankie Davis", "Frankie Davis", ""])
+        self.assertEqual(rows[3]["personId"], None)
+        self.assertEqual(rows[0]["rooms"], 2)
+
+    def test_unknown_tour_and_format(self):
+        self.assertEqual(self.client.get(f"/api/tours/{self.day.id}/rooming-list/").status_code, 404)
+        res = self.client.get(f"/api/tours/{self.tour.id}/rooming-list/?format=xml", HTTP_ACCEPT="text/csv")
+        self.assertEqual(res.status_code, 400)
+        self.assertEqual(res.json(), {"detail": "format must be csv or ndjson"})
+
+
+class TourArchiveTests(DaysheetsTestCase):
+    def setUp(self):
+        super().setUp()
+        self.add_events(3)
+        self.add_notes(2)
+        Hotel.objects.filter(id=self.add_lodging().hotel_id).update(place_id="poi.12345")
+        Contact.objects.create(day=self.day, name="Nancy Wright", role="Local PM")
+        template = ScheduleTemplate.objects.create(tour=self.tour, name="Show Day")
+        ScheduleTemplateEvent.objects.create(
+            template=template, name="Doors", start_local="19:00", associations=[{"type": "person", "id": str(self.person.id)}]
+        )
+        self.edited = timezone.now() - timedelta(days=30)
+        Note.objects.update(last_edited_at=self.edited)
+        ScheduleTemplate.objects.update(created_at=self.edited)
+
+    def export(self):
+        res = self.client.get(f"/api/tours/{self.tour.id}/export/")
+        self.assertEqual(res.status_code, 200)
+        return b"".join(res.streaming_content)
+
+    def test_export_import_round_trip(self):
+        archive = self.export()
+        res = self.client.post("/api/tours/import/?name=Next+Leg", archive, content_type="application/x-ndjson")
+        self.assertEqual(res.status_code, 201)
+        self.assertEqual(res.json()["counts"]["scheduleEvent"], 3)
+
+        tour = Tour.objects.get(id=res.json()["tourId"])
+        self.assertEqual(tour.name, "Next Leg")
+        day = tour.days.get()
+        self.assertNotEqual(day.id, self.day.id)
+        self.assertEqual(day.venue_id, self.venue.id)
+        self.assertEqual(Venue.objects.count(), 1)
+
+        band = Group.objects.get(tour=tour, name="Band Party")
+        person = Person.objects.get(tour=tour)
+        self.assertEqual(person.group_id, band.id)
+        self.assertEqual({e.associations[0]["id"] for e in day.events.all()}, {str(band.id)})
+        self.assertTrue(all({"kind": "person", "id": str(person.id)} in n.visibility for n in day.notes.all()))
+        self.assertEqual(day.contacts.get().name, "Nancy Wright")
+
+        self.assertEqual(day.lodging.hotel.tour_id, tour.id)
+        self.assertEqual(day.lodging.hotel.place_id, "poi.12345")
+        self.assertEqual(list(day.lodging.guests.values_list("person_id", flat=True)), [person.id])
+        template_event = ScheduleTemplateEvent.objects.get(template__tour=tour)
+        self.assertEqual(template_event.associations, [{"type": "person", "id": str(person.id)}])
+        self.assertEqual(template_event.template.created_at, self.edited)
+        self.assertEqual({n.last_edited_at for n in day.notes.all()}, {self.edited})
+        self.assertEqual(person.updated_at, self.person.updated_at)
+
+        self.assertEqual(self.tour.days.get().events.count(), 3)
+
+    def test_export_errors_are_json(self):
+        res = self.client.get(f"/api/tours/{self.day.id}/export/", HTTP_ACCEPT="application/x-ndjson")
+        self.assertEqual(res.status_code, 404)
+        self.assertEqual(res.json(), {"detail": "Not found."})
+        res = self.client.get(f"/api/tours/{self.tour.id}/export/", HTTP_ACCEPT="application/x-ndjson")
+        self.assertEqual(res.status_code, 200)
+
+    def test_import_rejects_non_archives(self):
+        for body in [b'{"hello": 1}\n', b"[1]\n", b'"x"\n']:
+            res = self.client.post("/api/tours/import/", body, content_type="application/x-ndjson")
+            self.assertEqual(res.status_code, 400)
+        self.assertEqual(Tour.objects.count(), 1)
+
+    def test_export_command_writes_to_stdout(self):
+        out = io.StringIO()
+        call_command("export_tour", str(self.tour.id), stdout=out)
+        self.assertEqual(out.getvalue(), "".join(export_tour(self.tour.id)))
+
+    def test_management_commands_round_trip_gzip(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "tour.ndjson.gz")
+            call_command("export_tour", str(self.tour.id), output=path, stdout=io.StringIO())
+            with self.settings(TOUR_ARCHIVE_BATCH_SIZE=2):
+                call_command("import_tour", path, stdout=io.StringIO())
+        self.assertEqual(Tour.objects.count(), 2)
+        self.assertEqual(ScheduleEvent.objects.count(), 6)
+        self.assertEqual(Note.objects.count(), 4)
+
+
+class TourCloneTests(DaysheetsTestCase):
+    def setUp(self):
+        super().setUp()
+        self.add_events(4)
+        self.add_notes(2)
+        self.add_lodging()
+        template = ScheduleTemplate.objects.create(tour=self.tour, name="Show Day")
+        ScheduleTemplateEvent.objects.create(
+            template=template, name="Doors", associations=[{"type": "group", "id": str(self.crew.id)}]
+        )
+        Note.objects.update(last_edited_at=timezone.now() - timedelta(days=30))
+        ScheduleTemplate.objects.update(created_at=timezone.now() - timedelta(days=30))
+
+    def clone(self, **body):
+        return self.client.post(f"/api/tours/{self.tour.id}/clone/", body, format="json")
+
+    def test_clone_copies_people_and_templates_only_by_default(self):
+        # One read and one batched insert per copied model, however large the tour,
+        # plus one update restoring timestamps for models that have them.
+        with self.assertNumQueries(17):
+            res = self.clone(name="Leg 2")
+        self.assertEqual(res.status_code, 201)
+        tour = Tour.objects.get(id=res.json()["tourId"])
+
+        self.assertEqual(tour.name, "Leg 2")
+        self.assertEqual(list(Group.objects.filter(tour=tour).values_list("name", flat=True)), ["Band Party", "Crew"])
+        crew = Group.objects.get(tour=tour, name="Crew")
+        self.assertEqual(Person.objects.get(tour=tour).group.name, "Band Party")
+        self.assertEqual(
+            ScheduleTemplateEvent.objects.get(template__tour=tour).associations,
+            [{"type": "group", "id": str(crew.id)}],
+        )
+        self.assertFalse(tour.days.exists())
+
+    def test_clone_with_days_shifts_dates_and_rewrites_ids(self):
+        with self.settings(TOUR_ARCHIVE_BATCH_SIZE=2, TOUR_ARCHIVE_CHUNK_SIZE=1):
+            res = self.clone(includeDays=True, startDate="2026-06-01")
+        tour = Tour.objects.get(id=res.json()["tourId"])
+        self.assertEqual(tour.name, "Test Tour (copy)")
+
+        day = tour.days.get()
+        self.assertEqual(day.date, date(2026, 6, 1))
+        band = Group.objects.get(tour=tour, name="Band Party")
+        person = Person.objects.get(tour=tour)
+        self.assertEqual(day.events.count(), 4)
+        self.assertTrue(all(e.associations == [{"type": "group", "id": str(band.id)}] for e in day.events.all()))
+        self.assertTrue(all({"kind": "person", "id": str(person.id)} in n.visibility for n in day.notes.all()))
+        self.assertEqual(
+            sorted(day.notes.values_list("last_edited_at", flat=True)),
+            sorted(self.day.notes.values_list("last_edited_at", flat=True)),
+        )
+        self.assertEqual(
+            ScheduleTemplate.objects.get(tour=tour).created_at, ScheduleTemplate.objects.get(tour=self.tour).created_at
+        )
+        self.assertFalse(DayLodging.objects.filter(day=day).exists())
+        self.assertEqual(ScheduleEvent.objects.filter(day=self.day).count(), 4)
+
+    def test_clone_validates_offset(self):
+        self.assertEqual(self.clone(dayOffset="7").status_code, 400)
+        self.assertEqual(self.clone(startDate="June").status_code, 400)
+        self.assertEqual(self.clone(startDate="2026-02-30").status_code, 400)
+        self.assertEqual(self.clone(includeDays=True, startDate="9999-12-31").status_code, 400)
+        self.assertEqual(self.clone(includeDays=True, dayOffset=10**9).status_code, 400)
+        self.assertEqual(Tour.objects.count(), 1)
+
+
+class AssociationIndexTests(DaysheetsTestCase):
+    def setUp(self):
+        super().setUp()
+        self.other = Person.objects.create(tour=self.tour, name="Alex Kim", group=self.crew)
+
+    def batch(self, **body):
+        return self.client.post(f"/api/days/{self.day.id}/schedule/batch/", body, format="json")
+
+    def names(self, url):
+        res = self.client.get(url)
+        self.assertEqual(res.status_code, 200)
+        return [e["name"] for e in res.json()]
+
+    def test_batch_keeps_index_in_sync(self):
+        res = self.batch(
+            create=[
+                {"name": "Load In", "associations": [{"type": "group", "id": str(self.band.id)}]},
+                {"name": "FOH Tech", "associations": [{"type": "person", "id": str(self.other.id)}]},
+                {"name": "Doors", "associations": []},
+            ]
+        )
+        events = {e["name"]: e["id"] for e in res.json()["events"]}
+        self.assertEqual(ScheduleEventAssociation.objects.count(), 2)
+
+        url = f"/api/days/{self.day.id}/schedule/"
+        self.assertEqual(self.names(f"{url}?person={self.person.id}"), ["Load In"])
+        self.assertEqual(self.names(f"{url}?group={self.crew.id}"), [])
+        self.assertEqual(self.names(f"{url}?person={self.other.id}"), ["FOH Tech"])
+
+        self.batch(update=[{"id": events["Doors"], "associations": [{"type": "group", "id": str(self.crew.id)}]}])
+        self.assertEqual(self.names(f"{url}?person={self.other.id}"), ["Doors", "FOH Tech"])
+
+        self.batch(delete=[events["FOH Tech"]])
+        self.assertEqual(self.names(f"{url}?person={self.other.id}"), ["Doors"])
+        self.assertEqual(ScheduleEventAssociation.objects.count(), 2)
+
+    def test_tour_schedule_for_person_this_week(self):
+        template = ScheduleTemplate.objects.create(tour=self.tour, name="Show Day")
+        ScheduleTemplateEvent.objects.create(
+            template=template, name="Sound Check", associations=[{"type": "group", "id": str(self.band.id)}]
+        )
+        later = Day.objects.create(
+            tour=self.tour, date=self.day.date + timedelta(days=10), day_type="show", city="Denver", venue=self.venue
+        )
+        self.client.post(
+            f"/api/tours/{self.tour.id}/schedule-templates/{template.id}/apply/",
+            {"dayIds": [str(self.day.id), str(later.id)]},
+            format="json",
+        )
+
+        url = f"/api/tours/{self.tour.id}/schedule/?person={self.person.id}"
+        self.assertEqual(self.names(url), ["Sound Check", "Sound Check"])
+        with self.assertNumQueries(1):
+            self.assertEqual(self.names(f"{url}&from=2026-01-05&to=2026-01-12"), ["Sound Check"])
+        self.assertEqual(self.names(f"/api/tours/{self.tour.id}/schedule/?person={self.other.id}"), [])
+        self.assertEqual(self.client.get(f"/api/tours/{self.tour.id}/schedule/?person=nope").status_code, 400)
+
+    def test_note_visibility_is_indexed(self):
+        res = self.client.post(
+            f"/api/days/{self.day.id}/notes/",
+            {"title": "Crew only", "visibility": [{"kind": "group", "id": str(self.crew.id)}, {"kind": "bogus", "id": "x"}]},
+            format="json",
+        )
+        self.assertEqual(res.status_code, 201)
+        self.assertEqual(Note.objects.filter(notes_for(person=self.other.id)).get().title, "Crew only")
+        self.assertFalse(Note.objects.filter(notes_for(person=self.person.id)).exists())
+
+
+class PersonItineraryTests(DaysheetsTestCase):
+    def setUp(self):
+        super().setUp()
+        self.other = Person.objects.create(tour=self.tour, name="Alex Kim", group=self.crew)
+        self.days = [self.day] + [
+            Day.objects.create(
+                tour=self.tour, date=self.day.date + timedelta(days=i), day_type="show", city="Denver", venue=self.venue
+            )
+            for i in range(1, 4)
+        ]
+        for day in self.days:
+            self.add_events(2, day=day)
+            ScheduleEvent.objects.create(
+                day=day, name="Crew Call", associations=[{"type": "person", "id": str(self.other.id)}]
+            )
+        self.add_notes(2)
+        index_events(ScheduleEvent.objects.all())
+        index_notes(Note.objects.all())
+        self.add_lodging(day=self.days[1])
+
+    def get(self, person, query=""):
+        return self.client.get(f"/api/tours/{self.tour.id}/people/{person.id}/itinerary/{query}")
+
+    def test_itinerary_is_filtered_to_the_person(self):
+        # Person, days, events, notes (+ 2 visibility name lookups), lodging, guests.
+        with self.assertNumQueries(8):
+            res = self.get(self.person)
+        self.assertEqual(res.status_code, 200)
+        body = res.json()
+
+        self.assertEqual(body["person"]["name"], "Frankie Davis")
+        self.assertEqual(len(body["days"]), 4)
+        first = body["days"][0]
+        self.assertEqual([e["name"] for e in first["schedule"]], ["Event 0", "Event 1"])
+        self.assertEqual(len(first["notes"]), 2)
+        self.assertIsNone(first["lodging"])
+        self.assertEqual(body["days"][1]["lodging"]["hotel"]["name"], "Hilton Inglewood")
+        self.assertIsNone(body["next"])
+
+        crew = self.get(self.other).json()["days"]
+        self.assertEqual([e["name"] for e in crew[2]["schedule"]], ["Crew Call"])
+        self.assertEqual(len(crew[0]["notes"]), 1)
+        self.assertIsNone(crew[1]["lodging"])
+
+    def test_itinerary_pages_by_date(self):
+        res = self.get(self.person, "?from=2026-01-10&limit=2").json()
+        self.assertEqual([d["day"]["dateISO"] for d in res["days"]], ["2026-01-10", "2026-01-11"])
+
+        res = self.get(self.person, f"?from=2026-01-10&limit=2&after={res['next']}").json()
+        self.assertEqual([d["day"]["dateISO"] for d in res["days"]], ["2026-01-12"])
+        self.assertIsNone(res["next"])
+
+    def test_person_must_belong_to_tour(self):
+        stranger = Person.objects.create(tour=Tour.objects.create(name="Other"), name="Stranger")
+        self.assertEqual(self.get(stranger).status_code, 404)
+
+
+class RequestTimingTests(DaysheetsTestCase):
+    def setUp(self):
+        super().setUp()
+        get_request_stats().clear()
+
+    def test_disabled_by_default(self):
+        res = self.client.get(f"/api/tours/{self.tour.id}/days/")
+        self.assertNotIn("Server-Timing", res.headers)
+        self.assertEqual(self.client.get("/api/stats/requests/").json(), {"enabled": False, "endpoints": {}})
+
+    @override_settings(REQUEST_TIMING=True)
+    def test_records_queries_timing_and_size(self):
+        self.add_events(3)
+        with self.assertLogs("core.requests", "INFO") as logs:
+            res = self.client.get(f"/api/days/{self.day.id}/schedule/")
+            self.client.get(f"/api/days/{self.day.id}/schedule/")
+
+        self.assertRegex(
+            res.headers["Server-Timing"],
+            r'^db;dur=[\d.]+;desc="2 queries", serialize;dur=[\d.]+, render;dur=[\d.]+, app;dur=[\d.]+, total;dur=[\d.]+$',
+        )
+        line = json.loads(logs.records[0].getMessage())
+        self.assertGreater(line["serializeMs"], 0)
+        self.assertEqual(line["endpoint"], "GET api/days/<uuid:day_id>/schedule/")
+        self.assertEqual(line["view"], "core.views.DayScheduleList")
+        self.assertEqual((line["status"], line["queries"], line["bytes"]), (200, 2, len(res.content)))
+        self.assertEqual(connection.execute_wrappers, [])
+
+        stats = self.client.get("/api/stats/requests/").json()
+        self.assertTrue(stats["enabled"])
+        endpoint = stats["endpoints"]["GET api/days/<uuid:day_id>/schedule/"]
+        self.assertEqual((endpoint["count"], endpoint["avgQueries"], endpoint["maxQueries"]), (2, 2, 2))
+        self.assertEqual(endpoint["avgBytes"], len(res.content))
+        self.assertEqual(sum(b["count"] for b in endpoint["histogram"]), 2)
+
+        self.client.delete("/api/stats/requests/")
+        self.assertEqual(list(get_request_stats().stats()), ["DELETE api/stats/requests/"])
+
+    @override_settings(REQUEST_TIMING=True)
+    def test_serializer_time_excludes_its_queries(self):
+        self.add_lodging()
+        with self.assertLogs("core.requests", "INFO") as logs:
+            self.client.get(f"/api/days/{self.day.id}/context/")
+        line = json.loads(logs.records[0].getMessage())
+        self.assertGreater(line["serializeMs"], 0)
+        self.assertLess(line["serializeMs"] + line["dbMs"], line["totalMs"])
+
+    @override_settings(REQUEST_TIMING=True)
+    def test_serialization_is_timed_once_per_response(self):
+        self.add_events(3)
+        self.add_lodging()
+        with mock.patch.object(_Timing, "serializing", autospec=True, side_effect=_Timing.serializing) as timed:
+            res = self.client.get(f"/api/days/{self.day.id}/sheet/")
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(timed.call_count, 1)
+
+    @override_settings(REQUEST_TIMING=True)
+    async def test_async_requests_are_timed(self):
+        await Hotel.objects.acreate(name="Hilton Inglewood", city="Inglewood")
+        with self.assertLogs("core.requests", "INFO") as logs:
+            res = await self.async_client.get("/api/hotels/search/async/", {"q": "hilton"})
+        self.assertEqual(res.status_code, 200)
+        self.assertIn("Server-Timing", res.headers)
+        line = json.loads(logs.records[0].getMessage())
+        self.assertEqual(line["endpoint"], "GET api/hotels/search/async/")
+        self.assertGreater(line["queries"], 0)
+        self.assertEqual(await sync_to_async(lambda: connection.execute_wrappers)(), [])
+
+    @override_settings(REQUEST_TIMING=True)
+    def test_streamed_responses_have_no_size(self):
+        self.add_lodging()
+        with self.assertLogs("core.requests", "INFO") as logs:
+            res = self.client.get(f"/api/tours/{self.tour.id}/rooming-list/?format=csv")
+        b"".join(res.streaming_content)
+        self.assertIn("Server-Timing", res.headers)
+        self.assertIsNone(json.loads(logs.records[0].getMessage())["bytes"])
+
+
+class NPlusOneDetectorTests(DaysheetsTestCase):
+    def add_templates(self, count):
+        for i in range(count):
+            template = ScheduleTemplate.objects.create(tour=self.tour, name=f"Template {i}")
+            ScheduleTemplateEvent.objects.create(template=template, name="Doors")
+
+    def test_fingerprint_collapses_literals_and_lists(self):
+        self.assertEqual(
+            fingerprint('SELECT "x" FROM "t1" WHERE "id" IN (%s, %s, %s) AND "name" = \'it\'\'s\' LIMIT 21'),
+            'SELECT "x" FROM "t1" WHERE "id" IN (?) AND "name" = ? LIMIT ?',
+        )
+
+    def test_raises_with_serializer_field_and_line(self):
+        self.add_templates(6)
+        with self.assertRaises(NPlusOneError) as cm:
+            with detect_n_plus_one(mode="raise"):
+                ScheduleTemplateSummarySerializer(ScheduleTemplate.objects.all(), many=True).data
+        message = str(cm.exception)
+        self.assertIn("6x SELECT COUNT(*)", message)
+        self.assertIn("from ScheduleTemplateSummarySerializer.eventCount", message)
+        self.assertIn("at core/serializers.py:", message)
+
+        self.add_templates(1)
+        with detect_n_plus_one(mode="raise", threshold=10):
+            ScheduleTemplateSummarySerializer(ScheduleTemplate.objects.all(), many=True).data
+
+    def test_warns_with_model_line(self):
+        for i in range(1, 7):
+            Day.objects.create(tour=self.tour, date=date(2026, 1, 9) + timedelta(days=i), city="X", venue=self.venue)
+        with self.assertLogs("core.nplusone", "WARNING") as logs:
+            with detect_n_plus_one(mode="warn"):
+                [str(day) for day in Day.objects.all()]
+        self.assertIn("7x SELECT", logs.output[0])
+        self.assertIn("in __str__", logs.output[0])
+
+    def test_requests_raise_in_tests(self):
+        self.add_templates(6)
+        unannotated = lambda view: ScheduleTemplate.objects.filter(tour_id=view.kwargs["tour_id"])
+        with mock.patch("core.views.TourScheduleTemplateList.get_queryset", unannotated):
+            with self.assertRaises(NPlusOneError):
+                self.client.get(f"/api/tours/{self.tour.id}/schedule-templates/?summary=1")
+        self.assertEqual(self.client.get(f"/api/tours/{self.tour.id}/schedule-templates/?summary=1").status_code, 200)
+
+    @override_settings(NPLUSONE_DETECTOR=None, DEBUG=True)
+    def test_off_unless_configured(self):
+        self.add_templates(6)
+        with detect_n_plus_one() as collector:
+            ScheduleTemplateSummarySerializer(ScheduleTemplate.objects.all(), many=True).data
+        self.assertIsNone(collector)
+
+
+class FastSerializationTests(DaysheetsTestCase):
+    def setUp(self):
+        super().setUp()
+        self.add_events(5)
+        ScheduleEvent.objects.create(day=self.day, name="Unscheduled", associations=[], notes="é \u2603")
+        Person.objects.create(tour=self.tour, name="No Group", email="x@example.com", connected=True)
+        Day.objects.create(tour=self.tour, date=date(2026, 1, 10), day_type="off", city="Reno", venue=self.venue)
+
+    def assertSameBytes(self, view, url):
+        fast = self.client.get(url)
+        with mock.patch.object(view, "fast_serialization", False):
+            slow = self.client.get(url)
+        self.assertEqual(fast.status_code, 200)
+        self.assertEqual(fast.content, slow.content)
+        return fast
+
+    def test_responses_match_drf_serializers(self):
+        self.assertSameBytes(views.TourDaysList, f"/api/tours/{self.tour.id}/days/")
+        res = self.assertSameBytes(views.DayScheduleList, f"/api/days/{self.day.id}/schedule/")
+        self.assertEqual(len(res.json()), 6)
+        self.assertSameBytes(views.DayScheduleList, f"/api/days/{self.day.id}/schedule/?group={self.band.id}")
+        res = self.assertSameBytes(views.TourPersonnel, f"/api/tours/{self.tour.id}/personnel/")
+        self.assertEqual(len(res.json()["people"]), 2)
+
+    def test_method_fields_need_a_column(self):
+        with self.assertRaises(ImproperlyConfigured):
+            ValuesSerializer(DaySerializer).serialize(Day.objects.all())
+
+
+class SeedScaleTests(TestCase):
+    def seed(self, **options):
+        out = io.StringIO()
+        call_command(
+            "seed_scale", tours=2, days=3, events=4, notes=2, people=5, hotels=25, chunk_size=7, stdout=out, **options
+        )
+        return out.getvalue()
+
+    def test_seeds_tours_and_shared_hotels(self):
+        out = self.seed()
+        self.assertIn("rows/s", out)
+        self.assertEqual(Tour.objects.count(), 2)
+        self.assertEqual(Day.objects.count(), 6)
+        self.assertEqual(ScheduleEvent.objects.count(), 24)
+        self.assertEqual(Note.objects.exclude(visibility=[]).count(), 12)
+        self.assertEqual(DayLodging.objects.count(), 6)
+        self.assertEqual(Hotel.objects.filter(tour=None, source="synthetic").count(), 25 + 2 * 25)
+        self.assertTrue(ScheduleEventAssociation.objects.exists())
+
+    def test_same_seed_produces_same_rows(self):
+        self.seed()
+        first = sorted(Hotel.objects.values_list("id", "name"))
+        tours = set(Tour.objects.values_list("id", flat=True))
+
+        self.seed(clear=True)
+        self.assertEqual(sorted(Hotel.objects.values_list("id", "name")), first)
+        self.assertEqual(set(Tour.objects.values_list("id", flat=True)), tours)
+
+        self.seed(clear=True, seed=1)
+        self.assertFalse(tours & set(Tour.objects.values_list("id", flat=True)))
+
+
+@override_settings(NPLUSONE_DETECTOR="raise")
+class EndpointBudgetTests(TestCase):
+    def test_every_route_is_benchmarked(self):
+        self.assertEqual(benchmarks.missing_routes(), [])
+
+    def test_endpoints_stay_within_baseline_budgets(self):
+        baseline = benchmarks.load_baseline()
+        results = benchmarks.run(build_tour(**baseline["size"]), runs=1)
+
+        self.assertEqual(set(results), set(baseline["endpoints"]))
+        # A new query per row shows up here; regenerate the baseline with
+        # `manage.py bench_endpoints --update-baseline` when a change is intended.
+        self.assertEqual(benchmarks.check(results, baseline, bytes_factor=1.25), [])
+
+    def test_check_reports_exceeded_budgets(self):
+        baseline = {"vendor": connection.vendor, "endpoints": {"GET tours/": {"queries": 1, "ms": 2.0, "bytes": 100}}}
+        results = {
+            "GET tours/": {"status": 200, "queries": 3, "ms": 9.0, "bytes": 100},
+            "GET tours/{tour}/days/": {"status": 404, "queries": 1, "ms": 1.0, "bytes": 10},
+        }
+        self.assertEqual(
+            benchmarks.check(results, baseline),
+            [
+                "GET tours/: 3 queries, budget 1",
+                "GET tours/{tour}/days/: status 404",
+                "GET tours/{tour}/days/: no baseline",
+            ],
+        )
+        self.assertIn("GET tours/: 9.0ms, budget 6.0ms", benchmarks.check(results, baseline, time_factor=3))
+
+    def test_check_refuses_a_baseline_from_another_vendor(self):
+        baseline = {"vendor": "oracle", "endpoints": {"GET tours/": {"queries": 1, "ms": 2.0, "bytes": 100}}}
+        results = {"GET tours/": {"status": 200, "queries": 1, "ms": 1.0, "bytes": 100}}
+        [failure] = benchmarks.check(results, baseline)
+        self.assertIn(f"recorded on oracle, not {connection.vendor}", failure)
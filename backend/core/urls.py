@@ -4,18 +4,32 @@ from core import views
 urlpatterns = [
     path("tours/", views.ToursList.as_view()),
     path("tours/<uuid:tour_id>/days/", views.TourDaysList.as_view()),
+    path("tours/<uuid:tour_id>/changes/", views.TourChanges.as_view()),
+    path("tours/<uuid:tour_id>/schedule/", views.TourSchedule.as_view()),
+    path("tours/<uuid:tour_id>/stream/", views.tour_stream),
+    path("tours/<uuid:tour_id>/rooming-list/", views.TourRoomingList.as_view()),
+    path("tours/<uuid:tour_id>/export/", views.TourExport.as_view()),
+    path("tours/import/", views.TourImport.as_view()),
+    path("tours/<uuid:tour_id>/clone/", views.TourClone.as_view()),
     path("tours/<uuid:tour_id>/personnel/", views.TourPersonnel.as_view()),
     path("tours/<uuid:tour_id>/personnel/<uuid:person_id>/", views.TourPersonnelDetail.as_view()),
+    path("tours/<uuid:tour_id>/people/<uuid:person_id>/itinerary/", views.PersonItinerary.as_view()),
     path("tours/<uuid:tour_id>/groups/", views.TourGroups.as_view()),
     path("tours/<uuid:tour_id>/groups/<uuid:group_id>/", views.TourGroupsDetail.as_view()),
     path("days/<uuid:day_id>/schedule/", views.DayScheduleList.as_view()),
     path("days/<uuid:day_id>/context/", views.DayContext.as_view()),
+    path("days/<uuid:day_id>/sheet/", views.DaySheet.as_view()),
     path("days/<uuid:day_id>/schedule/batch/", views.DayScheduleBatch.as_view()),
     path("tours/<uuid:tour_id>/schedule-templates/", views.TourScheduleTemplateList.as_view()),
     path("days/<uuid:day_id>/schedule-templates/", views.DayScheduleTemplateCreate.as_view()),
     path("tours/<uuid:tour_id>/schedule-templates/<uuid:template_id>/", views.TourScheduleTemplateList.as_view()),
+    path("tours/<uuid:tour_id>/schedule-templates/<uuid:template_id>/apply/", views.TourScheduleTemplateApply.as_view()),
     path("hotels/search/", views.HotelSearchView.as_view(), name="hotel-search"),
+    path("hotels/search/async/", views.hotel_search_async, name="hotel-search-async"),
+    path("hotels/search/stats/", views.HotelSearchStats.as_view(), name="hotel-search-stats"),
+    path("stats/requests/", views.RequestTimingStats.as_view(), name="request-stats"),
     path("days/<uuid:day_id>/lodging/", views.SaveDayLodgingView.as_view(), name="day-lodging"),
+    path("tours/<uuid:tour_id>/lodging/block/", views.TourLodgingBlock.as_view(), name="tour-lodging-block"),
     path("days/<uuid:day_id>/notes/", views.DayNotes.as_view()),
     path("days/<uuid:day_id>/notes/<uuid:note_id>/", views.DayNoteDetail.as_view()),
     path("days/<uuid:day_id>/aftershow/", views.DayAftershow.as_view()),
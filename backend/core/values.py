@@ -0,0 +1,101 @@
+from operator import methodcaller
+
+from django.core.exceptions import ImproperlyConfigured
+from django.db.models import TextField
+from django.db.models.functions import Cast
+from rest_framework import ISO_8601, serializers
+from rest_framework.settings import api_settings
+
+from core.instrumentation import serializing
+
+_isoformat = methodcaller("isoformat")
+
+# Fields whose to_representation() returns database values unchanged.
+_IDENTITY = (
+    serializers.CharField,
+    serializers.ChoiceField,
+    serializers.BooleanField,
+    serializers.IntegerField,
+)
+
+
+def _uuid_text(value):
+    # Postgres casts uuids to the hyphenated form; backends without a uuid type store 32 hex digits.
+    if len(value) == 36:
+        return value
+    return f"{value[:8]}-{value[8:12]}-{value[12:16]}-{value[16:20]}-{value[20:]}"
+
+
+def _column(field):
+    """What to select for a field: UUIDs as text, skipping uuid.UUID construction per value."""
+    column = field.source.replace(".", "__")
+    if isinstance(field, serializers.UUIDField) and field.uuid_format == "hex_verbose":
+        return Cast(column, output_field=TextField()), _uuid_text
+    return column, _converter(field)
+
+
+def _converter(field):
+    """A cheap equivalent of field.to_representation() for non-null values; None means identity."""
+    if isinstance(field, _IDENTITY):
+        return None
+    if isinstance(field, serializers.JSONField) and not field.binary:
+        return None
+    if isinstance(field, serializers.DateField) and not isinstance(field, serializers.DateTimeField):
+        if getattr(field, "format", api_settings.DATE_FORMAT) == ISO_8601:
+            return _isoformat
+    if isinstance(field, serializers.TimeField):
+        if getattr(field, "format", api_settings.TIME_FORMAT) == ISO_8601:
+            return _isoformat
+    return field.to_representation
+
+
+class ValuesSerializer:
+    """
+    Read-only fast path for a ModelSerializer's output.
+
+    The field map (output key, column, converter) is compiled once from the
+    serializer's own fields, so keys, order and value formatting match it;
+    rows are then built straight from .values_list() tuples without model
+    instances or per-row field binding. Fields that need the instance, such
+    as SerializerMethodFields, must be given as `name=(column, converter)`.
+    """
+
+    def __init__(self, serializer_class, **computed):
+        self.serializer_class = serializer_class
+        self.computed = computed
+        self._compiled = None
+
+    def compile(self):
+        if self._compiled is None:
+            keys, columns, converters = [], [], []
+            for name, field in self.serializer_class().fields.items():
+                if field.write_only:
+                    continue
+                if name in self.computed:
+                    column, convert = self.computed[name]
+                elif isinstance(field, serializers.SerializerMethodField) or field.source == "*":
+                    raise ImproperlyConfigured(
+                        f"{self.serializer_class.__name__}.{name} needs an explicit (column, converter)"
+                    )
+                else:
+                    column, convert = _column(field)
+                keys.append(name)
+                columns.append(column)
+                converters.append(convert)
+            self._compiled = keys, columns, converters
+        return self._compiled
+
+    def serialize(self, queryset):
+        with serializing():
+            return self._serialize(queryset)
+
+    def _serialize(self, queryset):
+        keys, columns, converters = self.compile()
+        if all(convert is None for convert in converters):
+            return [dict(zip(keys, row)) for row in queryset.values_list(*columns)]
+
+        pairs = list(zip(keys, converters))
+        return [
+            {key: value if value is None or convert is None else convert(value) for (key, convert), value in zip(pairs, row)}
+            for row in queryset.values_list(*columns)
+        ]
@@ -2,17 +2,41 @@ from django.db import transaction
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
+from rest_framework.negotiation import BaseContentNegotiation
+from rest_framework.renderers import JSONRenderer
 from rest_framework.decorators import action
 from django.shortcuts import get_object_or_404
-from urllib.parse import urlencode
-from urllib.request import Request, urlopen
-from django.utils.dateparse import parse_datetime
+from django.utils.dateparse import parse_datetime, parse_date, parse_time
 from django.conf import settings
-from django.db.models import Q, Case, When, IntegerField
+from django.core.handlers.asgi import ASGIRequest
+from django.http import JsonResponse, StreamingHttpResponse
+from asgiref.sync import sync_to_async
+from django.utils import timezone
+from django.utils.decorators import method_decorator
+from django.views.decorators.http import condition
+from django.db.models import Q, F, Prefetch, Count
 
 from rest_framework import generics
 
-from core.models import Tour, Day, ScheduleEvent, Group, Person, ScheduleTemplate, Hotel, DayLodging, DayLodgingGuest, Note
+from core.models import Tour, Day, ScheduleEvent, Group, Person, ScheduleTemplate, ScheduleTemplateEvent, Hotel, DayLodging, DayLodgingGuest, Note, Contact, hotel_dedup_key
+from core import changes
+from core.changes import record_changes, changes_since, replay_messages
+from core.pubsub import get_broker
+from core.hotel_cache import get_geocode_cache
+from core.hotel_index import index_hotel
+from core.instrumentation import get_request_stats, serializing, timing_enabled
+from core.hotels import (
+    EXTERNAL_LIMIT,
+    search_local_hotels,
+    merge_hotel_results,
+    fetch_mapbox_hotels,
+    afetch_mapbox_hotels,
+)
+from core.etags import tour_days_etag, day_schedule_etag, day_context_etag, tour_personnel_etag
+from core.pagination import InvalidCursor, is_paginated, keyset_page
+from core.associations import events_for, notes_for, index_events, index_notes
+from core.archive import ArchiveError, clone_tour, export_tour, import_tour
+from core.reports import rooming_list_rows, rooming_list_csv, rooming_list_ndjson
 from core.serializers import (
     TourSerializer,
     DaySerializer,
@@ -24,32 +48,215 @@ from core.serializers import (
     PersonSerializer,
     PersonWriteSerializer,
     ScheduleTemplateSerializer,
+    ScheduleTemplateSummarySerializer,
     ScheduleTemplateCreateSerializer,
-    HotelSearchResultSerializer,
-    DayLodgingSerializer
+    DayLodgingSerializer,
+    DayValues,
+    ScheduleEventValues,
+    GroupValues,
+    PersonValues,
 )
+import asyncio
 import json
+import uuid
+from datetime import datetime, timedelta
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
 
 
 class ToursList(APIView):
     def get(self, request):
         qs = Tour.objects.all().order_by("name")
-        return Response(TourSerializer(qs, many=True).data)
+        with serializing():
+            return Response(TourSerializer(qs, many=True).data)
+
+
+def _day_after(values):
+    try:
+        date_iso, day_id = values
+        after_date = parse_date(date_iso)
+        after_id = uuid.UUID(day_id)
+    except (TypeError, ValueError, AttributeError):
+        raise InvalidCursor("invalid cursor")
+    if after_date is None:
+        raise InvalidCursor("invalid cursor")
+    return Q(date__gt=after_date) | Q(date=after_date, id__gt=after_id)
+
+
+def _event_after(values):
+    try:
+        start_iso, name, ev_id = values
+        start = parse_time(start_iso) if start_iso is not None else None
+        after_id = uuid.UUID(ev_id)
+    except (TypeError, ValueError, AttributeError):
+        raise InvalidCursor("invalid cursor")
+    if start_iso is not None and start is None:
+        raise InvalidCursor("invalid cursor")
+
+    same_slot = Q(name__gt=name) | Q(name=name, id__gt=after_id)
+    if start is None:
+        return Q(start_local__isnull=True) & same_slot
+    return Q(start_local__gt=start) | Q(start_local__isnull=True) | (Q(start_local=start) & same_slot)
 
 
 class TourDaysList(APIView):
+    # Build unpaginated lists from .values() rows instead of DaySerializer (same JSON).
+    fast_serialization = True
+
+    @method_decorator(condition(etag_func=tour_days_etag))
     def get(self, request, tour_id):
-        qs = Day.objects.filter(tour_id=tour_id).order_by("date")
-        return Response(DaySerializer(qs, many=True).data)
+        qs = Day.objects.filter(tour_id=tour_id)
+
+        try:
+            date_from = parse_date(request.query_params.get("from") or "")
+            date_to = parse_date(request.query_params.get("to") or "")
+        except ValueError:
+            return Response({"detail": "from/to must be YYYY-MM-DD"}, status=status.HTTP_400_BAD_REQUEST)
+        if date_from:
+            qs = qs.filter(date__gte=date_from)
+        if date_to:
+            qs = qs.filter(date__lte=date_to)
+
+        if not is_paginated(request):
+            if self.fast_serialization:
+                return Response(DayValues.serialize(qs.order_by("date")))
+            with serializing():
+                return Response(DaySerializer(qs.order_by("date"), many=True).data)
+
+        try:
+            rows, next_cursor = keyset_page(
+                qs.order_by("date", "id"),
+                request,
+                key=lambda d: [d.date.isoformat(), str(d.id)],
+                after_filter=_day_after,
+            )
+        except InvalidCursor as e:
+            return Response({"detail": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        with serializing():
+            return Response({"results": DaySerializer(rows, many=True).data, "next": next_cursor})
+
+
+def _audience_filter(request):
+    """Q for ?person=/?group= on schedule queries; raises ValueError for bad ids."""
+    person = request.query_params.get("person")
+    group = request.query_params.get("group")
+    if not person and not group:
+        return Q()
+    parsed = {name: _parse_uuid(value) for name, value in [("person", person), ("group", group)] if value}
+    if not all(parsed.values()):
+        raise ValueError("person/group must be UUIDs")
+    return events_for(**parsed)
 
 
 class DayScheduleList(APIView):
+    fast_serialization = True
+
+    @method_decorator(condition(etag_func=day_schedule_etag))
     def get(self, request, day_id):
-        qs = ScheduleEvent.objects.filter(day_id=day_id).order_by("start_local", "name")
-        return Response(ScheduleEventSerializer(qs, many=True).data)
+        try:
+            qs = ScheduleEvent.objects.filter(_audience_filter(request), day_id=day_id)
+        except ValueError as e:
+            return Response({"detail": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        if not is_paginated(request):
+            qs = qs.order_by("start_local", "name")
+            if self.fast_serialization:
+                return Response(ScheduleEventValues.serialize(qs))
+            with serializing():
+                return Response(ScheduleEventSerializer(qs, many=True).data)
+
+        try:
+            rows, next_cursor = keyset_page(
+                qs.order_by(F("start_local").asc(nulls_last=True), "name", "id"),
+                request,
+                key=lambda e: [e.start_local.isoformat() if e.start_local else None, e.name, str(e.id)],
+                after_filter=_event_after,
+            )
+        except InvalidCursor as e:
+            return Response({"detail": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        with serializing():
+            return Response({"results": ScheduleEventSerializer(rows, many=True).data, "next": next_cursor})
+
+
+class TourSchedule(APIView):
+    def get(self, request, tour_id):
+        try:
+            qs = ScheduleEvent.objects.filter(_audience_filter(request), day__tour_id=tour_id)
+        except ValueError as e:
+            return Response({"detail": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            date_from = parse_date(request.query_params.get("from") or "")
+            date_to = parse_date(request.query_params.get("to") or "")
+        except ValueError:
+            return Response({"detail": "from/to must be YYYY-MM-DD"}, status=status.HTTP_400_BAD_REQUEST)
+        if date_from:
+            qs = qs.filter(day__date__gte=date_from)
+        if date_to:
+            qs = qs.filter(day__date__lte=date_to)
+
+        qs = qs.order_by("day__date", F("start_local").asc(nulls_last=True), "name")
+        with serializing():
+            return Response(ScheduleEventSerializer(qs, many=True).data)
+
+
+class PersonItinerary(APIView):
+    def get(self, request, tour_id, person_id):
+        person = get_object_or_404(Person, id=person_id, tour_id=tour_id)
+
+        try:
+            date_from = parse_date(request.query_params.get("from") or "")
+            date_to = parse_date(request.query_params.get("to") or "")
+        except ValueError:
+            return Response({"detail": "from/to must be YYYY-MM-DD"}, status=status.HTTP_400_BAD_REQUEST)
+
+        qs = Day.objects.filter(tour_id=tour_id)
+        if date_from:
+            qs = qs.filter(date__gte=date_from)
+        if date_to:
+            qs = qs.filter(date__lte=date_to)
+        try:
+            days, next_cursor = keyset_page(
+                qs.order_by("date", "id"),
+                request,
+                key=lambda d: [d.date.isoformat(), str(d.id)],
+                after_filter=_day_after,
+            )
+        except InvalidCursor as e:
+            return Response({"detail": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        events = (
+            ScheduleEvent.objects.filter(events_for(person=person.id), day__in=days)
+            .order_by(F("start_local").asc(nulls_last=True), "name")
+        )
+        notes = Note.objects.filter(notes_for(person=person.id), day__in=days).order_by("-last_edited_at")
+        lodgings = (
+            DayLodging.objects.filter(day__in=days, guests__person=person)
+            .select_related("hotel")
+            .prefetch_related("guests")
+        )
+
+        with serializing():
+            by_day = {d.id: {"schedule": [], "notes": [], "lodging": None} for d in days}
+            events = list(events)
+            for e, data in zip(events, ScheduleEventSerializer(events, many=True).data):
+                by_day[e.day_id]["schedule"].append(data)
+            notes = list(notes)
+            for n, data in zip(notes, NoteSerializer(notes, many=True).data):
+                by_day[n.day_id]["notes"].append(data)
+            for lodging in lodgings:
+                by_day[lodging.day_id]["lodging"] = DayLodgingSerializer(lodging).data
+
+            return Response(
+                {
+                    "person": PersonSerializer(person).data,
+                    "days": [{"day": DaySerializer(d).data, **by_day[d.id]} for d in days],
+                    "next": next_cursor,
+                }
+            )
 
 
 class DayContext(APIView):
+    @method_decorator(condition(etag_func=day_context_etag))
     def get(self, request, day_id):
         day = (
             Day.objects
@@ -60,38 +267,273 @@ class DayContext(APIView):
 
         lodging = getattr(day, "lodging", None)
 
+        with serializing():
+            return Response(
+                {
+                    "venue": VenueSerializer(day.venue).data if day.venue else None,
+                    "contacts": ContactSerializer(day.contacts.all(), many=True).data,
+                    "notes": NoteSerializer(day.notes.all(), many=True).data,
+                    "lodging": (
+                        DayLodgingSerializer(lodging).data if lodging else None
+                    ),
+                    "aftershow": day.aftershow,
+                }
+            )
+
+
+class DaySheet(APIView):
+    def get(self, request, day_id):
+        qs = (
+            Day.objects
+            .select_related("tour", "venue", "lodging__hotel")
+            .prefetch_related(
+                Prefetch("events", queryset=ScheduleEvent.objects.order_by("start_local", "name")),
+                Prefetch("contacts", queryset=Contact.objects.order_by("role", "name")),
+                Prefetch("notes", queryset=Note.objects.order_by("-last_edited_at")),
+                "lodging__guests",
+                Prefetch("tour__group_set", queryset=Group.objects.order_by("name")),
+                Prefetch("tour__people", queryset=Person.objects.order_by("name")),
+            )
+        )
+        day = get_object_or_404(qs, id=day_id)
+
+        groups = day.tour.group_set.all()
+        people = day.tour.people.all()
+        visibility_names = (
+            {str(g.id): g.name for g in groups},
+            {str(p.id): p.name for p in people},
+        )
+        lodging = getattr(day, "lodging", None)
+
+        with serializing():
+            return Response(
+                {
+                    "day": DaySerializer(day).data,
+                    "schedule": ScheduleEventSerializer(day.events.all(), many=True).data,
+                    "venue": VenueSerializer(day.venue).data if day.venue else None,
+                    "contacts": ContactSerializer(day.contacts.all(), many=True).data,
+                    "notes": NoteSerializer(
+                        day.notes.all(), many=True, context={"visibility_names": visibility_names}
+                    ).data,
+                    "lodging": (
+                        DayLodgingSerializer(lodging).data if lodging else None
+                    ),
+                    "aftershow": day.aftershow,
+                    "groups": GroupSerializer(groups, many=True).data,
+                    "people": PersonSerializer(people, many=True).data,
+                }
+            )
+
+
+class TourChanges(APIView):
+    def get(self, request, tour_id):
+        tour = get_object_or_404(Tour, id=tour_id)
+        try:
+            since = int(request.query_params.get("since") or 0)
+        except ValueError:
+            return Response({"detail": "since must be an integer"}, status=status.HTTP_400_BAD_REQUEST)
+
+        if since >= tour.revision:
+            return Response({"revision": tour.revision, "changes": [], "next": None})
+        with serializing():
+            return Response({"revision": tour.revision, **changes_since(tour.id, since)})
+
+
+STREAM_KEEPALIVE_SECONDS = 15
+
+
+def _sse(message):
+    if message.get("resync"):
+        return "event: resync\ndata: {}\n\n"
+    return f"id: {message['revision']}\nevent: change\ndata: {json.dumps(message, separators=(',', ':'))}\n\n"
+
+
+class TourEventStream:
+    def __init__(self, broker, sub, replay, since, revision):
+        self.broker = broker
+        self.sub = sub
+        self.replay = replay
+        self.since = since or 0
+        self.revision = revision
+
+    def __aiter__(self):
+        return self.events()
+
+    async def events(self):
+        try:
+            last_sent = self.since
+            yield f"retry: 5000\n: revision {self.revision}\n\n"
+            for message in self.replay:
+                last_sent = message.get("revision", last_sent)
+                yield _sse(message)
+            while True:
+                try:
+                    message = await self.sub.get(timeout=STREAM_KEEPALIVE_SECONDS)
+                except asyncio.TimeoutError:
+                    yield ": keepalive\n\n"
+                    continue
+                if message.get("revision", last_sent + 1) <= last_sent:
+                    continue
+                last_sent = message.get("revision", last_sent)
+                yield _sse(message)
+        finally:
+            self.close()
+
+    def close(self):
+        self.broker.unsubscribe(self.sub)
+
+
+async def tour_stream(request, tour_id):
+    # Under WSGI each request gets a throwaway event loop, so the subscription would outlive it.
+    if not isinstance(request, ASGIRequest):
+        return JsonResponse({"detail": "Event streams need an ASGI server."}, status=501)
+
+    tour = await Tour.objects.filter(id=tour_id).values("revision").afirst()
+    if tour is None:
+        return JsonResponse({"detail": "Not found."}, status=404)
+
+    last_event_id = request.headers.get("Last-Event-ID") or request.GET.get("since") or ""
+    since = int(last_event_id) if last_event_id.isdigit() else None
+
+    broker = get_broker()
+    # Subscribe before replaying so nothing committed in between is missed.
+    sub = broker.subscribe(tour_id)
+    replay = await sync_to_async(replay_messages)(tour_id, since) if since is not None else []
+
+    stream = TourEventStream(broker, sub, replay, since, tour["revision"])
+    response = StreamingHttpResponse(stream, content_type="text/event-stream")
+    response["Cache-Control"] = "no-cache"
+    response["X-Accel-Buffering"] = "no"
+    return response
+
+
+class StreamNegotiation(BaseContentNegotiation):
+    """
+    For views that stream their own body: errors always render as JSON, and
+    ?format= is left to the view instead of selecting a DRF renderer.
+    """
+
+    def select_parser(self, request, parsers):
+        return parsers[0]
+
+    def select_renderer(self, request, renderers, format_suffix=None):
+        return renderers[0], renderers[0].media_type
+
+
+class TourRoomingList(APIView):
+    renderer_classes = [JSONRenderer]
+    content_negotiation_class = StreamNegotiation
+
+    def get(self, request, tour_id):
+        if not Tour.objects.filter(id=tour_id).exists():
+            return Response({"detail": "Not found."}, status=status.HTTP_404_NOT_FOUND)
+
+        fmt = (request.query_params.get("format") or "").lower()
+        if not fmt:
+            fmt = "ndjson" if "ndjson" in request.headers.get("Accept", "") else "csv"
+        if fmt not in ("csv", "ndjson"):
+            return Response({"detail": "format must be csv or ndjson"}, status=status.HTTP_400_BAD_REQUEST)
+
+        rows = rooming_list_rows(tour_id)
+        if fmt == "csv":
+            response = StreamingHttpResponse(rooming_list_csv(rows), content_type="text/csv; charset=utf-8")
+            response["Content-Disposition"] = f'attachment; filename="rooming-list-{tour_id}.csv"'
+        else:
+            response = StreamingHttpResponse(rooming_list_ndjson(rows), content_type="application/x-ndjson")
+        response["Cache-Control"] = "no-cache"
+        return response
+
+
+class TourExport(APIView):
+    renderer_classes = [JSONRenderer]
+    content_negotiation_class = StreamNegotiation
+
+    def get(self, request, tour_id):
+        if not Tour.objects.filter(id=tour_id).exists():
+            return Response({"detail": "Not found."}, status=status.HTTP_404_NOT_FOUND)
+
+        response = StreamingHttpResponse(export_tour(tour_id), content_type="application/x-ndjson")
+        response["Content-Disposition"] = f'attachment; filename="tour-{tour_id}.ndjson"'
+        return response
+
+
+class TourImport(APIView):
+    def post(self, request):
+        upload = request.FILES.get("archive") if request.content_type.startswith("multipart/") else None
+        try:
+            tour, counts = import_tour(upload or request.stream or [], name=(request.query_params.get("name") or "").strip())
+        except ArchiveError as e:
+            return Response({"detail": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        return Response({"tourId": str(tour.id), "counts": counts}, status=status.HTTP_201_CREATED)
+
+
+MAX_CLONE_OFFSET_DAYS = 3650
+
+
+class TourClone(APIView):
+    def post(self, request, tour_id):
+        tour = get_object_or_404(Tour, id=tour_id)
+        body = request.data or {}
+
+        name = (body.get("name") or "").strip() or f"{tour.name} (copy)"
+        include_days = bool(body.get("includeDays"))
+
+        day_offset = body.get("dayOffset", 0)
+        if body.get("startDate"):
+            try:
+                start = parse_date(body.get("startDate") or "")
+            except ValueError:
+                start = None
+            first = tour.days.order_by("date").values_list("date", flat=True).first()
+            if start is None:
+                return Response({"detail": "startDate must be YYYY-MM-DD"}, status=status.HTTP_400_BAD_REQUEST)
+            day_offset = (start - first).days if first else 0
+        if not isinstance(day_offset, int) or isinstance(day_offset, bool):
+            return Response({"detail": "dayOffset must be an integer"}, status=status.HTTP_400_BAD_REQUEST)
+        if abs(day_offset) > MAX_CLONE_OFFSET_DAYS:
+            return Response(
+                {"detail": f"dates can move at most {MAX_CLONE_OFFSET_DAYS} days"}, status=status.HTTP_400_BAD_REQUEST
+            )
+
+        try:
+            clone, counts = clone_tour(tour.id, name, include_days=include_days, day_offset=day_offset)
+        except OverflowError:
+            return Response({"detail": "shifted dates are out of range"}, status=status.HTTP_400_BAD_REQUEST)
         return Response(
-            {
-                "venue": VenueSerializer(day.venue).data if day.venue else None,
-                "contacts": ContactSerializer(day.contacts.all(), many=True).data,
-                "notes": NoteSerializer(day.notes.all(), many=True).data,
-                "lodging": (
-                    DayLodgingSerializer(lodging).data if lodging else None
-                ),
-                "aftershow": day.aftershow,
-            }
+            {"tourId": str(clone.id), "name": clone.name, "counts": counts},
+            status=status.HTTP_201_CREATED,
         )
 
 
 class TourPersonnel(APIView):
+    fast_serialization = True
+
+    @method_decorator(condition(etag_func=tour_personnel_etag))
     def get(self, request, tour_id):
         groups = Group.objects.filter(tour_id=tour_id).order_by("name")
         people = Person.objects.filter(tour_id=tour_id).order_by("name")
-        return Response(
-            {
-                "groups": GroupSerializer(groups, many=True).data,
-                "people": PersonSerializer(people, many=True).data,
-            }
-        )
+        with serializing():
+            if self.fast_serialization:
+                return Response({"groups": GroupValues.serialize(groups), "people": PersonValues.serialize(people)})
+            return Response(
+                {
+                    "groups": GroupSerializer(groups, many=True).data,
+                    "people": PersonSerializer(people, many=True).data,
+                }
+            )
 
+    @transaction.atomic
     def post(self, request, tour_id):
         ser = PersonWriteSerializer(data=request.data)
         ser.is_valid(raise_exception=True)
         person = Person.objects.create(tour_id=tour_id, **ser.validated_data)
-        return Response(PersonSerializer(person).data, status=status.HTTP_201_CREATED)
+        record_changes([(changes.PERSON, person.id, changes.CREATE)], tour_id=tour_id)
+        with serializing():
+            return Response(PersonSerializer(person).data, status=status.HTTP_201_CREATED)
 
 
 class TourPersonnelDetail(APIView):
+    @transaction.atomic
     def put(self, request, tour_id, person_id):
         person = Person.objects.get(id=person_id, tour_id=tour_id)
         ser = PersonWriteSerializer(person, data=request.data, partial=True)
@@ -99,13 +541,25 @@ class TourPersonnelDetail(APIView):
         for k, v in ser.validated_data.items():
             setattr(person, k, v)
         person.save()
-        return Response(PersonSerializer(person).data)
+        record_changes([(changes.PERSON, person.id, changes.UPDATE)], tour_id=tour_id)
+        with serializing():
+            return Response(PersonSerializer(person).data)
 
+    @transaction.atomic
     def delete(self, request, tour_id, person_id):
-        Person.objects.filter(id=person_id, tour_id=tour_id).delete()
+        deleted, _ = Person.objects.filter(id=person_id, tour_id=tour_id).delete()
+        if deleted:
+            record_changes([(changes.PERSON, person_id, changes.DELETE)], tour_id=tour_id)
         return Response({"ok": True})
 
 
+def _parse_uuid(value):
+    try:
+        return uuid.UUID(str(value))
+    except (TypeError, ValueError, AttributeError):
+        return None
+
+
 class DayScheduleBatch(APIView):
     @transaction.atomic
     def post(self, request, day_id):
@@ -117,48 +571,232 @@ class DayScheduleBatch(APIView):
         if not isinstance(create_list, list) or not isinstance(update_list, list) or not isinstance(delete_list, list):
             return Response({"detail": "create/update/delete must be lists"}, status=400)
 
-        ScheduleEvent.objects.filter(id__in=delete_list, day_id=day_id).delete()
+        errors = []
 
-        for u in update_list:
-            ev_id = u.get("id")
+        delete_ids = []
+        for i, d in enumerate(delete_list):
+            ev_id = _parse_uuid(d)
             if not ev_id:
-                return Response({"detail": "update items must include id"}, status=400)
+                errors.append({"op": "delete", "index": i, "errors": {"id": ["must be a valid UUID"]}})
+                continue
+            delete_ids.append(ev_id)
 
-            ev = ScheduleEvent.objects.get(id=ev_id, day_id=day_id)
-            ser = ScheduleEventSerializer(ev, data=u, partial=True)
-            ser.is_valid(raise_exception=True)
-            ser.save()
+        updates = []
+        for i, u in enumerate(update_list):
+            ev_id = _parse_uuid(u.get("id")) if isinstance(u, dict) else None
+            if not ev_id:
+                errors.append({"op": "update", "index": i, "errors": {"id": ["update items must include id"]}})
+                continue
+            ser = ScheduleEventSerializer(data=u, partial=True)
+            if not ser.is_valid():
+                errors.append({"op": "update", "index": i, "errors": ser.errors})
+                continue
+            updates.append((i, ev_id, ser.validated_data))
 
-        for c in create_list:
+        creates = []
+        for i, c in enumerate(create_list):
+            if not isinstance(c, dict):
+                errors.append({"op": "create", "index": i, "errors": {"non_field_errors": ["must be an object"]}})
+                continue
             ser = ScheduleEventSerializer(data={**c, "dayId": str(day_id)})
-            ser.is_valid(raise_exception=True)
-            ScheduleEvent.objects.create(
-                day_id=day_id,
-                name=ser.validated_data["name"],
-                start_local=ser.validated_data.get("start_local"),
-                end_local=ser.validated_data.get("end_local"),
-                status=ser.validated_data.get("status", "todo"),
-                associations=ser.validated_data.get("associations", []),
-                notes=ser.validated_data.get("notes", ""),
+            if not ser.is_valid():
+                errors.append({"op": "create", "index": i, "errors": ser.errors})
+                continue
+            creates.append(ser.validated_data)
+
+        if errors:
+            return Response({"detail": "invalid batch", "errors": errors}, status=400)
+
+        log = []
+
+        if delete_ids:
+            qs = ScheduleEvent.objects.filter(id__in=delete_ids, day_id=day_id)
+            deleted_ids = list(qs.values_list("id", flat=True))
+            qs.delete()
+            log += [(changes.SCHEDULE_EVENT, ev_id, changes.DELETE) for ev_id in deleted_ids]
+
+        if updates:
+            targets = ScheduleEvent.objects.filter(day_id=day_id).in_bulk([ev_id for _, ev_id, _ in updates])
+            missing = [
+                {"op": "update", "index": i, "errors": {"id": ["event not found"]}}
+                for i, ev_id, _ in updates
+                if ev_id not in targets
+            ]
+            if missing:
+                transaction.set_rollback(True)
+                return Response({"detail": "invalid batch", "errors": missing}, status=400)
+
+            fields = set()
+            for _, ev_id, data in updates:
+                ev = targets[ev_id]
+                for k, v in data.items():
+                    setattr(ev, k, v)
+                fields.update(data.keys())
+            if fields:
+                now = timezone.now()
+                for ev in targets.values():
+                    ev.updated_at = now
+                ScheduleEvent.objects.bulk_update(targets.values(), sorted(fields | {"updated_at"}))
+                if "associations" in fields:
+                    index_events(targets.values())
+                log += [(changes.SCHEDULE_EVENT, ev_id, changes.UPDATE) for ev_id in targets]
+
+        if creates:
+            created = ScheduleEvent.objects.bulk_create(
+                [
+                    ScheduleEvent(
+                        day_id=day_id,
+                        name=data["name"],
+                        start_local=data.get("start_local"),
+                        end_local=data.get("end_local"),
+                        status=data.get("status", "todo"),
+                        associations=data.get("associations", []),
+                        notes=data.get("notes", ""),
+                    )
+                    for data in creates
+                ]
             )
+            index_events(created, replace=False)
+            log += [(changes.SCHEDULE_EVENT, ev.id, changes.CREATE) for ev in created]
 
-        return Response({"ok": True})
+        record_changes(log, day_id=day_id)
+
+        qs = ScheduleEvent.objects.filter(day_id=day_id).order_by("start_local", "name")
+        with serializing():
+            return Response({"ok": True, "events": ScheduleEventSerializer(qs, many=True).data})
 
 
 class TourScheduleTemplateList(generics.ListAPIView):
     serializer_class = ScheduleTemplateSerializer
 
+    def is_summary(self):
+        return self.request.query_params.get("summary") in ["1", "true"]
+
+    def get_serializer_class(self):
+        if self.is_summary():
+            return ScheduleTemplateSummarySerializer
+        return ScheduleTemplateSerializer
+
     def get_queryset(self):
         tour_id = self.kwargs["tour_id"]
-        return ScheduleTemplate.objects.filter(tour_id=tour_id).order_by("-created_at")
+        qs = (
+            ScheduleTemplate.objects
+            .filter(tour_id=tour_id)
+            .annotate(event_count=Count("events"))
+            .order_by("-created_at")
+        )
+        if not self.is_summary():
+            qs = qs.prefetch_related(
+                Prefetch("events", queryset=ScheduleTemplateEvent.objects.order_by("order"))
+            )
+        return qs
+
+    def list(self, request, *args, **kwargs):
+        with serializing():
+            return super().list(request, *args, **kwargs)
 
+    @transaction.atomic
     def delete(self, request, tour_id, template_id):
         template = get_object_or_404(ScheduleTemplate, id=template_id, tour_id=tour_id)
         template.delete()
+        record_changes([(changes.SCHEDULE_TEMPLATE, template_id, changes.DELETE)], tour_id=tour_id)
         return Response(status=status.HTTP_204_NO_CONTENT)
 
 
+def _template_time(value, src_tz, day):
+    try:
+        t = parse_time((value or "").strip())
+    except ValueError:
+        return None
+    if t is None:
+        return None
+
+    if not src_tz or src_tz == day.tz:
+        return t
+    try:
+        src = ZoneInfo(src_tz)
+        dst = ZoneInfo(day.tz)
+    except (ZoneInfoNotFoundError, ValueError):
+        return t
+    return datetime.combine(day.date, t, tzinfo=src).astimezone(dst).time()
+
+
+class TourScheduleTemplateApply(APIView):
+    @transaction.atomic
+    def post(self, request, tour_id, template_id):
+        template = get_object_or_404(
+            ScheduleTemplate.objects.prefetch_related(
+                Prefetch("events", queryset=ScheduleTemplateEvent.objects.order_by("order"))
+            ),
+            id=template_id,
+            tour_id=tour_id,
+        )
+
+        body = request.data or {}
+        days = Day.objects.filter(tour_id=tour_id)
+
+        day_ids = body.get("dayIds")
+        if day_ids is not None:
+            if not isinstance(day_ids, list):
+                return Response({"detail": "dayIds must be a list"}, status=status.HTTP_400_BAD_REQUEST)
+            parsed = [_parse_uuid(d) for d in day_ids]
+            if not all(parsed):
+                return Response({"detail": "dayIds must be UUIDs"}, status=status.HTTP_400_BAD_REQUEST)
+            days = days.filter(id__in=parsed)
+        else:
+            try:
+                date_from = parse_date(body.get("from") or "") if body.get("from") else None
+                date_to = parse_date(body.get("to") or "") if body.get("to") else None
+            except ValueError:
+                return Response({"detail": "from/to must be YYYY-MM-DD"}, status=status.HTTP_400_BAD_REQUEST)
+            if not date_from or not date_to:
+                return Response({"detail": "dayIds or from/to are required"}, status=status.HTTP_400_BAD_REQUEST)
+            days = days.filter(date__gte=date_from, date__lte=date_to)
+
+            day_types = body.get("dayTypes") or []
+            if isinstance(day_types, str):
+                day_types = [day_types]
+            if day_types:
+                days = days.filter(day_type__in=day_types)
+
+        days = list(days.order_by("date").only("id", "date", "tz"))
+
+        log = []
+        if body.get("replace"):
+            qs = ScheduleEvent.objects.filter(day__in=days)
+            log += [(changes.SCHEDULE_EVENT, ev_id, changes.DELETE) for ev_id in qs.values_list("id", flat=True)]
+            qs.delete()
+
+        rows = []
+        for day in days:
+            for e in template.events.all():
+                rows.append(
+                    ScheduleEvent(
+                        day=day,
+                        name=e.name,
+                        start_local=_template_time(e.start_local, e.start_tz, day),
+                        end_local=_template_time(e.end_local, e.end_tz or e.start_tz, day),
+                        associations=e.associations or [],
+                        notes=e.notes,
+                    )
+                )
+        ScheduleEvent.objects.bulk_create(rows)
+        index_events(rows, replace=False)
+        log += [(changes.SCHEDULE_EVENT, ev.id, changes.CREATE) for ev in rows]
+        record_changes(log, tour_id=tour_id)
+
+        return Response(
+            {
+                "ok": True,
+                "created": len(rows),
+                "dayIds": [str(d.id) for d in days],
+            },
+            status=status.HTTP_201_CREATED,
+        )
+
+
 class DayScheduleTemplateCreate(generics.CreateAPIView):
+    @transaction.atomic
     def post(self, request, *args, **kwargs):
         day_id = self.kwargs["day_id"]
         day = Day.objects.select_related("tour").get(id=day_id)
@@ -166,64 +804,11 @@ class DayScheduleTemplateCreate(generics.CreateAPIView):
         serializer = ScheduleTemplateCreateSerializer(data=request.data, context={"day": day})
         serializer.is_valid(raise_exception=True)
         template = serializer.save()
+        record_changes([(changes.SCHEDULE_TEMPLATE, template.id, changes.CREATE)], tour_id=day.tour_id)
 
-        out = ScheduleTemplateSerializer(template)
-        return Response(out.data, status=status.HTTP_201_CREATED)
-
-def _fetch_mapbox_hotels(q: str, limit: int = 8):
-    token = getattr(settings, "MAPBOX_ACCESS_TOKEN", "") or ""
-    if not token:
-        return []
-
-    params = {
-        "access_token": token,
-        "limit": str(limit),
-        "types": "poi",
-        "autocomplete": "true",
-        "language": "en",
-    }
-    url = f"https://api.mapbox.com/geocoding/v5/mapbox.places/{q}.json?{urlencode(params)}"
-    req = Request(url, headers={"User-Agent": "daysheets-demo"})
-    with urlopen(req, timeout=4) as resp:
-        raw = resp.read().decode("utf-8")
-    data = json.loads(raw)
-
-    out = []
-    for f in data.get("features", [])[:limit]:
-        place_id = f.get("id", "") or ""
-        text = f.get("text", "") or ""
-        place_name = f.get("place_name", "") or ""
-        ctx = f.get("context", []) or []
-
-        city = ""
-        state = ""
-        postal = ""
-
-        for c in ctx:
-            cid = c.get("id", "") or ""
-            if cid.startswith("place."):
-                city = c.get("text", "") or ""
-            if cid.startswith("region."):
-                state = c.get("text", "") or ""
-            if cid.startswith("postcode."):
-                postal = c.get("text", "") or ""
-
-        out.append(
-            {
-                "key": f"ext:{place_id or text}",
-                "id": None,
-                "name": text or place_name,
-                "address1": place_name,
-                "city": city,
-                "state": state,
-                "postal": postal,
-                "placeId": place_id,
-                "source": "external",
-                "addressLine": place_name,
-            }
-        )
-    return out
-
+        with serializing():
+            out = ScheduleTemplateSerializer(template)
+            return Response(out.data, status=status.HTTP_201_CREATED)
 
 class HotelSearchView(APIView):
     def get(self, request):
@@ -233,91 +818,184 @@ class HotelSearchView(APIView):
         if not q:
             return Response([], status=status.HTTP_200_OK)
 
-        qs = Hotel.objects.all()
+        local = search_local_hotels(q, tour_id)
 
-        if tour_id:
-            qs = qs.filter(Q(tour_id=tour_id) | Q(tour__isnull=True))
-            qs = qs.annotate(
-                _prio=Case(
-                    When(tour_id=tour_id, then=0),
-                    default=1,
-                    output_field=IntegerField(),
-                )
-            ).order_by("_prio", "name")
-        else:
-            qs = qs.order_by("name")
+        ext = []
+        if len(local) < EXTERNAL_LIMIT:
+            ext = fetch_mapbox_hotels(q, limit=EXTERNAL_LIMIT)
 
-        qs = qs.filter(
-            Q(name__icontains=q)
-            | Q(address1__icontains=q)
-            | Q(city__icontains=q)
-            | Q(state__icontains=q)
-            | Q(postal__icontains=q)
-        )[:20]
+        return Response(merge_hotel_results(local, ext), status=status.HTTP_200_OK)
 
-        local = HotelSearchResultSerializer(qs, many=True).data
 
-        ext = []
-        if len(local) < 8:
-            ext = _fetch_mapbox_hotels(q, limit=8)
+class HotelSearchStats(APIView):
+    def get(self, request):
+        return Response({"geocodeCache": get_geocode_cache().stats()})
 
-        seen = set()
-        merged = []
 
-        for x in local:
-            k = x.get("key") or ""
-            seen.add(k)
-            pid = x.get("placeId") or ""
-            if pid:
-                seen.add(f"ext:{pid}")
-            merged.append(x)
+class RequestTimingStats(APIView):
+    def get(self, request):
+        return Response({"enabled": timing_enabled(), "endpoints": get_request_stats().stats()})
 
-        for x in ext:
-            k = x.get("key") or ""
-            if k in seen:
-                continue
-            merged.append(x)
+    def delete(self, request):
+        get_request_stats().clear()
+        return Response({"ok": True})
+
+
+# Lookups that outlive their request's budget keep running here instead of being cancelled.
+_pending_lookups = set()
+
+
+def _finish_lookup(task):
+    _pending_lookups.discard(task)
+    if not task.cancelled():
+        task.exception()
+
+
+async def hotel_search_async(request):
+    q = (request.GET.get("q") or "").strip()
+    tour_id = (request.GET.get("tourId") or "").strip()
+
+    if not q:
+        return JsonResponse([], safe=False)
+
+    budget = getattr(settings, "HOTEL_SEARCH_EXTERNAL_BUDGET", 0.8)
+    loop = asyncio.get_running_loop()
+    started = loop.time()
+
+    local = await sync_to_async(search_local_hotels)(q, tour_id)
+
+    ext = []
+    if len(local) < EXTERNAL_LIMIT:
+        lookup = asyncio.ensure_future(afetch_mapbox_hotels(q, limit=EXTERNAL_LIMIT))
+        _pending_lookups.add(lookup)
+        lookup.add_done_callback(_finish_lookup)
+
+        remaining = budget - (loop.time() - started)
+        done, _ = await asyncio.wait([lookup], timeout=max(remaining, 0))
+        if lookup in done and not lookup.exception():
+            ext = lookup.result()
+
+    return JsonResponse(merge_hotel_results(local, ext), safe=False)
+
+
+def _lodging_hotel(tour, hotel_in):
+    """
+    The hotel a lodging payload refers to: by id, then place id, then the
+    tour's (or a global) hotel with the same normalized identity, creating it
+    otherwise. The unique (tour, dedup_key) index settles races. Returns None
+    when a new hotel would have no name.
+    """
+    hotel_id = hotel_in.get("id") or None
+    place_id = (hotel_in.get("placeId") or hotel_in.get("place_id") or "").strip()
+
+    if hotel_id:
+        return Hotel.objects.get(id=hotel_id)
+    if place_id:
+        hotel = Hotel.objects.filter(place_id=place_id).first()
+        if hotel:
+            return hotel
+
+    name = (hotel_in.get("name") or "").strip()
+    if not name:
+        return None
+
+    fields = {
+        "name": name,
+        "address1": (hotel_in.get("address1") or "").strip(),
+        "city": (hotel_in.get("city") or "").strip(),
+        "state": (hotel_in.get("state") or "").strip(),
+        "postal": (hotel_in.get("postal") or "").strip(),
+    }
+    key = hotel_dedup_key(**fields)
+
+    hotel = (
+        Hotel.objects.filter(Q(tour=tour) | Q(tour__isnull=True), dedup_key=key)
+        .order_by(F("tour_id").asc(nulls_last=True))
+        .first()
+    )
+    if hotel is None:
+        hotel, created = Hotel.objects.get_or_create(
+            tour=tour,
+            dedup_key=key,
+            defaults={
+                **fields,
+                "place_id": place_id,
+                "source": (hotel_in.get("source") or "external").strip() or "external",
+            },
+        )
+        if created:
+            index_hotel(hotel)
+            return hotel
+
+    if place_id and not hotel.place_id:
+        hotel.place_id = place_id
+        hotel.save(update_fields=["place_id"])
+    return hotel
+
+
+def _sync_lodging_guests(lodgings, person_ids, created=()):
+    """
+    Give every lodging the same guest list, inserting and deleting only the
+    rows that changed. Returns the resulting person ids in request order.
+    """
+    wanted = list(dict.fromkeys(str(pid) for pid in map(_parse_uuid, person_ids) if pid))
+
+    current = {lodging.id: set() for lodging in lodgings}
+    existing = [lodging.id for lodging in lodgings if lodging.id not in created]
+    if existing:
+        for lodging_id, pid in DayLodgingGuest.objects.filter(lodging_id__in=existing).values_list("lodging_id", "person_id"):
+            current[lodging_id].add(str(pid))
+
+    if any(guests - set(wanted) for guests in current.values()):
+        DayLodgingGuest.objects.filter(lodging_id__in=current).exclude(person_id__in=wanted).delete()
+
+    known = set().union(*current.values())
+    missing = [pid for pid in wanted if any(pid not in guests for guests in current.values())]
+    if missing:
+        known |= {str(pid) for pid in Person.objects.filter(id__in=missing).values_list("id", flat=True)}
+        DayLodgingGuest.objects.bulk_create(
+            [
+                DayLodgingGuest(lodging_id=lodging_id, person_id=pid)
+                for lodging_id, guests in current.items()
+                for pid in wanted
+                if pid not in guests and pid in known
+            ]
+        )
+
+    return [pid for pid in wanted if pid in known]
+
+
+def _utc_datetime(value):
+    """An ISO 8601 string as an aware UTC datetime (naive input is in the current timezone)."""
+    parsed = parse_datetime(value) if value else None
+    if parsed is None:
+        return None
+    if timezone.is_naive(parsed):
+        parsed = timezone.make_aware(parsed)
+    return parsed.astimezone(ZoneInfo("UTC"))
 
-        return Response(merged[:20], status=status.HTTP_200_OK)
 
 class SaveDayLodgingView(APIView):
+    @transaction.atomic
     def post(self, request, day_id):
         day = Day.objects.select_related("tour").get(id=day_id)
 
         body = request.data or {}
         hotel_in = body.get("hotel") or {}
 
-        hotel_id = hotel_in.get("id") or None
-        place_id = (hotel_in.get("placeId") or hotel_in.get("place_id") or "").strip()
-
-        if hotel_id:
-            hotel = Hotel.objects.get(id=hotel_id)
-        else:
-            hotel = None
-            if place_id:
-                hotel = Hotel.objects.filter(place_id=place_id).first()
-            if not hotel:
-                name = (hotel_in.get("name") or "").strip()
-                if not name:
-                    return Response({"detail": "hotel.name is required"}, status=status.HTTP_400_BAD_REQUEST)
-
-                hotel = Hotel.objects.create(
-                    tour=day.tour,
-                    name=name,
-                    address1=(hotel_in.get("address1") or "").strip(),
-                    city=(hotel_in.get("city") or "").strip(),
-                    state=(hotel_in.get("state") or "").strip(),
-                    postal=(hotel_in.get("postal") or "").strip(),
-                    place_id=place_id,
-                    source=(hotel_in.get("source") or "external").strip() or "external",
-                )
+        hotel = _lodging_hotel(day.tour, hotel_in)
+        if hotel is None:
+            return Response({"detail": "hotel.name is required"}, status=status.HTTP_400_BAD_REQUEST)
 
-        check_in_iso = parse_datetime(body.get("checkInISO") or "") if body.get("checkInISO") else None
-        check_out_iso = parse_datetime(body.get("checkOutISO") or "") if body.get("checkOutISO") else None
+        try:
+            check_in_iso = _utc_datetime(body.get("checkInISO"))
+            check_out_iso = _utc_datetime(body.get("checkOutISO"))
+        except ValueError:
+            return Response({"detail": "checkInISO/checkOutISO must be ISO 8601 datetimes"}, status=status.HTTP_400_BAD_REQUEST)
         rooms = body.get("rooms", None)
         notes = body.get("notes", "") or ""
 
-        lodging, _ = DayLodging.objects.update_or_create(
+        lodging, created = DayLodging.objects.update_or_create(
             day=day,
             defaults={
                 "hotel": hotel,
@@ -335,42 +1013,138 @@ class SaveDayLodgingView(APIView):
             if pid:
                 person_ids.append(pid)
 
-        DayLodgingGuest.objects.filter(lodging=lodging).delete()
+        guest_ids = _sync_lodging_guests([lodging], person_ids, created={lodging.id} if created else ())
 
-        if person_ids:
-            people = {str(p.id): p for p in Person.objects.filter(id__in=person_ids)}
-            to_create = []
-            for pid in person_ids:
-                p = people.get(str(pid))
-                if p:
-                    to_create.append(DayLodgingGuest(lodging=lodging, person=p))
-            if to_create:
-                DayLodgingGuest.objects.bulk_create(to_create)
+        record_changes([(changes.DAY_LODGING, day.id, changes.UPDATE)], tour_id=day.tour_id)
 
-        lodging = DayLodging.objects.select_related("hotel").prefetch_related("guests").get(id=lodging.id)
-        return Response(DayLodgingSerializer(lodging).data, status=status.HTTP_200_OK)
+        with serializing():
+            out = DayLodgingSerializer(lodging, context={"guest_person_ids": guest_ids})
+            return Response(out.data, status=status.HTTP_200_OK)
 
+    @transaction.atomic
     def delete(self, request, day_id):
         day = Day.objects.get(id=day_id)
-        DayLodging.objects.filter(day=day).delete()
+        deleted, _ = DayLodging.objects.filter(day=day).delete()
+        if deleted:
+            record_changes([(changes.DAY_LODGING, day.id, changes.DELETE)], tour_id=day.tour_id)
         return Response({"ok": True}, status=status.HTTP_200_OK)
 
 
+def _day_datetime(day, value, next_day=False):
+    t = parse_time((value or "").strip()) if value else None
+    if t is None:
+        return None
+    try:
+        tz = ZoneInfo(day.tz)
+    except (ZoneInfoNotFoundError, ValueError):
+        tz = timezone.get_current_timezone()
+    local = datetime.combine(day.date + timedelta(days=1 if next_day else 0), t, tzinfo=tz)
+    return local.astimezone(ZoneInfo("UTC"))
+
+
+class TourLodgingBlock(APIView):
+    @transaction.atomic
+    def post(self, request, tour_id):
+        tour = get_object_or_404(Tour, id=tour_id)
+        body = request.data or {}
+        days = Day.objects.filter(tour=tour)
+
+        day_ids = body.get("dayIds")
+        if day_ids is not None:
+            if not isinstance(day_ids, list):
+                return Response({"detail": "dayIds must be a list"}, status=status.HTTP_400_BAD_REQUEST)
+            parsed = [_parse_uuid(d) for d in day_ids]
+            if not all(parsed):
+                return Response({"detail": "dayIds must be UUIDs"}, status=status.HTTP_400_BAD_REQUEST)
+            days = days.filter(id__in=parsed)
+        else:
+            try:
+                date_from = parse_date(body.get("from") or "") if body.get("from") else None
+                date_to = parse_date(body.get("to") or "") if body.get("to") else None
+            except ValueError:
+                return Response({"detail": "from/to must be YYYY-MM-DD"}, status=status.HTTP_400_BAD_REQUEST)
+            if not date_from or not date_to:
+                return Response({"detail": "dayIds or from/to are required"}, status=status.HTTP_400_BAD_REQUEST)
+            days = days.filter(date__gte=date_from, date__lte=date_to)
+
+        days = list(days.order_by("date").only("id", "date", "tz", "tour_id"))
+        if not days:
+            return Response({"detail": "no days matched"}, status=status.HTTP_400_BAD_REQUEST)
+
+        hotel = _lodging_hotel(tour, body.get("hotel") or {})
+        if hotel is None:
+            return Response({"detail": "hotel.name is required"}, status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            check_in = [_day_datetime(day, body.get("checkInTime")) for day in days]
+            check_out = [_day_datetime(day, body.get("checkOutTime"), next_day=True) for day in days]
+        except ValueError:
+            return Response({"detail": "checkInTime/checkOutTime must be HH:MM"}, status=status.HTTP_400_BAD_REQUEST)
+
+        rooms = body.get("rooms", None)
+        notes = body.get("notes", "") or ""
+
+        # Upserts only report back ids the database generated, so keep the existing ones.
+        existing = dict(DayLodging.objects.filter(day__in=days).values_list("day_id", "id"))
+        lodgings = [
+            DayLodging(
+                id=existing.get(day.id) or uuid.uuid4(),
+                day=day,
+                hotel=hotel,
+                check_in_iso=check_in[i],
+                check_out_iso=check_out[i],
+                rooms=rooms if rooms not in ["", None] else None,
+                notes=notes,
+            )
+            for i, day in enumerate(days)
+        ]
+        DayLodging.objects.bulk_create(
+            lodgings,
+            update_conflicts=True,
+            unique_fields=["day"],
+            update_fields=["hotel", "check_in_iso", "check_out_iso", "rooms", "notes", "updated_at"],
+        )
+
+        person_ids = [g.get("personId") or g.get("person_id") for g in body.get("guests") or []]
+        created = {lodging.id for lodging in lodgings if lodging.day_id not in existing}
+        guest_ids = _sync_lodging_guests(lodgings, [pid for pid in person_ids if pid], created=created)
+
+        record_changes([(changes.DAY_LODGING, day.id, changes.UPDATE) for day in days], tour_id=tour.id)
+
+        with serializing():
+            out = DayLodgingSerializer(lodgings, many=True, context={"guest_person_ids": guest_ids}).data
+        return Response(
+            {
+                "ok": True,
+                "days": [
+                    {"dayId": str(day.id), "date": day.date.isoformat(), "lodging": lodging}
+                    for day, lodging in zip(days, out)
+                ],
+            },
+            status=status.HTTP_200_OK,
+        )
+
+
 class TourGroups(APIView):
     def get(self, request, tour_id):
         groups = Group.objects.filter(tour_id=tour_id).order_by("name")
-        return Response(GroupSerializer(groups, many=True).data)
+        with serializing():
+            return Response(GroupSerializer(groups, many=True).data)
 
+    @transaction.atomic
     def post(self, request, tour_id):
         name = (request.data.get("name") or "").strip()
         if not name:
             return Response({"detail": "name is required"}, status=status.HTTP_400_BAD_REQUEST)
 
         group = Group.objects.create(tour_id=tour_id, name=name)
-        return Response(GroupSerializer(group).data, status=status.HTTP_201_CREATED)
+        record_changes([(changes.GROUP, group.id, changes.CREATE)], tour_id=tour_id)
+        with serializing():
+            return Response(GroupSerializer(group).data, status=status.HTTP_201_CREATED)
 
 
 class TourGroupsDetail(APIView):
+    @transaction.atomic
     def put(self, request, tour_id, group_id):
         group = Group.objects.get(id=group_id, tour_id=tour_id)
 
@@ -387,13 +1161,22 @@ class TourGroupsDetail(APIView):
             group.color = (color or "red").strip() or "red"
 
         group.save()
-        return Response(GroupSerializer(group).data)
+        record_changes([(changes.GROUP, group.id, changes.UPDATE)], tour_id=tour_id)
+        with serializing():
+            return Response(GroupSerializer(group).data)
 
+    @transaction.atomic
     def delete(self, request, tour_id, group_id):
-        Group.objects.filter(id=group_id, tour_id=tour_id).delete()
+        member_ids = list(Person.objects.filter(group_id=group_id, tour_id=tour_id).values_list("id", flat=True))
+        deleted, _ = Group.objects.filter(id=group_id, tour_id=tour_id).delete()
+        if deleted:
+            log = [(changes.GROUP, group_id, changes.DELETE)]
+            log += [(changes.PERSON, person_id, changes.UPDATE) for person_id in member_ids]
+            record_changes(log, tour_id=tour_id)
         return Response({"ok": True})
 
 class DayNotes(APIView):
+    @transaction.atomic
     def post(self, request, day_id):
         title = (request.data.get("title") or "").strip()
         body = (request.data.get("body") or "").strip()
@@ -419,22 +1202,30 @@ class DayNotes(APIView):
             visibility=visibility,
             last_edited_by=request.user.username if request.user.is_authenticated else "",
         )
+        index_notes([note], replace=False)
+        record_changes([(changes.NOTE, note.id, changes.CREATE)], day_id=day_id)
 
-        return Response(NoteSerializer(note).data, status=status.HTTP_201_CREATED)
+        with serializing():
+            return Response(NoteSerializer(note).data, status=status.HTTP_201_CREATED)
 
 
 
 class DayNoteDetail(APIView):
+    @transaction.atomic
     def delete(self, request, day_id, note_id):
-        Note.objects.filter(id=note_id, day_id=day_id).delete()
+        deleted, _ = Note.objects.filter(id=note_id, day_id=day_id).delete()
+        if deleted:
+            record_changes([(changes.NOTE, note_id, changes.DELETE)], day_id=day_id)
         return Response({"ok": True})
 
 class DayAftershow(APIView):
+    @transaction.atomic
     def post(self, request, day_id):
         day = get_object_or_404(Day, id=day_id)
 
         text = (request.data.get("aftershow") or "").strip()
         day.aftershow = text
-        day.save(update_fields=["aftershow"])
+        day.save(update_fields=["aftershow", "updated_at"])
+        record_changes([(changes.DAY, day.id, changes.UPDATE)], tour_id=day.tour_id)
 
         return Response({"aftershow": day.aftershow})
@@ -130,7 +130,7 @@ export const useApi = () => {
       delete?: UUID[];
     }
   ) =>
-    $fetch<{ ok: boolean }>(`${apiBase}/days/${dayId}/schedule/batch/`, {
+    $fetch<{ ok: boolean; events: ScheduleEvent[] }>(`${apiBase}/days/${dayId}/schedule/batch/`, {
       method: "POST",
       body: payload,
     });